@@ -0,0 +1,61 @@
+# camera3d.py — Orbit camera shared by the 3D views: cached look-at matrix and frustum planes
+
+import math
+import numpy as np
+from OpenGL.GL import *
+
+def frustum_planes(mvp):
+    """(6, 4) unit-normal planes (left, right, bottom, top, near, far) of a row-major clip
+    matrix; a point p is inside when planes @ (p, 1) >= 0 for every plane."""
+    planes = np.array([mvp[3] + mvp[0], mvp[3] - mvp[0], mvp[3] + mvp[1],
+                       mvp[3] - mvp[1], mvp[3] + mvp[2], mvp[3] - mvp[2]], dtype=np.float32)
+    return planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+
+class Camera3D:
+    def __init__(self, distance=60.0, angle_v=30.0):
+        self.distance = distance
+        self.angle_h = 45.0  # horizontal angle
+        self.angle_v = angle_v  # vertical angle
+        self.target = [0, 0, 0]
+        self.mouse_sensitivity = 0.3
+        self.zoom_speed = 2.0
+        self.eye = None     # world eye position and frustum planes as of the last apply()
+        self.planes = None
+        self._dirty = True  # angles/distance changed since the view matrix was built
+        self._view = None
+        self._proj = None   # projection (row-major), fixed after setup_opengl
+    
+    def view_matrix(self):
+        """gluLookAt matrix (column-major), rebuilt only after the camera moved."""
+        if self._dirty or self._view is None:
+            rad_h = math.radians(self.angle_h)
+            rad_v = math.radians(self.angle_v)
+            eye = self.distance * np.array([math.cos(rad_v) * math.cos(rad_h), math.sin(rad_v),
+                                            math.cos(rad_v) * math.sin(rad_h)])
+            f = np.array(self.target, dtype=np.float64) - eye; f /= np.linalg.norm(f)
+            side = np.cross(f, (0, 1, 0)); side /= np.linalg.norm(side)
+            up = np.cross(side, f)
+            m = np.identity(4)
+            m[0, :3], m[1, :3], m[2, :3] = side, up, -f
+            m[:3, 3] = -m[:3, :3] @ eye
+            self._view = np.ascontiguousarray(m.T, dtype=np.float32)
+            self.eye = eye.astype(np.float32)
+            self.planes = None
+            self._dirty = False
+        return self._view
+    
+    def apply(self):
+        glLoadMatrixf(self.view_matrix())
+        if self.planes is None:
+            if self._proj is None:
+                self._proj = np.asarray(glGetFloatv(GL_PROJECTION_MATRIX)).T
+            self.planes = frustum_planes(self._proj @ self._view.T)
+    
+    def rotate(self, dx, dy):
+        self.angle_h += dx * self.mouse_sensitivity
+        self.angle_v = max(-89, min(89, self.angle_v + dy * self.mouse_sensitivity))
+        self._dirty = True
+    
+    def zoom(self, delta):
+        self.distance = max(20, min(150, self.distance - delta * self.zoom_speed))
+        self._dirty = True
@@ -6,16 +6,20 @@ dual_view.py — Single-screen synchronized 2D + 3D view with legend + HUD
 - Top: global status bar (ticks, FPS, agents).
 """
 
-import math, time
+import math, time, ctypes, functools
+from dataclasses import dataclass
+import numpy as np
 import pygame
 from pygame.locals import *
 from OpenGL.GL import *
 from OpenGL.GLU import *
+from OpenGL.arrays import vbo
 
 from config import *  # GRID_W, GRID_H, FPS, BASE_LOCATIONS, etc.
 from simulator import FarmSimulator
-from rl_swarm import RuleBasedAgent, SimpleA2CAgent, move_agent
+from rl_swarm import RuleBasedAgent, SimpleA2CAgent
 from llm_parser import parse_report
+from text_cache import render_text, wrap_lines
 
 MOVE_EVERY_N_TICKS_DEFAULT = 8  # default tick interval between agent moves
 
@@ -27,6 +31,8 @@ class OrbitCamera:
         self.distance = 40.0
         self.target = (GRID_W/2, 0, GRID_H/2)
         self._dragging = False
+        self._dirty = True  # yaw/pitch/distance/target changed since the view matrix was built
+        self._view = None
     def begin_drag(self, _pos): self._dragging = True
     def end_drag(self): self._dragging = False
     def handle_motion(self, _pos, buttons, rel):
@@ -34,13 +40,28 @@ class OrbitCamera:
             dx, dy = rel
             self.yaw += dx * 0.3
             self.pitch = max(-89, min(89, self.pitch - dy * 0.3))
+            self._dirty = True
     def zoom(self, delta):
         self.distance = max(5.0, min(120.0, self.distance * (0.9 if delta > 0 else 1.1)))
+        self._dirty = True
+    def view_matrix(self):
+        """gluLookAt matrix (column-major), rebuilt only after the camera moved."""
+        if self._dirty or self._view is None:
+            yr, pr = math.radians(self.yaw), math.radians(self.pitch)
+            cp = math.cos(pr)
+            target = np.array(self.target, dtype=np.float64)
+            eye = target + self.distance * np.array([cp*math.cos(yr), math.sin(pr), cp*math.sin(yr)])
+            f = target - eye; f /= np.linalg.norm(f)
+            side = np.cross(f, (0, 1, 0)); side /= np.linalg.norm(side)
+            up = np.cross(side, f)
+            m = np.identity(4)
+            m[0, :3], m[1, :3], m[2, :3] = side, up, -f
+            m[:3, 3] = -m[:3, :3] @ eye
+            self._view = np.ascontiguousarray(m.T, dtype=np.float32)
+            self._dirty = False
+        return self._view
     def apply(self):
-        x = self.target[0] + self.distance * math.cos(math.radians(self.pitch)) * math.cos(math.radians(self.yaw))
-        z = self.target[2] + self.distance * math.cos(math.radians(self.pitch)) * math.sin(math.radians(self.yaw))
-        y = self.target[1] + self.distance * math.sin(math.radians(self.pitch))
-        gluLookAt(x, y, z, self.target[0], self.target[1], self.target[2], 0, 1, 0)
+        glMultMatrixf(self.view_matrix())
 
 # ---------------- OpenGL helpers ----------------
 def gl_init():
@@ -65,46 +86,83 @@ def set_ortho(w, h):
     glOrtho(0, w, h, 0, -1, 1)  # y-down to match pygame
     glMatrixMode(GL_MODELVIEW); glLoadIdentity()
 
-def glut_like_cube():
-    glBegin(GL_QUADS)
-    # +Y
-    glNormal3f(0,1,0)
-    glVertex3f(-.5,.5,-.5); glVertex3f(.5,.5,-.5); glVertex3f(.5,.5,.5); glVertex3f(-.5,.5,.5)
-    # -Y
-    glNormal3f(0,-1,0)
-    glVertex3f(-.5,-.5,.5); glVertex3f(.5,-.5,.5); glVertex3f(.5,-.5,-.5); glVertex3f(-.5,-.5,-.5)
-    # +X
-    glNormal3f(1,0,0)
-    glVertex3f(.5,-.5,-.5); glVertex3f(.5,-.5,.5); glVertex3f(.5,.5,.5); glVertex3f(.5,.5,-.5)
-    # -X
-    glNormal3f(-1,0,0)
-    glVertex3f(-.5,-.5,.5); glVertex3f(-.5,-.5,-.5); glVertex3f(-.5,.5,-.5); glVertex3f(-.5,.5,.5)
-    # +Z
-    glNormal3f(0,0,1)
-    glVertex3f(-.5,-.5,.5); glVertex3f(.5,-.5,.5); glVertex3f(.5,.5,.5); glVertex3f(-.5,.5,.5)
-    # -Z
-    glNormal3f(0,0,-1)
-    glVertex3f(.5,-.5,-.5); glVertex3f(-.5,-.5,-.5); glVertex3f(-.5,.5,-.5); glVertex3f(.5,.5,-.5)
-    glEnd()
-
-def draw_cube(x, y, z, s=1.0, color=(0.4,0.8,0.4,1)):
-    glPushMatrix()
-    glTranslatef(x, y, z)
-    glScalef(s, s, s)
-    glColor4f(*color)
-    glut_like_cube()
-    glPopMatrix()
-
-def draw_ground(sim):
-    glDisable(GL_LIGHTING)
-    glColor4f(0.15,0.15,0.15,1)
-    glBegin(GL_LINES)
-    for x in range(sim.w+1):
-        glVertex3f(x, 0, 0); glVertex3f(x, 0, sim.h)
-    for z in range(sim.h+1):
-        glVertex3f(0, 0, z); glVertex3f(sim.w, 0, z)
-    glEnd()
-    glEnable(GL_LIGHTING)
+# Unit cube as 24 quad vertices (+Y, -Y, +X, -X, +Z, -Z faces)
+CUBE_VERTS = np.array([
+    (-.5,.5,-.5), (.5,.5,-.5), (.5,.5,.5), (-.5,.5,.5),        # +Y
+    (-.5,-.5,.5), (.5,-.5,.5), (.5,-.5,-.5), (-.5,-.5,-.5),    # -Y
+    (.5,-.5,-.5), (.5,-.5,.5), (.5,.5,.5), (.5,.5,-.5),        # +X
+    (-.5,-.5,.5), (-.5,-.5,-.5), (-.5,.5,-.5), (-.5,.5,.5),    # -X
+    (-.5,-.5,.5), (.5,-.5,.5), (.5,.5,.5), (-.5,.5,.5),        # +Z
+    (.5,-.5,-.5), (-.5,-.5,-.5), (-.5,.5,-.5), (.5,.5,-.5),    # -Z
+], dtype=np.float32)
+CUBE_NORMALS = np.repeat(np.array([
+    (0,1,0), (0,-1,0), (1,0,0), (-1,0,0), (0,0,1), (0,0,-1),
+], dtype=np.float32), 4, axis=0)
+
+class CubeBatch:
+    """Many colored cubes streamed into one interleaved VBO and drawn with a single glDrawArrays.
+
+    The scene uses fixed-function lighting, so cubes are expanded to per-vertex
+    position/normal/color on the CPU (NumPy broadcast) instead of GPU instancing.
+    """
+    STRIDE = 10 * 4  # xyz, normal, rgba (float32)
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = np.zeros((capacity, 24, 10), dtype=np.float32)
+        self.data[:, :, 3:6] = CUBE_NORMALS
+        self.vbo = vbo.VBO(self.data, usage=GL_STREAM_DRAW)
+        self.count = 0
+
+    def update(self, centers, scales, colors):
+        """centers (N,3), scales (N,), colors (N,4) → rewrite the first N cubes."""
+        n = min(len(centers), self.capacity)
+        out = self.data[:n]
+        np.multiply(CUBE_VERTS[None, :, :], np.asarray(scales[:n], np.float32)[:, None, None], out=out[:, :, 0:3])
+        out[:, :, 0:3] += np.asarray(centers[:n], np.float32)[:, None, :]
+        out[:, :, 6:10] = np.asarray(colors[:n], np.float32)[:, None, :]
+        self.count = n
+        self.vbo.set_array(self.data[:max(1, n)])
+
+    def draw(self):
+        if self.count == 0: return
+        self.vbo.bind()
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, self.STRIDE, self.vbo)
+        glNormalPointer(GL_FLOAT, self.STRIDE, self.vbo + 12)
+        glColorPointer(4, GL_FLOAT, self.STRIDE, self.vbo + 24)
+        glDrawArrays(GL_QUADS, 0, self.count * 24)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        self.vbo.unbind()
+
+def ground_line_verts(w, h):
+    """(2*(w+h+2), 3) float32 endpoints of the ground grid lines (y = 0 plane)."""
+    xs = np.arange(w+1, dtype=np.float32); zs = np.arange(h+1, dtype=np.float32)
+    along_z = np.stack([np.repeat(xs, 2), np.zeros(2*(w+1)), np.tile([0, h], w+1)], axis=1)
+    along_x = np.stack([np.tile([0, w], h+1), np.zeros(2*(h+1)), np.repeat(zs, 2)], axis=1)
+    return np.concatenate([along_z, along_x]).astype(np.float32)
+
+class GroundGrid:
+    """Static ground grid: vertices uploaded once, one glDrawArrays per frame."""
+    def __init__(self, w, h):
+        verts = ground_line_verts(w, h)
+        self.count = len(verts)
+        self.vbo = vbo.VBO(verts)
+
+    def draw(self):
+        glDisable(GL_LIGHTING)
+        glColor4f(0.15,0.15,0.15,1)
+        self.vbo.bind()
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, self.vbo)
+        glDrawArrays(GL_LINES, 0, self.count)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        self.vbo.unbind()
+        glEnable(GL_LIGHTING)
 
 # ---------------- Color helpers ----------------
 def health_to_color_rgb(health: float):
@@ -122,6 +180,38 @@ def health_to_color_rgb(health: float):
         b = int( 80 + ( 90- 80)*t)
     return (r,g,b)
 
+# 256-entry health → RGB lookup table; index with health_lut_index(health)
+HEALTH_LUT = np.array([health_to_color_rgb(i/255.0) for i in range(256)], dtype=np.uint8)
+
+def health_lut_index(health):
+    return (np.clip(health, 0.0, 1.0)*255).astype(np.uint8)
+
+def health_gradient_array(width, height):
+    """(width, height, 3) uint8 strip running 0 → 1 health left to right."""
+    cols = HEALTH_LUT[np.linspace(0, 255, max(1, width)).astype(np.uint8)]
+    return np.repeat(cols[:, None, :], height, axis=1)
+
+@functools.lru_cache(maxsize=8)
+def health_gradient_surface(width, height):
+    """Static legend strip, baked once per size and reused every frame."""
+    return pygame.surfarray.make_surface(health_gradient_array(width, height))
+
+@functools.lru_cache(maxsize=8)
+def solid_panel(width, height, rgba):
+    panel = pygame.Surface((width, height), SRCALPHA)
+    panel.fill(rgba)
+    return panel
+
+@functools.lru_cache(maxsize=8)
+def mult_lines(items):
+    """'key: value' HUD lines for the first 10 (key, multiplier) pairs, formatted once per set."""
+    lines = []
+    for k, v in items[:10]:
+        try: vv = f"{float(v):.2f}"
+        except Exception: vv = str(v)
+        lines.append(f"{k}: {vv}")
+    return tuple(lines)
+
 def agent_color(i: int):
     palette = [
         (70,160,255), (255,120,70), (120,220,120), (200,120,220),
@@ -129,20 +219,29 @@ def agent_color(i: int):
     ]
     return palette[i % len(palette)]
 
+@functools.lru_cache(maxsize=4)
+def agent_rgba(n):
+    """(n, 4) float32 cube colours of agents 0..n-1, built once per agent count."""
+    return np.array([(*agent_color(i), 255) for i in range(n)], dtype=np.float32).reshape(-1, 4) / 255.0
+
 # ---------------- 3D scene ----------------
-def draw_scene_3d(sim):
-    for y in range(sim.h):
-        for x in range(sim.w):
-            c = sim.grid[x][y]
-            h = max(0.0, min(1.0, c.growth)) * 0.8
-            if h <= 0.02:
-                continue
-            health = c.health()
-            col = (0.2 + 0.8*health, 0.35 + 0.4*health, 0.2, 1)
-            draw_cube(x+0.5, h/2.0, y+0.5, s=1.0, color=col)
-    for i, a in enumerate(sim.agents):
-        r,g,b = agent_color(i)
-        draw_cube(a.x+0.5, 0.5, a.y+0.5, s=0.7, color=(r/255.0,g/255.0,b/255.0,1))
+def draw_scene_3d(sim, batch: CubeBatch):
+    health = sim.health()  # (w,h)
+    h = np.clip(sim.growth, 0.0, 1.0) * 0.8
+    xs, ys = np.nonzero(h > 0.02)
+    hv, hl = h[xs, ys], health[xs, ys]
+    crop_centers = np.stack([xs + 0.5, hv / 2.0, ys + 0.5], axis=1)
+    crop_colors = np.stack([0.2 + 0.8*hl, 0.35 + 0.4*hl, np.full_like(hl, 0.2), np.ones_like(hl)], axis=1)
+
+    pool = sim.agents  # SoA: positions straight from the pool arrays, no per-agent objects
+    agent_centers = np.stack([pool.x + 0.5, np.full(len(pool), 0.5), pool.y + 0.5], axis=1).astype(np.float32)
+    agent_colors = agent_rgba(len(pool))
+
+    centers = np.concatenate([crop_centers, agent_centers])
+    scales = np.concatenate([np.ones(len(crop_centers), np.float32), np.full(len(agent_centers), 0.7, np.float32)])
+    colors = np.concatenate([crop_colors, agent_colors])
+    batch.update(centers, scales, colors)
+    batch.draw()
 
 # ---------------- 2D scene ----------------
 def draw_2d_surface(surface, sim, font, font_small):
@@ -152,38 +251,54 @@ def draw_2d_surface(surface, sim, font, font_small):
     cw = max(2, min(cell_w, cell_h))
     ox, oy = 8, 8
 
-    # grid
-    for y in range(sim.h):
-        for x in range(sim.w):
-            rx = ox + x*cw
-            ry = oy + y*cw
-            c = sim.grid[x][y]
-            col = health_to_color_rgb(c.health())
-            pygame.draw.rect(surface, col, (rx, ry, cw-1, cw-1))
+    # grid + bases + agents rasterized into one (x, y, rgb) image, uploaded with a single blit_array
+    img = HEALTH_LUT[health_lut_index(sim.health())]                    # (w, h, 3)
+    img = np.repeat(np.repeat(img, cw, axis=0), cw, axis=1)             # (w*cw, h*cw, 3)
+    img[cw-1::cw, :] = (24, 26, 27)                                     # 1px cell gaps
+    img[:, cw-1::cw] = (24, 26, 27)
 
-    # bases
+    # bases (2px outline)
     for (bx, by) in BASE_LOCATIONS:
-        rx = ox + bx*cw; ry = oy + by*cw
-        pygame.draw.rect(surface, (90,90,90), (rx, ry, cw-1, cw-1), width=2)
+        rx, ry = bx*cw, by*cw
+        img[rx:rx+cw-1, ry:ry+2] = img[rx:rx+cw-1, ry+cw-3:ry+cw-1] = (90,90,90)
+        img[rx:rx+2, ry:ry+cw-1] = img[rx+cw-3:rx+cw-1, ry:ry+cw-1] = (90,90,90)
 
     # agents
     for i, a in enumerate(sim.agents):
-        rx = ox + a.x*cw; ry = oy + a.y*cw
-        pygame.draw.rect(surface, agent_color(i), (rx+2, ry+2, cw-5, cw-5))
+        rx, ry = a.x*cw, a.y*cw
+        img[rx+2:rx+cw-3, ry+2:ry+cw-3] = agent_color(i)
+
+    gw = min(img.shape[0], surface.get_width()-ox); gh = min(img.shape[1], surface.get_height()-oy)
+    pygame.surfarray.blit_array(surface.subsurface((ox, oy, gw, gh)), img[:gw, :gh])
 
     # footer: small health gradient
     footer_h = 24
     gx, gy = 10, surface.get_height()-footer_h-6
     grad_w = max(80, surface.get_width()-20)
-    grad = pygame.Surface((grad_w, 10), SRCALPHA)
-    for ix in range(grad_w):
-        col = health_to_color_rgb(ix/float(max(1, grad_w-1)))
-        pygame.draw.line(grad, col, (ix, 0), (ix, 10))
-    surface.blit(grad, (gx, gy))
-    surface.blit(font_small.render("Crop health 0 → 1", True, (210,210,210)), (gx, gy+12))
+    surface.blit(health_gradient_surface(grad_w, 10), (gx, gy))
+    surface.blit(render_text(font_small, "Crop health 0 → 1", (210,210,210)), (gx, gy+12))
 
 # ---------------- HUD (legend + text) ----------------
-def draw_hud_surface(surface, sim: FarmSimulator, font, font_small, llm_summary, llm_mult):
+@dataclass(frozen=True)
+class HUDCaps:
+    """Which optional weather/sim readouts exist, probed once instead of hasattr() every redraw."""
+    temp: bool
+    humidity: bool
+    rain: bool
+    wind: bool
+    sustainability: bool
+    biodiversity: bool
+
+    @classmethod
+    def probe(cls, sim):
+        wx = sim.weather
+        return cls(hasattr(wx, "temp"), hasattr(wx, "humidity"), hasattr(wx, "rain"),
+                   hasattr(wx, "wind_dx") and hasattr(wx, "wind_dy"),
+                   hasattr(sim, "sustainability_index"), hasattr(sim, "biodiversity_score"))
+
+def draw_hud_surface(surface, sim: FarmSimulator, font, font_small, llm_summary, llm_mult, caps=None):
+    if caps is None:
+        caps = HUDCaps.probe(sim)
     # normalize inputs
     if isinstance(llm_summary, (list, tuple)):
         llm_text = " ".join(map(str, llm_summary))
@@ -196,17 +311,15 @@ def draw_hud_surface(surface, sim: FarmSimulator, font, font_small, llm_summary,
 
     W, H = surface.get_width(), surface.get_height()
     surface.fill((0,0,0,0))  # transparent
-    panel = pygame.Surface((W, H), SRCALPHA)
-    panel.fill((12,12,14,210))  # semi-transparent panel
-    surface.blit(panel, (0,0))
+    surface.blit(solid_panel(W, H, (12,12,14,210)), (0,0))  # semi-transparent panel
 
     y = 12
     def title(t): 
         nonlocal y
-        surface.blit(font.render(t, True, (240,240,240)), (14, y)); y += 26
+        surface.blit(render_text(font, t, (240,240,240)), (14, y)); y += 26
     def kv(k,v):
         nonlocal y
-        surface.blit(font_small.render(f"{k}: {v}", True, (210,210,210)), (18, y)); y += 20
+        surface.blit(render_text(font_small, f"{k}: {v}", (210,210,210)), (18, y)); y += 20
     def sep(): 
         nonlocal y
         pygame.draw.line(surface, (70,70,80), (12, y+6), (W-12, y+6), 1); y += 16
@@ -214,61 +327,48 @@ def draw_hud_surface(surface, sim: FarmSimulator, font, font_small, llm_summary,
     # Legend
     title("Legend")
     grad_w = W-28; grad_h = 14
-    grad_surf = pygame.Surface((grad_w, grad_h), SRCALPHA)
-    for ix in range(grad_w):
-        col = health_to_color_rgb(ix/float(max(1, grad_w-1)))
-        pygame.draw.line(grad_surf, col, (ix, 0), (ix, grad_h))
-    surface.blit(grad_surf, (14, y))
-    surface.blit(font_small.render("Crop Health 0 → 1", True, (200,200,200)), (14, y+grad_h+4))
+    surface.blit(health_gradient_surface(grad_w, grad_h), (14, y))
+    surface.blit(render_text(font_small, "Crop Health 0 → 1", (200,200,200)), (14, y+grad_h+4))
     y += grad_h + 26
-    surface.blit(font_small.render("Agents:", True, (200,200,200)), (14, y)); y += 18
+    surface.blit(render_text(font_small, "Agents:", (200,200,200)), (14, y)); y += 18
     for i in range(min(NUM_AGENTS, 8)):
         c = agent_color(i)
         pygame.draw.rect(surface, c, (18, y+2, 14, 14))
-        surface.blit(font_small.render(f"Agent {i}", True, (200,200,200)), (38, y))
+        surface.blit(render_text(font_small, f"Agent {i}", (200,200,200)), (38, y))
         y += 18
     sep()
 
     # Weather (live)
     title("Weather")
-    if hasattr(sim.weather, "temp"): kv("Temp", f"{sim.weather.temp:.1f} °C")
-    if hasattr(sim.weather, "humidity"): kv("Humidity", f"{sim.weather.humidity:.2f}")
-    if hasattr(sim.weather, "rain"): kv("Rain", f"{sim.weather.rain:.2f}")
-    if hasattr(sim.weather, "wind_dx") and hasattr(sim.weather, "wind_dy"):
-        kv("Wind", f"({sim.weather.wind_dx:.2f}, {sim.weather.wind_dy:.2f})")
+    wx = sim.weather
+    if caps.temp: kv("Temp", f"{wx.temp:.1f} °C")
+    if caps.humidity: kv("Humidity", f"{wx.humidity:.2f}")
+    if caps.rain: kv("Rain", f"{wx.rain:.2f}")
+    if caps.wind: kv("Wind", f"({wx.wind_dx:.2f}, {wx.wind_dy:.2f})")
     sep()
 
     # LLM Advisory
     title("LLM Advisory")
-    wrap, line, maxw = [], "", W-28
-    for w in llm_text.split():
-        t = line + (" " if line else "") + w
-        if font_small.size(t)[0] > maxw:
-            wrap.append(line); line = w
-        else:
-            line = t
-    if line: wrap.append(line)
+    wrap = wrap_lines(llm_text, W-28, font_small)
     for s in wrap[:10]:
-        surface.blit(font_small.render(s, True, (210,210,210)), (14, y)); y += 18
+        surface.blit(render_text(font_small, s, (210,210,210)), (14, y)); y += 18
     if len(wrap) > 10:
-        surface.blit(font_small.render("…", True, (210,210,210)), (14, y)); y += 18
+        surface.blit(render_text(font_small, "…", (210,210,210)), (14, y)); y += 18
 
     y += 4
-    surface.blit(font_small.render("Multipliers:", True, (200,200,200)), (14, y)); y += 18
-    for k,v in list(llm_mult.items())[:10]:
-        try: vv = f"{float(v):.2f}"
-        except Exception: vv = str(v)
-        surface.blit(font_small.render(f"{k}: {vv}", True, (210,210,210)), (24, y)); y += 18
+    surface.blit(render_text(font_small, "Multipliers:", (200,200,200)), (14, y)); y += 18
+    for line in mult_lines(tuple(llm_mult.items())):
+        surface.blit(render_text(font_small, line, (210,210,210)), (24, y)); y += 18
     sep()
 
     # Sustainability
     title("Sustainability")
-    if hasattr(sim, "sustainability_index"):
+    if caps.sustainability:
         kv("Index", f"{sim.sustainability_index():.3f}")
     kv("Total Yield", f"{sim.total_yield:.1f}")
     kv("Water Used", f"{sim.total_water_used:.1f}")
     kv("Chem Used", f"{sim.total_chem_used:.1f}")
-    if hasattr(sim, "biodiversity_score"):
+    if caps.biodiversity:
         kv("Biodiversity", f"{sim.biodiversity_score:.2f}")
     sep()
 
@@ -281,20 +381,28 @@ def draw_hud_surface(surface, sim: FarmSimulator, font, font_small, llm_summary,
         "Right-drag: Orbit     Wheel: Zoom",
         "Esc: Quit"
     ]:
-        surface.blit(font_small.render(line, True, (210,210,210)), (14, y)); y += 18
+        surface.blit(render_text(font_small, line, (210,210,210)), (14, y)); y += 18
+
+def hud_state(sim):
+    """Everything the HUD shows that can change between frames; equal keys → identical HUD."""
+    wx = sim.weather
+    return (getattr(wx, "temp", None), getattr(wx, "humidity", None), getattr(wx, "rain", None),
+            getattr(wx, "wind_dx", None), getattr(wx, "wind_dy", None),
+            sim.total_yield, sim.total_water_used, sim.total_chem_used,
+            getattr(sim, "biodiversity_score", None))
 
 # ---------------- Status Bar (top, across window) ----------------
 def draw_status_bar(surface, font, ticks, fps, num_agents):
     W, H = surface.get_width(), surface.get_height()
     surface.fill((0,0,0,0))
-    bar = pygame.Surface((W, H), SRCALPHA)
-    bar.fill((15,15,18,215))
-    surface.blit(bar, (0,0))
+    surface.blit(solid_panel(W, H, (15,15,18,215)), (0,0))
     text = f"Ticks: {ticks}    FPS cap: {fps}    Agents: {num_agents}"
-    surface.blit(font.render(text, True, (235,235,235)), (12, 4))
+    surface.blit(render_text(font, text, (235,235,235)), (12, 4))
 
 # ---------------- Texture wrapper ----------------
 class SurfaceTexture:
+    """Texture fed from a 32-bit Pygame surface through two ping-pong PBOs:
+    while the GPU pulls last frame's buffer we fill the other one."""
     def __init__(self, width, height):
         self.tex_id = glGenTextures(1)
         glBindTexture(GL_TEXTURE_2D, self.tex_id)
@@ -302,23 +410,68 @@ class SurfaceTexture:
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
         glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
         self.w, self.h = width, height
+        self.nbytes = width * height * 4
+        self.pbos = glGenBuffers(2)
+        for pbo in self.pbos:
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, pbo)
+            glBufferData(GL_PIXEL_UNPACK_BUFFER, self.nbytes, None, GL_STREAM_DRAW)
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+        self.frame = 0
+
+    @staticmethod
+    def pixel_format(surf):
+        # native byte order of the surface -> GL format (None if not uploadable as-is)
+        if surf.get_bytesize() != 4: return None
+        rmask, gmask, bmask, _ = surf.get_masks()
+        if (rmask, gmask, bmask) == (0xff, 0xff00, 0xff0000): return GL_RGBA
+        if (rmask, gmask, bmask) == (0xff0000, 0xff00, 0xff): return GL_BGRA
+        return None
+
     def update_from_surface(self, surf):
-        data = pygame.image.tostring(surf, "RGBA", False)  # keep orientation
+        fmt = self.pixel_format(surf)
+        if fmt is None:  # odd pixel layout: let pygame convert, upload directly
+            glBindTexture(GL_TEXTURE_2D, self.tex_id)
+            glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+            glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, self.w, self.h, GL_RGBA, GL_UNSIGNED_BYTE,
+                            pygame.image.tostring(surf, "RGBA", False))
+            return
+        pbo = self.pbos[self.frame % 2]; self.frame += 1
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, pbo)
+        ptr = glMapBufferRange(GL_PIXEL_UNPACK_BUFFER, 0, self.nbytes, GL_MAP_WRITE_BIT | GL_MAP_INVALIDATE_BUFFER_BIT)
+        if not ptr:  # mapping failed: keep last frame's texture rather than upload an unfilled buffer
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+            return
+        # copy straight out of the surface's pixels into a tight w*h buffer; the (w, h) view
+        # carries the pitch as its row stride, so padded rows are skipped (one memcpy when unpadded)
+        dst = np.ctypeslib.as_array((ctypes.c_uint32 * (self.w * self.h)).from_address(ptr)).reshape(self.h, self.w)
+        src = np.asarray(surf.get_view("2"))
+        dst[:] = src.T
+        del src  # releases the view's lock on the surface
+        glUnmapBuffer(GL_PIXEL_UNPACK_BUFFER)
         glBindTexture(GL_TEXTURE_2D, self.tex_id)
         glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
-        glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, self.w, self.h, GL_RGBA, GL_UNSIGNED_BYTE, data)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, self.w, self.h, fmt, GL_UNSIGNED_BYTE, None)  # DMA from the PBO
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+
     def draw_rect(self, x, y, w, h):
-        glDisable(GL_DEPTH_TEST); glDisable(GL_LIGHTING)
-        glEnable(GL_TEXTURE_2D); glBindTexture(GL_TEXTURE_2D, self.tex_id)
-        vp_w, vp_h = glGetIntegerv(GL_VIEWPORT)[2], glGetIntegerv(GL_VIEWPORT)[3]
-        set_ortho(vp_w, vp_h)
+        """Textured quad in window pixels; call between begin_overlay()/end_overlay()."""
+        glBindTexture(GL_TEXTURE_2D, self.tex_id)
         glBegin(GL_QUADS)  # texcoords so text appears upright
         glTexCoord2f(0,0); glVertex2f(x,   y)      # top-left
         glTexCoord2f(1,0); glVertex2f(x+w, y)      # top-right
         glTexCoord2f(1,1); glVertex2f(x+w, y+h)    # bottom-right
         glTexCoord2f(0,1); glVertex2f(x,   y+h)    # bottom-left
         glEnd()
-        glDisable(GL_TEXTURE_2D); glEnable(GL_LIGHTING); glEnable(GL_DEPTH_TEST)
+
+def begin_overlay(vp_w, vp_h):
+    """One 2D pass over a vp_w x vp_h viewport (the caller's glViewport) for all textured panels."""
+    glDisable(GL_DEPTH_TEST); glDisable(GL_LIGHTING)
+    glEnable(GL_TEXTURE_2D)
+    glColor4f(1, 1, 1, 1)  # GL_MODULATE: don't tint panels with the last scene color
+    set_ortho(vp_w, vp_h)
+
+def end_overlay():
+    glDisable(GL_TEXTURE_2D); glEnable(GL_LIGHTING); glEnable(GL_DEPTH_TEST)
 
 # ---------------- Main ----------------
 def build_controllers(mode="rule"):
@@ -349,6 +502,9 @@ def main():
     font_small = pygame.font.SysFont("consolas", 16)
 
     sim = FarmSimulator()  # creates sim.agents
+    hud_caps = HUDCaps.probe(sim)
+    scene_batch = CubeBatch(sim.w*sim.h + len(sim.agents))
+    ground = GroundGrid(sim.w, sim.h)
 
     # LLM advisory (robust)
     report = ("Weather bulletin: heatwave expected; humidity moderate. "
@@ -369,11 +525,19 @@ def main():
     paused = False
     cam = OrbitCamera()
     clock = pygame.time.Clock()
+    hud_key = None  # hud_state() at the last HUD redraw
+    bar_key = map_tick = frame_key = None  # (ticks, fps) / sim tick / full frame inputs at the last redraw
 
     running = True
     while running:
-        # events
+        # events; mouse motion is summed and applied to the camera once per frame
+        motion_rel, motion_buttons = [0, 0], None
+        handled = 0  # bound keys and window exposes; camera moves show up in the frame state below
         for event in pygame.event.get():
+            if motion_buttons is not None and event.type in (MOUSEBUTTONDOWN, MOUSEBUTTONUP):
+                # apply the drag summed so far before the button state changes
+                cam.handle_motion(None, motion_buttons, motion_rel)
+                motion_rel, motion_buttons = [0, 0], None
             if event.type == QUIT: running = False
             elif event.type == KEYDOWN:
                 if event.key == K_ESCAPE: running = False
@@ -396,6 +560,8 @@ def main():
                 elif event.key == K_d:
                     sim.weather.rain = 0.0
                     if hasattr(sim.weather, "humidity"): sim.weather.humidity = max(0.0, HUMID_MEAN - 0.25)
+                else: continue
+                handled += 1
             elif event.type == MOUSEBUTTONDOWN:
                 if event.button == 3: cam.begin_drag(pygame.mouse.get_pos())
                 elif event.button == 4: cam.zoom(+1)
@@ -403,51 +569,62 @@ def main():
             elif event.type == MOUSEBUTTONUP:
                 if event.button == 3: cam.end_drag()
             elif event.type == MOUSEMOTION:
-                cam.handle_motion(pygame.mouse.get_pos(), pygame.mouse.get_pressed(), event.rel)
+                # a drag shows up as a camera change in the frame state below; hovering changes nothing
+                motion_rel[0] += event.rel[0]; motion_rel[1] += event.rel[1]
+                motion_buttons = event.buttons
+            elif event.type in (VIDEOEXPOSE, WINDOWEXPOSED, WINDOWSHOWN, WINDOWRESTORED):
+                handled += 1  # the window was covered or hidden: present the frame again
+        if motion_buttons is not None:
+            cam.handle_motion(None, motion_buttons, motion_rel)
 
         # update
         if not paused and sim.ticks % move_every == 0:
-            for i, ctrl in enumerate(controllers):
-                action, (dx, dy) = ctrl.act(sim)
-                move_agent(sim, i, dx, dy)
-                sim.apply_action(i, action)
-                a = sim.agents[i]
-                if (a.x, a.y) in BASE_LOCATIONS and action == "idle":
-                    a.battery = min(MAX_BATTERY, a.battery + BATTERY_RECHARGE_PER_TICK)
+            sim.step_agents(controllers)
 
         if not paused:
             sim.step()
 
+        # Paused with no handled input and an unmoved camera: the shown frame is still current, skip the redraw
+        key = hud_state(sim)
+        state = (sim.ticks, fps, cam.yaw, cam.pitch, cam.distance, key)
+        if paused and not handled and state == frame_key:
+            clock.tick(fps)
+            continue
+        frame_key = state
+
         # render: clear once
         glViewport(0, 0, W, H)
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
 
-        # Top bar (across window)
-        draw_status_bar(bar_surface, font_small, sim.ticks, fps, len(sim.agents))
-        bar_tex.update_from_surface(bar_surface)
-        glViewport(0, 0, W, topbar_h)
-        bar_tex.draw_rect(0, 0, W, topbar_h)
-
-        # Left: 2D → texture (left half, below status bar)
-        draw_2d_surface(surf2d, sim, font, font_small)
-        tex2d.update_from_surface(surf2d)
-        glViewport(0, 0, left_w, H)  # set left viewport
-        tex2d.draw_rect(0, topbar_h, left_w, H-topbar_h)
+        # Update panel textures only when what they show changes; otherwise redraw last upload
+        if (sim.ticks, fps) != bar_key:
+            draw_status_bar(bar_surface, font_small, sim.ticks, fps, len(sim.agents))
+            bar_tex.update_from_surface(bar_surface)
+            bar_key = (sim.ticks, fps)
+        if sim.ticks != map_tick:
+            draw_2d_surface(surf2d, sim, font, font_small)
+            tex2d.update_from_surface(surf2d)
+            map_tick = sim.ticks
+        if key != hud_key:
+            draw_hud_surface(hud_surface, sim, font, font_small, llm_summary, llm_mult, hud_caps)
+            hud_tex.update_from_surface(hud_surface)
+            hud_key = key
 
         # Right: 3D world (right half, full height)
         glViewport(left_w, 0, right_w, H)
         set_perspective(right_w, H)
         glLoadIdentity()
         cam.apply()
-        draw_ground(sim)
-        draw_scene_3d(sim)
+        ground.draw()
+        draw_scene_3d(sim, scene_batch)
 
-        # Right overlay: HUD panel (right side, below status bar)
-        draw_hud_surface(hud_surface, sim, font, font_small, llm_summary, llm_mult)
-        hud_tex.update_from_surface(hud_surface)
-        glViewport(left_w, 0, right_w, H)
-        hud_x = right_w - hud_w
-        hud_tex.draw_rect(hud_x, topbar_h, hud_w, H-topbar_h)
+        # Overlays in one pass: top bar, 2D map (left half), HUD panel (right side)
+        glViewport(0, 0, W, H)
+        begin_overlay(W, H)
+        bar_tex.draw_rect(0, 0, W, topbar_h)
+        tex2d.draw_rect(0, topbar_h, left_w, H-topbar_h)
+        hud_tex.draw_rect(W - hud_w, topbar_h, hud_w, H-topbar_h)
+        end_overlay()
 
         pygame.display.flip()
         clock.tick(fps)
@@ -1,6 +1,8 @@
 # llm_parser.py — LLM weather/disease parser (expanded with more weather constraints)
 
+import re
 from typing import Dict, List
+import numpy as np
 
 def _k(s: List[str], out_key: str, mult: float, msg: str):
     return {"syn": s, "key": out_key, "mult": mult, "msg": msg}
@@ -63,16 +65,52 @@ BASELINE = {
     "fertilize_multiplier": 1.0,
 }
 
+# All synonyms compiled into one alternation so the report is scanned once.
+# The lookahead lets a match start at every position; alternatives are tried
+# longest first, and _SYN_RULES maps the matched synonym to the rules of every
+# synonym that is a prefix of it (those also occur at that position).
+_SYN_RULE = {}
+for _ri, _r in enumerate(RULES):
+    for _s in _r["syn"]:
+        _SYN_RULE.setdefault(_s, set()).add(_ri)
+_SYN_RE = re.compile("(?=(%s))" % "|".join(map(re.escape, sorted(_SYN_RULE, key=len, reverse=True))))
+_SYN_RULES = {s: frozenset().union(*(ri for p, ri in _SYN_RULE.items() if s.startswith(p))) for s in _SYN_RULE}
+
+# Rule table flattened for the multiplier reduction
+KEY_IDX = {k: i for i, k in enumerate(BASELINE)}
+R_KEY = np.array([KEY_IDX[r["key"]] for r in RULES], dtype=np.int8)
+R_MULT = np.array([r["mult"] for r in RULES], dtype=np.float64)
+R_UP = R_MULT >= 1.0
+
+def reduce_multipliers(hits) -> Dict:
+    """Fold hit rules (in RULES order) into the multiplier dict.
+
+    Applied in order, a boost is max(curr, m>=1) and a cut is min(curr, m<1), so
+    each key ends at the max/min of its last run of same-direction rules.
+    """
+    out = np.array(list(BASELINE.values()), dtype=np.float64)
+    h = np.fromiter(sorted(hits), dtype=np.intp, count=len(hits))
+    if len(h):
+        keys, up, pos = R_KEY[h], R_UP[h], np.arange(len(h))
+        last = np.full((len(KEY_IDX), 2), -1, dtype=np.intp)  # last position per (key, is_boost)
+        np.maximum.at(last, (keys, up.astype(np.intp)), pos)
+        run = pos > last[keys, (~up).astype(np.intp)]         # no later rule pulls the other way
+        np.maximum.at(out, keys[run & up], R_MULT[h][run & up])
+        np.minimum.at(out, keys[run & ~up], R_MULT[h][run & ~up])
+    return {k: float(out[i]) for k, i in KEY_IDX.items()}
+
+def matched_rules(text: str):
+    """Indices of RULES with at least one synonym occurring in (lower-cased) text."""
+    hits = set()
+    for m in _SYN_RE.finditer(text):
+        hits |= _SYN_RULES[m.group(1)]
+    return hits
+
 def parse_report(report_text: str) -> Dict:
     text = (report_text or "").lower()
-    multipliers = dict(BASELINE)
-    suggestions = []
-    for r in RULES:
-        if any(tok in text for tok in r["syn"]):
-            k=r["key"]; curr=multipliers.get(k,1.0)
-            if r["mult"]>=1.0: multipliers[k]=max(curr,r["mult"])
-            else: multipliers[k]=min(curr,r["mult"])
-            suggestions.append(r["msg"])
+    hits = matched_rules(text)
+    multipliers = reduce_multipliers(hits)
+    suggestions = [RULES[ri]["msg"] for ri in sorted(hits)]
     if not suggestions:
         suggestions.append("No special alerts — follow standard best practices.")
     seen=set(); brief=[]
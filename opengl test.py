@@ -7,54 +7,33 @@ import pygame
 from pygame.locals import DOUBLEBUF, OPENGL
 from OpenGL.GL import *
 from OpenGL.GLU import *
-import math
-
-def draw_cube():
-    glBegin(GL_QUADS)
-
-    # Front face (red)
-    glColor3f(1, 0, 0)
-    glVertex3f(-1, -1,  1)
-    glVertex3f( 1, -1,  1)
-    glVertex3f( 1,  1,  1)
-    glVertex3f(-1,  1,  1)
-
-    # Back face (green)
-    glColor3f(0, 1, 0)
-    glVertex3f(-1, -1, -1)
-    glVertex3f(-1,  1, -1)
-    glVertex3f( 1,  1, -1)
-    glVertex3f( 1, -1, -1)
-
-    # Top face (blue)
-    glColor3f(0, 0, 1)
-    glVertex3f(-1,  1, -1)
-    glVertex3f(-1,  1,  1)
-    glVertex3f( 1,  1,  1)
-    glVertex3f( 1,  1, -1)
-
-    # Bottom face (yellow)
-    glColor3f(1, 1, 0)
-    glVertex3f(-1, -1, -1)
-    glVertex3f( 1, -1, -1)
-    glVertex3f( 1, -1,  1)
-    glVertex3f(-1, -1,  1)
-
-    # Right face (magenta)
-    glColor3f(1, 0, 1)
-    glVertex3f( 1, -1, -1)
-    glVertex3f( 1,  1, -1)
-    glVertex3f( 1,  1,  1)
-    glVertex3f( 1, -1,  1)
-
-    # Left face (cyan)
-    glColor3f(0, 1, 1)
-    glVertex3f(-1, -1, -1)
-    glVertex3f(-1, -1,  1)
-    glVertex3f(-1,  1,  1)
-    glVertex3f(-1,  1, -1)
-
-    glEnd()
+import numpy as np
+from OpenGL.arrays import vbo
+
+# (corners, rgb) per face; each quad is split into two triangles
+FACES = [
+    ([(-1,-1, 1), ( 1,-1, 1), ( 1, 1, 1), (-1, 1, 1)], (1, 0, 0)),  # front (red)
+    ([(-1,-1,-1), (-1, 1,-1), ( 1, 1,-1), ( 1,-1,-1)], (0, 1, 0)),  # back (green)
+    ([(-1, 1,-1), (-1, 1, 1), ( 1, 1, 1), ( 1, 1,-1)], (0, 0, 1)),  # top (blue)
+    ([(-1,-1,-1), ( 1,-1,-1), ( 1,-1, 1), (-1,-1, 1)], (1, 1, 0)),  # bottom (yellow)
+    ([( 1,-1,-1), ( 1, 1,-1), ( 1, 1, 1), ( 1,-1, 1)], (1, 0, 1)),  # right (magenta)
+    ([(-1,-1,-1), (-1,-1, 1), (-1, 1, 1), (-1, 1,-1)], (0, 1, 1)),  # left (cyan)
+]
+
+def cube_vertices():
+    """(36, 6) float32: xyz + rgb for 12 triangles."""
+    return np.array([(*c[i], *rgb) for c, rgb in FACES for i in (0, 1, 2, 0, 2, 3)], dtype=np.float32)
+
+def draw_cube(cube_vbo):
+    cube_vbo.bind()
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_COLOR_ARRAY)
+    glVertexPointer(3, GL_FLOAT, 24, cube_vbo)
+    glColorPointer(3, GL_FLOAT, 24, cube_vbo + 12)
+    glDrawArrays(GL_TRIANGLES, 0, 36)
+    glDisableClientState(GL_COLOR_ARRAY)
+    glDisableClientState(GL_VERTEX_ARRAY)
+    cube_vbo.unbind()
 
 
 def main():
@@ -65,7 +44,10 @@ def main():
 
     gluPerspective(45, display[0] / display[1], 0.1, 50.0)
     glTranslatef(0.0, 0.0, -7)  # move back so cube is visible
+    glEnable(GL_DEPTH_TEST)
 
+    cube_vbo = vbo.VBO(cube_vertices())  # uploaded once
+    clock = pygame.time.Clock()
     angle = 0
 
     running = True
@@ -79,11 +61,11 @@ def main():
 
         glPushMatrix()
         glRotatef(angle, 1, 1, 0)  # rotate around X and Y
-        draw_cube()
+        draw_cube(cube_vbo)
         glPopMatrix()
 
         pygame.display.flip()
-        pygame.time.wait(16)  # ~60 FPS
+        clock.tick(60)
 
     pygame.quit()
 
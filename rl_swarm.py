@@ -4,7 +4,7 @@ import random
 from typing import List, Tuple
 import numpy as np
 from config import *
-from simulator import FarmSimulator
+from simulator import FarmSimulator, NO_CROP, compute_health
 
 rng = random.Random(SEED)
 MOVES = [(0,0),(1,0),(-1,0),(0,1),(0,-1)]
@@ -14,29 +14,34 @@ class RuleBasedAgent:
     def __init__(self, idx: int): self.idx = idx
     def act(self, sim: FarmSimulator):
         a = sim.agents[self.idx]
-        cell = sim.grid[a.x][a.y]
-        if cell.pest > 0.5: return "apply_pesticide", (0,0)
-        if cell.disease > 0.4: return "apply_fungicide", (0,0)
-        if cell.moisture < 0.35: return "irrigate", (0,0)
-        if cell.nutrient < 0.35: return "fertilize", (0,0)
-        if cell.crop and cell.growth > 0.85 and cell.health() > 0.6: return "harvest", (0,0)
+        xy = (a.x, a.y)
+        pest, disease, moisture, nutrient = sim.pest[xy], sim.disease[xy], sim.moisture[xy], sim.nutrient[xy]
+        if pest > 0.5: return "apply_pesticide", (0,0)
+        if disease > 0.4: return "apply_fungicide", (0,0)
+        if moisture < 0.35: return "irrigate", (0,0)
+        if nutrient < 0.35: return "fertilize", (0,0)
+        if (sim.crop[xy] != NO_CROP and sim.growth[xy] > 0.85
+                and compute_health(moisture, nutrient, pest, disease) > 0.6): return "harvest", (0,0)
         dx, dy = rng.choice(MOVES)
         return "monitor", (dx, dy)
 
+N_STATES = 4*4*4*4*5*2  # moisture, nutrient, pest, disease buckets (4 each) x growth (0..4) x has_crop
+
 class SimpleA2CAgent:
+    table = np.zeros((N_STATES, len(ACTIONS)))  # packed state -> action preferences, shared by every agent
     def __init__(self, idx: int, lr=0.05, gamma=0.99):
         self.idx = idx; self.lr=lr; self.gamma=gamma
-        self.table = {}; self.prev=None
+        self.prev=None
     def _state_hash(self, sim: FarmSimulator):
-        a=sim.agents[self.idx]; c=sim.grid[a.x][a.y]
-        def bucket(v): return int(clip(v,0,0.999)*4)
-        return (bucket(c.moisture), bucket(c.nutrient), bucket(c.pest), bucket(c.disease),
-                int(c.growth*4), 1 if c.crop else 0)
+        """Cell under the agent packed into one int in [0, N_STATES)."""
+        a=sim.agents[self.idx]; xy=(a.x,a.y)
+        m=min(3, max(0, int(sim.moisture[xy]*4))); n=min(3, max(0, int(sim.nutrient[xy]*4)))
+        p=min(3, max(0, int(sim.pest[xy]*4))); d=min(3, max(0, int(sim.disease[xy]*4)))
+        return ((((m*4 + n)*4 + p)*4 + d)*5 + int(sim.growth[xy]*4))*2 + int(sim.crop[xy]!=NO_CROP)
     def _policy(self, s):
-        prefs=self.table.get(s); 
-        if prefs is None: prefs={a:0.0 for a in ACTIONS}; self.table[s]=prefs
-        logits=np.array([prefs[a] for a in ACTIONS], dtype=float); logits-=logits.max()
-        return np.exp(logits)/np.exp(logits).sum()
+        prefs=self.table[s]  # action preferences indexed like ACTIONS
+        e=np.exp(prefs - prefs.max())
+        return e/e.sum()
     def act(self, sim: FarmSimulator):
         a=sim.agents[self.idx]
         if rng.random()<0.7: dx,dy=rng.choice(MOVES)
@@ -44,19 +49,20 @@ class SimpleA2CAgent:
             cx,cy=sim.w//2, sim.h//2
             dx=1 if a.x<cx and rng.random()<0.5 else (-1 if a.x>cx and rng.random()<0.5 else 0)
             dy=1 if a.y<cy and rng.random()<0.5 else (-1 if a.y>cy and rng.random()<0.5 else 0)
-        s=self._state_hash(sim); probs=self._policy(s)
-        action=rng.choices(ACTIONS, weights=probs, k=1)[0]
-        self.prev=(s,action); return action,(dx,dy)
+        s=self._state_hash(sim); cum=np.cumsum(self._policy(s))
+        ai=min(int(np.searchsorted(cum, rng.random()*cum[-1], side="right")), len(ACTIONS)-1)  # == rng.choices
+        self.prev=(s,ai); return ACTIONS[ai],(dx,dy)
     def learn(self, reward, done=False):
         if self.prev is None: return
-        s,a=self.prev; prefs=self.table[s]
-        for act in ACTIONS: prefs[act]*=(1 - self.lr*0.01)
-        prefs[a]+=self.lr*reward
+        s,ai=self.prev; prefs=self.table[s]
+        prefs*=(1 - self.lr*0.01)
+        prefs[ai]+=self.lr*reward
         self.prev=None if done else self.prev
 
 def move_agent(sim: FarmSimulator, idx: int, dx: int, dy: int):
-    a=sim.agents[idx]
-    nx=clip(a.x+dx,0,sim.w-1); ny=clip(a.y+dy,0,sim.h-1)
-    if (nx,ny)!=(a.x,a.y):
-        a.battery=max(0.0, a.battery - BATTERY_DRAIN_PER_MOVE)
-    a.x,a.y=nx,ny
+    sim.move_agent(idx, dx, dy)
+
+def move_agents(sim: FarmSimulator, moves):
+    """move_agent for agents 0..len(moves)-1 at once; moves = [(dx, dy), ...]. Only the moves are
+    batched: interleaving act/move/apply per agent is FarmSimulator.step_agents' job."""
+    sim.move_agents(moves)
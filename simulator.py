@@ -6,25 +6,174 @@ from dataclasses import dataclass
 from typing import List, Optional
 from config import *
 
-rng = random.Random(SEED)
+try:  # optional: fused spread / growth kernels
+    from numba import njit, prange
+except ImportError:
+    njit, prange = None, range
+
+rng = random.Random(SEED)  # scalar draws: agent placement, harvest replanting
+rng_np = np.random.default_rng(SEED)  # bulk sampling: init, spread, daily weather
 
 CROP_TYPES = ["wheat", "corn", "soy"]
 CROP_GROWTH_TIME = {"wheat": 14, "corn": 18, "soy": 16}
 CROP_VALUE = {"wheat": 1.0, "corn": 1.3, "soy": 1.1}
 
-@dataclass
+NO_CROP = -1
+ACTION_INDEX = {a: i for i, a in enumerate(ACTIONS)}
+ACTION_COST = np.array([ACTION_COSTS.get(a, 0.0) for a in ACTIONS])
+
+# 8-neighborhood offsets; grid edges are handled by _shift_slices, no padding or bounds checks
+NEIGHBOR_OFFSETS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)]
+_OFFSETS = np.array(NEIGHBOR_OFFSETS, dtype=np.int64)
+# Spread draws are uint16 uniforms k in [0, U_SCALE); an edge fires when (k + 0.5) / U_SCALE < p,
+# i.e. with probability round(p * U_SCALE) / U_SCALE (within 1e-5 of p).
+U_SCALE = 1 << 16
+
+# Rows of FarmSimulator.quantized(): crop id (0 empty, else code+1), then [0,1] fields scaled to 0..Q_MAX
+Q_CROP, Q_MOISTURE, Q_GROWTH, Q_HEALTH, Q_PEST, Q_DISEASE = range(6)
+Q_MAX = 255
+
+def _shift_slices(dx, dy):
+    """(src, dst) index tuples pairing each cell with its (dx, dy) neighbor inside the grid."""
+    def axis(d):
+        if d > 0: return slice(None, -d), slice(d, None)
+        if d < 0: return slice(-d, None), slice(None, d)
+        return slice(None), slice(None)
+    (sx, dx_), (sy, dy_) = axis(dx), axis(dy)
+    return (sx, sy), (dx_, dy_)
+
+def _spread_kernel_py(pest, disease, u, offsets, bias_x, bias_y, new_pest, new_dis):
+    """Gather form of the spread stencil: each target cell takes the max over its 8 sources.
+
+    u[0, k] / u[1, k] are the pest / disease uniforms (uint16, see U_SCALE) of the edge
+    leaving each source cell towards offsets[k]; rows are independent, so the outer loop is parallel.
+    """
+    w, h = pest.shape
+    for x in prange(w):
+        for y in range(h):
+            bp, bd = 0.0, 0.0
+            for k in range(offsets.shape[0]):
+                dx, dy = offsets[k, 0], offsets[k, 1]
+                sx, sy = x - dx, y - dy
+                if sx < 0 or sx >= w or sy < 0 or sy >= h: continue
+                cp = pest[sx, sy]
+                if cp > 0.05:
+                    p = PEST_SPREAD_RATE * cp * (bias_x if dx > 0 else 1.0) * (bias_y if dy > 0 else 1.0)
+                    if u[0, k, sx, sy] + 0.5 < p*U_SCALE and 0.15*cp > bp: bp = 0.15*cp
+                cd = disease[sx, sy]
+                if cd > 0.05 and u[1, k, sx, sy] + 0.5 < DISEASE_SPREAD_RATE*cd*U_SCALE and 0.12*cd > bd: bd = 0.12*cd
+            new_pest[x, y] = bp
+            new_dis[x, y] = bd
+
+_spread_kernel = njit(parallel=True, fastmath=True, cache=True)(_spread_kernel_py) if njit else None
+
+def _growth_kernel_py(crop, moisture, nutrient, pest, disease, growth, wet, counts):
+    """Fused growth pass: decay, health, growth and recovery of cropped cells plus the crop census."""
+    w, h = crop.shape
+    for x in range(w):
+        for y in range(h):
+            c = crop[x, y]
+            if c < 0: continue
+            counts[c] += 1
+            moisture[x, y] = min(1.0, max(0.0, moisture[x, y] - MOISTURE_DECAY + wet))
+            nutrient[x, y] = min(1.0, max(0.0, nutrient[x, y] - NUTRIENT_DECAY))
+            m, n = moisture[x, y], nutrient[x, y]
+            hl = min(1.0, max(0.0, 0.5*(m + n) - 0.6*pest[x, y] - 0.6*disease[x, y]))
+            growth[x, y] = min(1.0, max(0.0, growth[x, y] + GROWTH_RATE*(0.5 + hl)))
+            if m > 0.7 and n > 0.7:
+                pest[x, y] = max(0.0, pest[x, y] - 0.0008)
+                disease[x, y] = max(0.0, disease[x, y] - 0.0008)
+
+_growth_kernel = njit(cache=True)(_growth_kernel_py) if njit else None
+
+def _agent_kernel_py(x, y, battery, moves, idle, base_mask):
+    """Fused move + base recharge of agents 0..len(moves)-1 (see move_agents, recharge_at_base)."""
+    w, h = base_mask.shape
+    for i in range(moves.shape[0]):
+        nx = min(max(x[i] + moves[i, 0], 0), w - 1)
+        ny = min(max(y[i] + moves[i, 1], 0), h - 1)
+        if nx != x[i] or ny != y[i]:
+            battery[i] = max(0.0, battery[i] - BATTERY_DRAIN_PER_MOVE)
+        x[i], y[i] = nx, ny
+        if idle[i] and base_mask[nx, ny]:
+            battery[i] = min(MAX_BATTERY, battery[i] + BATTERY_RECHARGE_PER_TICK)
+
+_agent_kernel = njit(cache=True)(_agent_kernel_py) if njit else None
+
+def compute_health(moisture, nutrient, pest, disease):
+    """Crop health in [0,1]; works on scalars or whole (w, h) grids."""
+    return np.clip(0.5*(moisture + nutrient) - 0.6*pest - 0.6*disease, 0.0, 1.0)
+
+def _cell_field(name):
+    def get(self): return float(getattr(self._sim, name)[self.x, self.y])
+    def set(self, v): getattr(self._sim, name)[self.x, self.y] = v
+    return property(get, set)
+
 class Cell:
-    crop: Optional[str] = None
-    moisture: float = 0.6
-    nutrient: float = 0.7
-    pest: float = 0.0
-    disease: float = 0.0
-    growth: float = 0.0
-    last_action: str = "idle"
+    """View of one grid cell backed by the simulator's per-field arrays."""
+    __slots__ = ("_sim", "x", "y")
+    def __init__(self, sim, x, y):
+        self._sim, self.x, self.y = sim, x, y
+    moisture = _cell_field("moisture")
+    nutrient = _cell_field("nutrient")
+    pest = _cell_field("pest")
+    disease = _cell_field("disease")
+    growth = _cell_field("growth")
+    @property
+    def crop(self) -> Optional[str]:
+        code = self._sim.crop[self.x, self.y]
+        return CROP_TYPES[code] if code != NO_CROP else None
+    @crop.setter
+    def crop(self, v):
+        self._sim.crop[self.x, self.y] = CROP_TYPES.index(v) if v else NO_CROP
+    @property
+    def last_action(self) -> str:
+        return ACTIONS[self._sim.cell_action[self.x, self.y]]
+    @last_action.setter
+    def last_action(self, v):
+        self._sim.cell_action[self.x, self.y] = ACTION_INDEX.get(v, 0)
     def health(self):
-        good = 0.5*(self.moisture + self.nutrient)
-        bad = 0.6*self.pest + 0.6*self.disease
-        return max(0.0, min(1.0, good - bad))
+        s = self._sim; x, y = self.x, self.y
+        return float(compute_health(s.moisture[x, y], s.nutrient[x, y], s.pest[x, y], s.disease[x, y]))
+
+# Reward-shaping key for each action that has one
+SHAPING_KEY = {"irrigate": "irrigate_multiplier", "apply_pesticide": "pesticide_multiplier",
+               "apply_fungicide": "fungicide_multiplier", "fertilize": "fertilize_multiplier",
+               "monitor": "monitor_multiplier"}
+
+class Shaping(dict):
+    """llm_shaping dict that keeps `by_action` (multiplier per ACTIONS index) in sync on every write."""
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self._sync()
+    def _sync(self):
+        self.by_action = np.array([float(self.get(SHAPING_KEY.get(a), 1.0)) for a in ACTIONS])
+    def __setitem__(self, k, v): super().__setitem__(k, v); self._sync()
+    def __delitem__(self, k): super().__delitem__(k); self._sync()
+    def update(self, *args, **kw): super().update(*args, **kw); self._sync()
+    def setdefault(self, k, v=None):
+        r = super().setdefault(k, v); self._sync(); return r
+    def pop(self, *args):
+        r = super().pop(*args); self._sync(); return r
+    def popitem(self):
+        r = super().popitem(); self._sync(); return r
+    def clear(self): super().clear(); self._sync()
+
+class Grid:
+    """Legacy `grid[x][y]` access returning Cell views."""
+    def __init__(self, sim): self._sim = sim
+    def __len__(self): return self._sim.w
+    def __getitem__(self, x):
+        if not 0 <= x < self._sim.w: raise IndexError(x)
+        return _GridColumn(self._sim, x)
+
+class _GridColumn:
+    __slots__ = ("_sim", "x")
+    def __init__(self, sim, x): self._sim, self.x = sim, x
+    def __len__(self): return self._sim.h
+    def __getitem__(self, y):
+        if not 0 <= y < self._sim.h: raise IndexError(y)
+        return Cell(self._sim, self.x, y)
 
 @dataclass
 class Weather:
@@ -34,161 +183,368 @@ class Weather:
     wind_dx: float = 0.0
     wind_dy: float = 0.0
 
-@dataclass
+def _agent_field(name):
+    def get(self): return getattr(self._pool, name)[self.i].item()
+    def set(self, v): getattr(self._pool, name)[self.i] = v
+    return property(get, set)
+
 class AgentState:
-    x: int = 0
-    y: int = 0
-    battery: float = MAX_BATTERY
-    carrying: Optional[str] = None
-    last_action: str = "idle"
-    reward: float = 0.0
-    harvested_today: int = 0
+    """View of one agent backed by the AgentPool's per-field arrays."""
+    __slots__ = ("_pool", "i")
+    def __init__(self, pool, i):
+        self._pool, self.i = pool, i
+    x = _agent_field("x")
+    y = _agent_field("y")
+    battery = _agent_field("battery")
+    reward = _agent_field("reward")
+    harvested_today = _agent_field("harvested_today")
+    @property
+    def carrying(self) -> Optional[str]:
+        return self._pool.carrying[self.i]
+    @carrying.setter
+    def carrying(self, v):
+        self._pool.carrying[self.i] = v
+    @property
+    def last_action(self) -> str:
+        return ACTIONS[self._pool.last_action[self.i]]
+    @last_action.setter
+    def last_action(self, v):
+        self._pool.last_action[self.i] = ACTION_INDEX.get(v, 0)
+
+class AgentPool:
+    """All agents' state as parallel arrays; indexing yields AgentState views (slices give lists)."""
+    def __init__(self, n):
+        self.x = np.zeros(n, dtype=np.int32)
+        self.y = np.zeros(n, dtype=np.int32)
+        self.battery = np.full(n, MAX_BATTERY, dtype=np.float64)
+        self.last_action = np.zeros(n, dtype=np.uint8)  # index into ACTIONS
+        self.reward = np.zeros(n)
+        self.harvested_today = np.zeros(n, dtype=np.int32)
+        self.carrying: List[Optional[str]] = [None] * n
+    def __len__(self): return len(self.x)
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [AgentState(self, j) for j in range(*i.indices(len(self)))]
+        if i < 0: i += len(self)
+        if not 0 <= i < len(self): raise IndexError(i)
+        return AgentState(self, i)
+    def __iter__(self):
+        return (AgentState(self, i) for i in range(len(self)))
 
 class FarmSimulator:
     def __init__(self, w=GRID_W, h=GRID_H):
         self.w, self.h = w, h
-        self.grid = [[Cell() for _ in range(h)] for __ in range(w)]
+        # Grid state as parallel float32 (w, h) arrays indexed [x, y]; crop holds CROP_TYPES codes
+        self.crop = np.full((w, h), NO_CROP, dtype=np.int8)
+        self.moisture = np.full((w, h), 0.6, dtype=np.float32)
+        self.nutrient = np.full((w, h), 0.7, dtype=np.float32)
+        self.pest = np.zeros((w, h), dtype=np.float32)
+        self.disease = np.zeros((w, h), dtype=np.float32)
+        self.growth = np.zeros((w, h), dtype=np.float32)
+        self.cell_action = np.zeros((w, h), dtype=np.int8)  # index into ACTIONS
+        self.grid = Grid(self)
+        self._handlers = tuple(getattr(self, "_do_" + a) for a in ACTIONS)  # branch table for apply_action
+        self._cell_xy = None  # cached (w*h, 2) cell coordinates for instance_attributes()
         self.weather = Weather()
         self.ticks = 0
         self.day = 0
+        self._next_weather_tick = TICKS_PER_DAY  # tick of the next day boundary
+        self._base_mask = np.zeros((w, h), dtype=bool)
+        self._base_mask[tuple(np.array(BASE_LOCATIONS).T)] = True
         self.total_yield = 0.0
         self.total_water_used = 0.0
         self.total_chem_used = 0.0
         self.total_monitoring = 0
         self.biodiversity_score = 1.0
-        self.llm_shaping = dict(LLM_SHAPING_DEFAULTS)
-
-        for x in range(w):
-            for y in range(h):
-                if rng.random() < INITIAL_CROP_DENSITY:
-                    self.grid[x][y].crop = rng.choice(CROP_TYPES)
-                    self.grid[x][y].growth = rng.uniform(0.15, 0.4)
-                    if rng.random() < 0.03:
-                        self.grid[x][y].pest = rng.uniform(0.2, 0.6)
-                    if rng.random() < 0.02:
-                        self.grid[x][y].disease = rng.uniform(0.2, 0.5)
-
-        self.agents: List[AgentState] = []
+        self.llm_shaping = LLM_SHAPING_DEFAULTS
+
+        planted = rng_np.random((w, h)) < INITIAL_CROP_DENSITY
+        self.crop[planted] = rng_np.integers(0, len(CROP_TYPES), (w, h))[planted]
+        self.growth[planted] = rng_np.uniform(0.15, 0.4, (w, h))[planted]
+        infested = planted & (rng_np.random((w, h)) < 0.03)
+        self.pest[infested] = rng_np.uniform(0.2, 0.6, (w, h))[infested]
+        infected = planted & (rng_np.random((w, h)) < 0.02)
+        self.disease[infected] = rng_np.uniform(0.2, 0.5, (w, h))[infected]
+
+        self.agents = AgentPool(NUM_AGENTS)
         for i in range(NUM_AGENTS):
             bx, by = BASE_LOCATIONS[i % len(BASE_LOCATIONS)]
-            self.agents.append(AgentState(
-                x=min(max(0, bx + rng.randint(-1,1)), self.w-1),
-                y=min(max(0, by + rng.randint(-1,1)), self.h-1)
-            ))
+            self.agents.x[i] = min(max(0, bx + rng.randint(-1,1)), self.w-1)
+            self.agents.y[i] = min(max(0, by + rng.randint(-1,1)), self.h-1)
+
+    @property
+    def llm_shaping(self) -> Shaping:
+        return self._shaping
+    @llm_shaping.setter
+    def llm_shaping(self, shaping):
+        self._shaping = Shaping(shaping)
 
     def step_weather(self):
-        if self.ticks % TICKS_PER_DAY == 0 and self.ticks > 0:
-            self.day += 1
-            self.weather.temp = float(np.clip(rng.gauss(TEMP_MEAN, TEMP_STD), 12, 44))
-            self.weather.humidity = float(np.clip(rng.gauss(HUMID_MEAN, HUMID_STD), 0.05, 0.95))
-            self.weather.rain = 1.0 if rng.random() < RAIN_CHANCE else 0.0
-            self.weather.wind_dx = float(np.clip(rng.uniform(-1,1), -1, 1))
-            self.weather.wind_dy = float(np.clip(rng.uniform(-1,1), -1, 1))
+        """Start a new day: roll fresh weather. step() calls this every TICKS_PER_DAY ticks."""
+        self.day += 1
+        z = rng_np.standard_normal(2); u = rng_np.random(3)  # one draw per day
+        self.weather.temp = float(np.clip(TEMP_MEAN + TEMP_STD*z[0], 12, 44))
+        self.weather.humidity = float(np.clip(HUMID_MEAN + HUMID_STD*z[1], 0.05, 0.95))
+        self.weather.rain = 1.0 if u[0] < RAIN_CHANCE else 0.0
+        self.weather.wind_dx = float(np.clip(2*u[1] - 1, -1, 1))
+        self.weather.wind_dy = float(np.clip(2*u[2] - 1, -1, 1))
+
+    def health(self):
+        """Whole-grid health as a (w, h) array."""
+        return compute_health(self.moisture, self.nutrient, self.pest, self.disease)
+
+    def instance_attributes(self, out=None):
+        """Per-cell (w*h, 7) float32 rows (x, y, growth, moisture, pest, disease, crop_code),
+        row x*h + y, for uploading to a per-instance vertex buffer. Reuses `out` when given."""
+        if out is None: out = np.empty((self.w*self.h, 7), dtype=np.float32)
+        if self._cell_xy is None:
+            gx, gy = np.meshgrid(np.arange(self.w), np.arange(self.h), indexing="ij")
+            self._cell_xy = np.stack([gx.ravel(), gy.ravel()], axis=1).astype(np.float32)
+        out[:, 0:2] = self._cell_xy
+        for col, field in enumerate((self.growth, self.moisture, self.pest, self.disease, self.crop), start=2):
+            out[:, col] = field.ravel()
+        return out
+
+    def quantized(self, out=None):
+        """(6, w, h) uint8 snapshot of the drawable cell state (rows Q_CROP..Q_DISEASE) for
+        renderers that bucket or compare cells. Reuses `out` when given."""
+        if out is None: out = np.empty((6, self.w, self.h), dtype=np.uint8)
+        np.add(self.crop, 1, out=out[Q_CROP], casting="unsafe")
+        for row, field in ((Q_MOISTURE, self.moisture), (Q_GROWTH, self.growth), (Q_HEALTH, self.health()),
+                           (Q_PEST, self.pest), (Q_DISEASE, self.disease)):
+            np.rint(field*Q_MAX, out=out[row], casting="unsafe")
+        return out
 
     def spread_process(self):
-        new_pest = np.zeros((self.w, self.h))
-        new_dis = np.zeros((self.w, self.h))
-        for x in range(self.w):
-            for y in range(self.h):
-                c = self.grid[x][y]
-                if c.pest > 0.05:
-                    for nx, ny in self.neighbors(x, y):
-                        biasx = 1 + WIND_VARIANCE*self.weather.wind_dx if nx > x else 1
-                        biasy = 1 + WIND_VARIANCE*self.weather.wind_dy if ny > y else 1
-                        p = PEST_SPREAD_RATE * c.pest * biasx * biasy
-                        if rng.random() < p:
-                            new_pest[nx, ny] = max(new_pest[nx, ny], 0.15*c.pest)
-                if c.disease > 0.05:
-                    for nx, ny in self.neighbors(x, y):
-                        p = DISEASE_SPREAD_RATE * c.disease
-                        if rng.random() < p:
-                            new_dis[nx, ny] = max(new_dis[nx, ny], 0.12*c.disease)
-        for x in range(self.w):
-            for y in range(self.h):
-                self.grid[x][y].pest = min(1.0, self.grid[x][y].pest + new_pest[x, y])
-                self.grid[x][y].disease = min(1.0, self.grid[x][y].disease + new_dis[x, y])
+        pest, disease = self.pest, self.disease
+        new_pest = np.zeros_like(pest)
+        new_dis = np.zeros_like(disease)
+        bias_x = 1 + WIND_VARIANCE*self.weather.wind_dx
+        bias_y = 1 + WIND_VARIANCE*self.weather.wind_dy
+        u = rng_np.integers(0, U_SCALE, (2, len(NEIGHBOR_OFFSETS), self.w, self.h), dtype=np.uint16)
+        if _spread_kernel is not None:
+            _spread_kernel(pest, disease, u, _OFFSETS, bias_x, bias_y, new_pest, new_dis)
+        else:
+            self._spread_numpy(pest, disease, u, bias_x, bias_y, new_pest, new_dis)
+        np.minimum(1.0, pest + new_pest, out=pest)
+        np.minimum(1.0, disease + new_dis, out=disease)
+
+    @staticmethod
+    def _spread_numpy(pest, disease, u, bias_x, bias_y, new_pest, new_dis):
+        for k, (dx, dy) in enumerate(NEIGHBOR_OFFSETS):
+            src, dst = _shift_slices(dx, dy)
+            # pest spreads downwind faster; disease spreads uniformly
+            cp = pest[src]
+            p = PEST_SPREAD_RATE * cp * (bias_x if dx > 0 else 1) * (bias_y if dy > 0 else 1)
+            hit = (cp > 0.05) & (u[0, k][src] + 0.5 < p*U_SCALE)
+            np.maximum(new_pest[dst], np.where(hit, 0.15*cp, 0.0), out=new_pest[dst])
+            cd = disease[src]
+            hit = (cd > 0.05) & (u[1, k][src] + 0.5 < DISEASE_SPREAD_RATE*cd*U_SCALE)
+            np.maximum(new_dis[dst], np.where(hit, 0.12*cd, 0.0), out=new_dis[dst])
 
     def growth_process(self):
         rain_bonus = 0.18 if self.weather.rain > 0 else 0.0
-        for x in range(self.w):
-            for y in range(self.h):
-                c = self.grid[x][y]
-                if not c.crop: continue
-                c.moisture = max(0.0, min(1.0, c.moisture - MOISTURE_DECAY + rain_bonus*0.5*self.weather.humidity))
-                c.nutrient = max(0.0, min(1.0, c.nutrient - NUTRIENT_DECAY))
-                h = c.health()
-                c.growth = max(0.0, min(1.0, c.growth + GROWTH_RATE * (0.5 + h)))
-                if c.moisture > 0.7 and c.nutrient > 0.7:
-                    c.pest = max(0.0, c.pest - 0.0008)
-                    c.disease = max(0.0, c.disease - 0.0008)
-
-        crop_counts = {t:0 for t in CROP_TYPES}
-        total = 0
-        for x in range(self.w):
-            for y in range(self.h):
-                if self.grid[x][y].crop:
-                    crop_counts[self.grid[x][y].crop] += 1
-                    total += 1
+        wet = rain_bonus*0.5*self.weather.humidity
+        if _growth_kernel is not None:
+            counts = np.zeros(len(CROP_TYPES), dtype=np.int64)
+            _growth_kernel(self.crop, self.moisture, self.nutrient, self.pest, self.disease, self.growth, wet, counts)
+        else:
+            counts = self._growth_numpy(wet)
+        total = int(counts.sum())
         if total > 0:
-            evenness = math.exp(-sum([(c/total)*math.log((c/total)+1e-6) for c in crop_counts.values()]))
-            evenness /= len(CROP_TYPES)
+            p = counts / total
+            entropy = -float(np.dot(p, np.log(p + 1e-6)))
+            evenness = math.exp(entropy) / len(CROP_TYPES)
             self.biodiversity_score = 0.5*self.biodiversity_score + 0.5*max(0.2, min(1.0, evenness))
 
-    def neighbors(self, x, y):
-        for dx in [-1,0,1]:
-            for dy in [-1,0,1]:
-                if dx==0 and dy==0: continue
-                nx, ny = x+dx, y+dy
-                if 0 <= nx < self.w and 0 <= ny < self.h:
-                    yield nx, ny
+    def _growth_numpy(self, wet):
+        """Whole-array growth update; returns the crop census (counted right after, while crop is hot)."""
+        has_crop = self.crop != NO_CROP
+        # in place, cropped cells only (where=): no full-grid temporaries besides health
+        np.add(self.moisture, wet - MOISTURE_DECAY, out=self.moisture, where=has_crop)
+        np.clip(self.moisture, 0.0, 1.0, out=self.moisture, where=has_crop)
+        np.subtract(self.nutrient, NUTRIENT_DECAY, out=self.nutrient, where=has_crop)
+        np.clip(self.nutrient, 0.0, 1.0, out=self.nutrient, where=has_crop)
+        gain = self.health()
+        gain += 0.5; gain *= GROWTH_RATE
+        np.add(self.growth, gain, out=self.growth, where=has_crop)
+        np.clip(self.growth, 0.0, 1.0, out=self.growth, where=has_crop)
+        recover = has_crop & (self.moisture > 0.7) & (self.nutrient > 0.7)
+        for field in (self.pest, self.disease):
+            np.subtract(field, 0.0008, out=field, where=recover)
+            np.maximum(field, 0.0, out=field, where=recover)
+        return np.bincount(self.crop[has_crop], minlength=len(CROP_TYPES))
 
-    def apply_action(self, agent_idx: int, action: str):
+    def apply_action(self, agent_idx: int, action):
+        """Apply one agent's action (name or ACTIONS index) at its cell; returns the reward."""
+        ai = int(action) if isinstance(action, (int, np.integer)) else ACTION_INDEX.get(action, 0)
         a = self.agents[agent_idx]
-        c = self.grid[a.x][a.y]
-        a.last_action = action
-        c.last_action = action
-        reward = 0.0
-        cost = ACTION_COSTS.get(action, 0.0)
-
-        if action == "irrigate":
-            c.moisture = min(1.0, c.moisture + 0.35)
-            self.total_water_used += 1.0
-            reward += 0.05 * self.llm_shaping.get("irrigate_multiplier",1.0)
-        elif action == "apply_pesticide":
-            before = c.pest
-            c.pest = max(0.0, c.pest - 0.4)
-            delta = before - c.pest
-            self.total_chem_used += 1.0
-            reward += 0.08 * delta * self.llm_shaping.get("pesticide_multiplier",1.0)
-        elif action == "apply_fungicide":
-            before = c.disease
-            c.disease = max(0.0, c.disease - 0.4)
-            delta = before - c.disease
-            self.total_chem_used += 1.0
-            reward += 0.08 * delta * self.llm_shaping.get("fungicide_multiplier",1.0)
-        elif action == "fertilize":
-            c.nutrient = min(1.0, c.nutrient + 0.25)
-            reward += 0.05 * self.llm_shaping.get("fertilize_multiplier",1.0)
-        elif action == "monitor":
-            self.total_monitoring += 1
-            reward += 0.01 * self.llm_shaping.get("monitor_multiplier",1.0)
-        elif action == "harvest":
-            if c.crop and c.growth > 0.8 and c.health() > 0.5:
-                yield_gain = CROP_VALUE[c.crop] * (0.4 + 0.6*c.health())
-                self.total_yield += yield_gain
-                a.harvested_today += 1
-                c.crop = rng.choice(CROP_TYPES) if rng.random()<0.7 else None
-                c.growth = 0.0
-                c.pest *= 0.3
-                c.disease *= 0.3
-                reward += REWARD_YIELD * yield_gain
-            else:
-                reward -= 0.02
-
-        reward -= REWARD_ACTION_COST_SCALE * cost
+        x, y = a.x, a.y
+        self.agents.last_action[agent_idx] = ai
+        self.cell_action[x, y] = ai
+        reward = self._handlers[ai](a, x, y, float(self.llm_shaping.by_action[ai]))
+        reward -= REWARD_ACTION_COST_SCALE * float(ACTION_COST[ai])
         a.reward += reward
         return reward
 
+    # Per-action handlers, dispatched by ACTIONS index via self._handlers; each returns the reward
+    def _do_idle(self, a, x, y, mult):
+        return 0.0
+
+    def _do_monitor(self, a, x, y, mult):
+        self.total_monitoring += 1
+        return 0.01 * mult
+
+    def _do_irrigate(self, a, x, y, mult):
+        self.moisture[x, y] = min(1.0, self.moisture[x, y] + 0.35)
+        self.total_water_used += 1.0
+        return 0.05 * mult
+
+    def _do_apply_pesticide(self, a, x, y, mult):
+        before = self.pest[x, y]
+        self.pest[x, y] = max(0.0, before - 0.4)
+        self.total_chem_used += 1.0
+        return 0.08 * float(before - self.pest[x, y]) * mult
+
+    def _do_apply_fungicide(self, a, x, y, mult):
+        before = self.disease[x, y]
+        self.disease[x, y] = max(0.0, before - 0.4)
+        self.total_chem_used += 1.0
+        return 0.08 * float(before - self.disease[x, y]) * mult
+
+    def _do_fertilize(self, a, x, y, mult):
+        self.nutrient[x, y] = min(1.0, self.nutrient[x, y] + 0.25)
+        return 0.05 * mult
+
+    def _do_harvest(self, a, x, y, mult):
+        return self._harvest(a, x, y)
+
+    def _harvest(self, a: AgentState, x: int, y: int) -> float:
+        code = self.crop[x, y]
+        h = float(compute_health(self.moisture[x, y], self.nutrient[x, y], self.pest[x, y], self.disease[x, y]))
+        if code != NO_CROP and self.growth[x, y] > 0.8 and h > 0.5:
+            yield_gain = CROP_VALUE[CROP_TYPES[code]] * (0.4 + 0.6*h)
+            self.total_yield += yield_gain
+            a.harvested_today += 1
+            self.crop[x, y] = rng.randrange(len(CROP_TYPES)) if rng.random()<0.7 else NO_CROP
+            self.growth[x, y] = 0.0
+            self.pest[x, y] *= 0.3
+            self.disease[x, y] *= 0.3
+            return REWARD_YIELD * yield_gain
+        return -0.02
+
+    def apply_actions(self, actions: List[str]):
+        """apply_action for agents 0..len(actions)-1 at once; returns their rewards.
+
+        Agents alone on their cell are applied with one array update per action type; agents
+        sharing a cell go through apply_action in agent order, so treatments and harvests on
+        that cell stack exactly as when applying the actions one agent at a time (the highest
+        index sets cell_action). Harvests, which draw from rng, also run in agent order.
+        """
+        n = len(actions)
+        pool = self.agents
+        ax, ay = pool.x[:n].astype(np.intp), pool.y[:n].astype(np.intp)
+        acts = np.fromiter((ACTION_INDEX.get(act, 0) for act in actions), dtype=np.intp, count=n)
+        _, inv, counts = np.unique(ax*self.h + ay, return_inverse=True, return_counts=True)
+        shared = counts[inv] > 1
+        solo = ~shared
+        rewards = np.zeros(n)
+        mult = self.llm_shaping.by_action
+        # solo agents are on distinct cells, so none of these fancy-index writes overlap
+        pool.last_action[:n][solo] = acts[solo]
+        self.cell_action[ax[solo], ay[solo]] = acts[solo]
+
+        for action, field, amount in (("irrigate", self.moisture, 0.35), ("fertilize", self.nutrient, 0.25)):
+            m = solo & (acts == ACTION_INDEX[action])
+            if not m.any(): continue
+            xs, ys = ax[m], ay[m]
+            field[xs, ys] = np.minimum(1.0, field[xs, ys] + amount)
+            if action == "irrigate": self.total_water_used += float(m.sum())
+            rewards[m] += 0.05 * mult[ACTION_INDEX[action]]
+
+        for action, field in (("apply_pesticide", self.pest), ("apply_fungicide", self.disease)):
+            m = solo & (acts == ACTION_INDEX[action])
+            if not m.any(): continue
+            xs, ys = ax[m], ay[m]
+            before = field[xs, ys]
+            field[xs, ys] = np.maximum(before - 0.4, 0.0)
+            self.total_chem_used += float(m.sum())
+            rewards[m] += 0.08 * (before - field[xs, ys]).astype(np.float64) * mult[ACTION_INDEX[action]]
+
+        m = solo & (acts == ACTION_INDEX["monitor"])
+        self.total_monitoring += int(m.sum())
+        rewards[m] += 0.01 * mult[ACTION_INDEX["monitor"]]
+
+        for i in np.flatnonzero(shared | (acts == ACTION_INDEX["harvest"])):
+            if shared[i]:  # apply_action books the cost and the agent's reward itself
+                rewards[i] = self.apply_action(int(i), int(acts[i]))
+            else:
+                rewards[i] += self._harvest(pool[i], ax[i], ay[i])
+
+        rewards[solo] -= REWARD_ACTION_COST_SCALE * ACTION_COST[acts[solo]]
+        pool.reward[:n][solo] += rewards[solo]
+        return rewards
+
+    def move_agent(self, i, dx, dy):
+        """Move agent i by (dx, dy), clamped to the grid; draining BATTERY_DRAIN_PER_MOVE if it moved."""
+        pool = self.agents; x, y = int(pool.x[i]), int(pool.y[i])
+        nx = min(max(x + dx, 0), self.w-1); ny = min(max(y + dy, 0), self.h-1)
+        if nx != x or ny != y:
+            pool.battery[i] = max(0.0, pool.battery[i] - BATTERY_DRAIN_PER_MOVE)
+        pool.x[i], pool.y[i] = nx, ny
+
+    def move_agents(self, moves):
+        """Move agents 0..len(moves)-1 by moves = [(dx, dy), ...], clamped to the grid;
+        an agent that actually moves drains BATTERY_DRAIN_PER_MOVE."""
+        pool = self.agents; n = len(moves)
+        d = np.asarray(moves, dtype=np.int32).reshape(n, 2)
+        nx = np.clip(pool.x[:n] + d[:, 0], 0, self.w-1); ny = np.clip(pool.y[:n] + d[:, 1], 0, self.h-1)
+        moved = (nx != pool.x[:n]) | (ny != pool.y[:n])
+        pool.battery[:n] = np.where(moved, np.maximum(0.0, pool.battery[:n] - BATTERY_DRAIN_PER_MOVE), pool.battery[:n])
+        pool.x[:n], pool.y[:n] = nx, ny
+
+    def recharge_at_base(self, actions: List[str]):
+        """Agents that idled this tick on a BASE_LOCATIONS cell recharge by BATTERY_RECHARGE_PER_TICK."""
+        pool = self.agents; n = len(actions)
+        idle = np.fromiter((a == "idle" for a in actions), dtype=bool, count=n)
+        m = idle & self._base_mask[pool.x[:n], pool.y[:n]]
+        if m.any():
+            bat = pool.battery[:n]
+            bat[m] = np.minimum(MAX_BATTERY, bat[m] + BATTERY_RECHARGE_PER_TICK)
+
+    def step_agents(self, controllers):
+        """One agent tick in agent order: each controller picks (action, (dx, dy)) and its agent is
+        moved, applied and recharged at base before the next controller acts, so agents sharing a
+        cell see each other's work as in the original per-agent loop. Returns (actions, rewards)."""
+        pool, base, n = self.agents, self._base_mask, len(controllers)
+        actions, rewards = [None]*n, np.empty(n)
+        for i, c in enumerate(controllers):
+            action, (dx, dy) = c.act(self)
+            self.move_agent(i, dx, dy)
+            rewards[i] = self.apply_action(i, action)
+            if action == "idle" and base[pool.x[i], pool.y[i]]:
+                pool.battery[i] = min(MAX_BATTERY, pool.battery[i] + BATTERY_RECHARGE_PER_TICK)
+            actions[i] = action
+        return actions, rewards
+
+    def advance_agents(self, actions, moves):
+        """Apply already chosen actions and moves = [(dx, dy), ...] to agents 0..len(actions)-1:
+        move, act and recharge at base as batched array updates. Returns the rewards.
+
+        Same result as moving, applying and recharging one agent at a time, but every action
+        must be chosen up front; use step_agents when later agents act on earlier agents' work."""
+        if _agent_kernel is not None:
+            # apply_actions never reads battery, so the recharge can run with the move
+            pool, n = self.agents, len(moves)
+            idle = np.fromiter((a == "idle" for a in actions), dtype=bool, count=n)
+            _agent_kernel(pool.x[:n], pool.y[:n], pool.battery[:n], np.asarray(moves, dtype=np.int32).reshape(n, 2),
+                          idle, self._base_mask)
+            return self.apply_actions(actions)
+        self.move_agents(moves)
+        rewards = self.apply_actions(actions)
+        self.recharge_at_base(actions)
+        return rewards
+
     def sustainability_index(self):
         water_penalty = 1.0 / (1.0 + 0.02*self.total_water_used)
         chem_penalty = 1.0 / (1.0 + 0.03*self.total_chem_used)
@@ -199,6 +555,8 @@ class FarmSimulator:
 
     def step(self):
         self.ticks += 1
-        self.step_weather()
+        if self.ticks >= self._next_weather_tick:
+            self.step_weather()
+            self._next_weather_tick += TICKS_PER_DAY
         self.spread_process()
         self.growth_process()
@@ -0,0 +1,23 @@
+# text_cache.py — Cached text rasterization and word wrap shared by the 2D, 3D and dual views
+
+import functools
+
+@functools.lru_cache(maxsize=1024)
+def render_text(font, text, color):
+    """Cached antialiased font.render in the display's pixel format (call after set_mode):
+    static labels and repeated values are rasterized once, only new strings miss."""
+    return font.render(text, True, color).convert_alpha()
+
+@functools.lru_cache(maxsize=256)
+def wrap_lines(text, width, font):
+    """Greedy word wrap to `width` px; each word is measured once and line widths kept as a running sum."""
+    words = text.split()
+    ws = [font.size(w)[0] for w in words]; space = font.size(" ")[0]
+    lines, cur, cur_w = [], [], 0
+    for w, ww in zip(words, ws):
+        if cur_w + (space if cur else 0) + ww <= width:
+            cur_w += (space if cur else 0) + ww; cur.append(w)
+        else:
+            lines.append(" ".join(cur)); cur, cur_w = [w], ww
+    if cur: lines.append(" ".join(cur))
+    return tuple(lines)
@@ -7,34 +7,120 @@
 # - Scrollable advisories; neat right panel; reward shaping tied to toggles
 # - Snapshot (O) & Screenshot (P)
 
-import pygame, random, json, time
-from pygame import gfxdraw
+import pygame, json, time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from pygame import gfxdraw    # only used while building cached tiles/sprites/HUD, never per frame
+try:  # optional: fused per-cell draw-parameter pass
+    from numba import njit, prange
+except ImportError:
+    njit, prange = None, range
 from typing import List
 from config import *
-from simulator import FarmSimulator
-from rl_swarm import move_agent
+from simulator import FarmSimulator, CROP_TYPES, Q_CROP, Q_MOISTURE, Q_GROWTH, Q_HEALTH, Q_PEST, Q_DISEASE, Q_MAX
+from text_cache import render_text, wrap_lines
 
 # --- defaults (modifiable live) ---
 MOVE_EVERY_N_TICKS_DEFAULT = 8
 
+# Weather toggle bits (FarmViz._cond_bits)
+RAINY, SUNNY, WIND_STORM, DROUGHT = 1, 2, 4, 8
+CONDITION_BITS = {"rainy": RAINY, "sunny": SUNNY, "wind_storm": WIND_STORM, "drought": DROUGHT}
+
+# Reward-shaping multipliers as a vector; conditions scale entries in place
+SHAPING_KEYS = ("irrigate_multiplier", "monitor_multiplier", "fungicide_multiplier", "pesticide_multiplier", "fertilize_multiplier")
+IDX_IRRIGATE, IDX_MONITOR, IDX_FUNGICIDE, IDX_PESTICIDE, IDX_FERTILIZE = range(len(SHAPING_KEYS))
+
+# Window events after which the last presented frame may be gone (covered, hidden, minimized)
+REPAINT_EVENTS = [pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWSHOWN, pygame.WINDOWRESTORED]
+# The only event types the loop handles; everything else is blocked at the SDL queue
+INPUT_EVENTS = [pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEWHEEL] + REPAINT_EVENTS
+
+CROP_COLORS = {"wheat": (205,190,100), "corn": (60,180,70), "soy": (70,160,120)}
+CROP_RGB = np.array([CROP_COLORS[c] for c in CROP_TYPES], dtype=np.float64)  # indexed by crop code
+SOIL_RGB = (120, 85, 60)
+WET_OUTLINE = (110,160,110)
+COLORKEY = (255,0,255)
+TILE_PAD = 4                    # crop tiles overhang the cell so leaves can reach into the margin
+GROWTH_BUCKETS = HEALTH_BUCKETS = 6
+# Lookups from quantized cell values (0..Q_MAX) to soil green and tile buckets
+_Q = np.arange(Q_MAX+1) / Q_MAX
+SOIL_G_LUT = (SOIL_RGB[1]*(0.8+0.4*_Q)).astype(np.uint8)
+GROWTH_LUT = (_Q*GROWTH_BUCKETS).astype(np.int32)
+HEALTH_LUT = (_Q*HEALTH_BUCKETS).astype(np.int32)
+WET_Q, MARK_Q = round(0.7*Q_MAX), round(0.2*Q_MAX)    # wet-soil outline / pest & disease marker thresholds
+FULL_REDRAW_FRACTION = 0.25    # rebuild the whole grid composite when more cells than this changed
+AGENT_SPRITE_R = 12             # body radius 7 + battery ring of at most 4, plus its 1px stroke
+
+def _cell_params_py(q, soil_g_lut, growth_lut, health_lut, pal, key):
+    """One pass over the uint8 snapshot: soil fill / outline colours into pal[x, y, 1:] and
+    the packed crop-tile key (-1 unplanted) into key; same result as FarmViz's NumPy path."""
+    for x in prange(q.shape[1]):
+        for y in range(q.shape[2]):
+            m, crop = q[Q_MOISTURE, x, y], q[Q_CROP, x, y]
+            g = soil_g_lut[m]
+            pal[x, y, 1, 1] = g
+            if crop == 0 and m > WET_Q:
+                pal[x, y, 2, 0] = WET_OUTLINE[0]; pal[x, y, 2, 1] = WET_OUTLINE[1]; pal[x, y, 2, 2] = WET_OUTLINE[2]
+            else:
+                pal[x, y, 2, 0] = SOIL_RGB[0]; pal[x, y, 2, 1] = g; pal[x, y, 2, 2] = SOIL_RGB[2]
+            if crop == 0:
+                key[x, y] = -1
+            else:
+                k = (crop - 1)*(GROWTH_BUCKETS+1) + growth_lut[q[Q_GROWTH, x, y]]
+                k = k*(HEALTH_BUCKETS+1) + health_lut[q[Q_HEALTH, x, y]]
+                key[x, y] = (k*2 + (q[Q_PEST, x, y] > MARK_Q))*2 + (q[Q_DISEASE, x, y] > MARK_Q)
+
+_cell_params = njit(parallel=True, cache=True)(_cell_params_py) if njit else None
+
 def clamp(v, lo=0, hi=255): return max(lo, min(hi, v))
 
+def cell_layers():
+    """(pitch, pitch) uint8 layer of one cell slot: 0 gap/corner, 1 soil fill, 2 outline ring."""
+    surf = pygame.Surface((CELL_SIZE, CELL_SIZE)); r = surf.get_rect()
+    pygame.draw.rect(surf, (1,1,1), r, border_radius=4)
+    pygame.draw.rect(surf, (2,2,2), r, 1, border_radius=4)
+    layer = np.zeros((CELL_SIZE+MARGIN, CELL_SIZE+MARGIN), dtype=np.intp)
+    layer[:CELL_SIZE, :CELL_SIZE] = pygame.surfarray.array_red(surf)
+    return layer
+
+def blit_many(surface, seq):
+    """Surface.fblits where available (pygame-ce), else blits without building the rect list."""
+    fblits = getattr(surface, "fblits", None)
+    if fblits: fblits(seq)
+    else: surface.blits(seq, doreturn=False)
+
+# File output runs on FarmViz's I/O worker so saves don't stall the frame
+def save_screenshot(surf, fname):
+    pygame.image.save(surf, fname)
+    print(f"Saved screenshot: {fname}")
+
+def dump_snapshot(snap, fname):
+    with open(fname, "w") as f: json.dump(snap, f, indent=2)
+    print(f"Saved snapshot: {fname}")
+
 class ToggleButton:
     def __init__(self, rect, label, get_state, set_state):
         self.rect = pygame.Rect(rect)
         self.label = label
         self.get_state = get_state
         self.set_state = set_state
+        self._cached = {}    # active -> pre-rendered button surface
     def draw(self, surface, font):
         active = self.get_state()
+        if active not in self._cached:
+            self._cached[active] = self._render(font, active)
+        surface.blit(self._cached[active], self.rect.topleft)
+    def _render(self, font, active):
+        surf = pygame.Surface(self.rect.size, pygame.SRCALPHA).convert_alpha(); r = surf.get_rect()
         bg = (210,235,220) if active else (240,244,250)
         border = (60,160,90) if active else (200,210,225)
         fg = (22,60,30) if active else (35,45,58)
-        pygame.draw.rect(surface, bg, self.rect, border_radius=10)
-        pygame.draw.rect(surface, border, self.rect, 1, border_radius=10)
-        text = font.render(self.label + ("  ●" if active else "  ○"), True, fg)
-        surface.blit(text, (self.rect.x + (self.rect.w-text.get_width())//2,
-                            self.rect.y + (self.rect.h-text.get_height())//2))
+        pygame.draw.rect(surf, bg, r, border_radius=10)
+        pygame.draw.rect(surf, border, r, 1, border_radius=10)
+        text = render_text(font, self.label + ("  ●" if active else "  ○"), fg)
+        surf.blit(text, ((r.w-text.get_width())//2, (r.h-text.get_height())//2))
+        return surf
     def handle(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             if self.rect.collidepoint(event.pos):
@@ -47,6 +133,7 @@ class FarmViz:
         self.w = WINDOW_W; self.h = WINDOW_H
         self.screen = pygame.display.set_mode((self.w, self.h))
         pygame.display.set_caption("Autonomous Agricultural Swarm")
+        pygame.event.set_blocked(None); pygame.event.set_allowed(INPUT_EVENTS)
         self.clock = pygame.time.Clock()
         self.font_xs = pygame.font.Font(FONT_NAME, 12)
         self.font_sm = pygame.font.Font(FONT_NAME, 14)
@@ -64,17 +151,49 @@ class FarmViz:
         self.COL_TEXT = (30,40,52)
         self.COL_FRAME = (210,218,230)
         self.COL_RAIN = (120,160,255,100)
-
-        # Precompute cell rects
-        self.rects = [[None]*self.sim.h for _ in range(self.sim.w)]
-        for x in range(self.sim.w):
-            for y in range(self.sim.h):
-                px = self.grid_origin[0] + x*(CELL_SIZE+MARGIN)
-                py = self.grid_origin[1] + y*(CELL_SIZE+MARGIN)
-                self.rects[x][y] = pygame.Rect(px, py, CELL_SIZE, CELL_SIZE)
+        self.rain_overlay = pygame.Surface((self.grid_w, self.grid_h), pygame.SRCALPHA).convert_alpha()
+        self.rain_overlay.fill(self.COL_RAIN)
+
+        # Cell top-left pixel coordinates by column / row; rect_of() materializes a Rect when needed
+        self._px = self.grid_origin[0] + np.arange(self.sim.w)*(CELL_SIZE+MARGIN)
+        self._py = self.grid_origin[1] + np.arange(self.sim.h)*(CELL_SIZE+MARGIN)
+        self._scratch_rect = pygame.Rect(0, 0, CELL_SIZE, CELL_SIZE)
+
+        # Soil layer: per-cell palette (layer × rgb) gathered into one pixel array and blitted
+        # through a colorkeyed surface; _px_index maps each pixel to its palette row
+        w, h, pitch = self.sim.w, self.sim.h, CELL_SIZE+MARGIN
+        tw, th = w*pitch - MARGIN, h*pitch - MARGIN
+        self.soil_pal = np.empty((w, h, 3, 3), dtype=np.uint8)
+        self.soil_pal[:, :, 0] = COLORKEY; self.soil_pal[:, :, 1] = SOIL_RGB
+        cell = (np.arange(tw)//pitch)[:, None]*h + (np.arange(th)//pitch)[None, :]
+        self._px_index = cell*3 + np.tile(cell_layers(), (w, h))[:tw, :th]
+        self.soil_rgb = np.empty((tw, th, 3), dtype=np.uint8)
+        self.soil_tile = pygame.Surface((tw, th)).convert(); self.soil_tile.set_colorkey(COLORKEY)
+
+        # Crop tiles keyed by (crop, growth bucket, health bucket, pest, disease), rendered on first use
+        self.tile_cache = {}
+
+        # Persistent grid composite: background + soil + crop tiles, patched per changed cell (draw_grid)
+        self._grid_rect = pygame.Rect(self.grid_origin, (tw, th))
+        self._grid_surface = pygame.Surface((tw, th)).convert()
+        self._grid_bg = None    # window background under the grid, captured on the first render
+        self._grid_changed = None
+        self._agent_sprites = {}    # (i % 2, ring offset) -> agent body + battery ring
+        self.state_q = None    # sim.quantized() buffer, refreshed once per render
+        self.cell_key = np.full((w, h), -1, dtype=np.int32)    # packed crop tile key per cell, -1 unplanted
+
+        # Cell state on the grid composite, and what was presented last frame for dirty-rect updates
+        self._prev_soil = None
+        self._prev_key = None
+        self._prev_agents = []
+        self._prev_toggles = None
+        self._prev_rain = None
+        self._prev_hud = None
+        self.exposed = False    # set on REPAINT_EVENTS: present the whole next frame
+        self.panel_rect = pygame.Rect(self.w-PANEL_W-2, 0, PANEL_W+2, self.h)
 
         # Weather toggles
-        self.conditions = {"rainy": False, "sunny": False, "wind_storm": False, "drought": False}
+        self._cond_bits = 0
 
         # UI controls (buttons are positioned dynamically near legend)
         self.buttons: List[ToggleButton] = []
@@ -82,19 +201,30 @@ class FarmViz:
 
         # Advisories scroll
         self.advisory_scroll = 0; self.advisory_line_h = 16
+        # Memoized advisories: (base summary, condition bits) -> list, and summary list -> wrapped lines.
+        # Inputs are compared by identity, so callers pass the same list object while it's unchanged.
+        self._adv_key = self._adv_val = None
+        self._adv_lines_src = self._adv_lines = None
+        self._adv_surface = None; self._scroll_dirty = True    # advisory box, rebuilt on scroll / new lines
 
         # Sim control
         self.paused = False
+        self.io_executor = ThreadPoolExecutor(max_workers=1)    # screenshot / snapshot writes
         self.move_every = MOVE_EVERY_N_TICKS_DEFAULT
         self.current_fps = FPS
 
-        # Reward shaping base (LLM multipliers at start); GUI conditions apply multiplicatively on top each tick
-        self.base_shaping = dict(self.sim.llm_shaping)
+        # Reward shaping base (LLM multipliers at start); GUI conditions apply multiplicatively on top
+        self.base_shaping_vec = np.array([self.sim.llm_shaping.get(k, 1.0) for k in SHAPING_KEYS], dtype=np.float64)
+        self._shaping_vec = np.empty_like(self.base_shaping_vec)
+        self._shaping_dirty = True
+        self._applied_day = None
+        self._rng = np.random.default_rng()    # the one generator for per-frame draws (wind jitter)
 
         # Cached rects for HUD layout
         self.legend_rect_cache = None
         self.controls_rect_cache = None
         self.hud_rect_cache = None
+        self._hud_surface = None    # HUD box + legend, rebuilt when position_hud moves it
 
     # -------- Weather Controls --------
     def _init_weather_toggles(self):
@@ -103,7 +233,7 @@ class FarmViz:
         def add(label, key):
             self.buttons.append(ToggleButton(
                 dummy, label,
-                get_state=lambda k=key: self.conditions[k],
+                get_state=lambda m=CONDITION_BITS[key]: bool(self._cond_bits & m),
                 set_state=lambda v,k=key: self._toggle_condition(k, v)
             ))
         add("Rainy", "rainy")
@@ -112,10 +242,17 @@ class FarmViz:
         add("Drought", "drought")
 
     def _toggle_condition(self, key, val):
-        self.conditions[key] = val
+        m = CONDITION_BITS[key]
+        self._cond_bits = (self._cond_bits | m) if val else (self._cond_bits & ~m)
+        self._shaping_dirty = True
         # simple mutual exclusivity for rainy/sunny
-        if key == "rainy" and val: self.conditions["sunny"] = False
-        if key == "sunny" and val: self.conditions["rainy"] = False
+        if key == "rainy" and val: self._cond_bits &= ~SUNNY
+        if key == "sunny" and val: self._cond_bits &= ~RAINY
+
+    @property
+    def conditions(self):
+        """{name: on} view of the toggle bits (snapshots, hotkeys)."""
+        return {k: bool(self._cond_bits & m) for k, m in CONDITION_BITS.items()}
 
     # --- Dynamic layout for bottom-left HUD (legend + buttons) ---
     def compute_legend_rect(self):
@@ -148,6 +285,7 @@ class FarmViz:
             (bx + bw + gap, by + bh + gap)
         ]
         for btn, (x, y) in zip(self.buttons, coords):
+            if btn.rect.size != (bw, bh): btn._cached.clear()
             btn.rect.update(x, y, bw, bh)
 
         # Controls bounding box (around buttons grid)
@@ -164,105 +302,200 @@ class FarmViz:
         bottom = max(legend.bottom, controls.bottom) + 8
         hud = pygame.Rect(left, top, right-left, bottom-top)
 
+        if hud != self.hud_rect_cache: self._hud_surface = None
         self.legend_rect_cache = legend
         self.controls_rect_cache = controls
         self.hud_rect_cache = hud
 
     # --------- Condition → Weather + Reward Shaping ---------
+    def overrides_stale(self):
+        """Conditions need re-applying: a toggle flipped, the sim rolled a new day's weather,
+        or it is an agent tick (wind jitter refresh)."""
+        return self._shaping_dirty or self.sim.day != self._applied_day or self.sim.ticks % self.move_every == 0
+
     def _apply_weather_overrides(self):
-        w = self.sim.weather; c = self.conditions
+        self._shaping_dirty = False; self._applied_day = self.sim.day
+        w = self.sim.weather; c = self._cond_bits
         # Reset shaping to base LLM multipliers
-        shaping = dict(self.base_shaping)
+        shaping = self._shaping_vec; shaping[:] = self.base_shaping_vec
 
-        if c["rainy"]:
+        if c & RAINY:
             w.rain = 1.0; w.humidity = max(w.humidity, 0.78)
             w.temp = min(max(w.temp, 20.0), 32.0)
-            w.wind_dx = random.uniform(-0.3, 0.3); w.wind_dy = random.uniform(-0.3, 0.3)
-            shaping["irrigate_multiplier"] *= 0.75
-            shaping["monitor_multiplier"] *= 1.05
-            shaping["fungicide_multiplier"] *= 1.05
-        if c["sunny"]:
+            w.wind_dx, w.wind_dy = self._rng.uniform(-0.3, 0.3, 2).tolist()
+            shaping[[IDX_IRRIGATE, IDX_MONITOR, IDX_FUNGICIDE]] *= (0.75, 1.05, 1.05)
+        if c & SUNNY:
             w.rain = 0.0; w.humidity = min(w.humidity, 0.5)
             w.temp = max(w.temp, 31.0)
-            w.wind_dx = random.uniform(-0.2, 0.2); w.wind_dy = random.uniform(-0.2, 0.2)
-            shaping["irrigate_multiplier"] *= 1.10
-            shaping["monitor_multiplier"] *= 1.05
-        if c["wind_storm"]:
-            w.wind_dx = random.uniform(-1.0, 1.0); w.wind_dy = random.uniform(-1.0, 1.0)
-            if not c["rainy"]:
+            w.wind_dx, w.wind_dy = self._rng.uniform(-0.2, 0.2, 2).tolist()
+            shaping[[IDX_IRRIGATE, IDX_MONITOR]] *= (1.10, 1.05)
+        if c & WIND_STORM:
+            w.wind_dx, w.wind_dy = self._rng.uniform(-1.0, 1.0, 2).tolist()
+            if not c & RAINY:
                 w.rain = 0.0; w.humidity = max(0.3, min(0.7, w.humidity))
-            shaping["monitor_multiplier"] *= 1.15
-            shaping["pesticide_multiplier"] *= 1.05
-        if c["drought"]:
+            shaping[[IDX_MONITOR, IDX_PESTICIDE]] *= (1.15, 1.05)
+        if c & DROUGHT:
             w.rain = 0.0; w.humidity = min(w.humidity, 0.35)
             w.temp = max(w.temp, 33.0)
-            w.wind_dx = random.uniform(-0.3, 0.3); w.wind_dy = random.uniform(-0.3, 0.3)
-            shaping["irrigate_multiplier"] *= 1.30
-            shaping["monitor_multiplier"] *= 1.05
+            w.wind_dx, w.wind_dy = self._rng.uniform(-0.3, 0.3, 2).tolist()
+            shaping[[IDX_IRRIGATE, IDX_MONITOR]] *= (1.30, 1.05)
 
-        self.sim.llm_shaping.update(shaping)
+        self.sim.llm_shaping.update(zip(SHAPING_KEYS, shaping.tolist()))
 
     def _active_condition_messages(self):
         msgs=[]
-        if self.conditions["rainy"]: msgs.append("Rainy — reduce irrigation; check drainage.")
-        if self.conditions["sunny"]: msgs.append("Sunny — watch moisture; irrigate if dry.")
-        if self.conditions["wind_storm"]: msgs.append("Wind storm — inspect lodging/damage; map hotspots.")
-        if self.conditions["drought"]: msgs.append("Drought — irrigate more; schedule water smartly.")
+        if self._cond_bits & RAINY: msgs.append("Rainy — reduce irrigation; check drainage.")
+        if self._cond_bits & SUNNY: msgs.append("Sunny — watch moisture; irrigate if dry.")
+        if self._cond_bits & WIND_STORM: msgs.append("Wind storm — inspect lodging/damage; map hotspots.")
+        if self._cond_bits & DROUGHT: msgs.append("Drought — irrigate more; schedule water smartly.")
         return msgs
 
     # --------------- Drawing helpers ---------------
-    def draw_cell(self, x, y):
-        c = self.sim.grid[x][y]; r = self.rects[x][y]
-        soil = (120, 85, 60); soil = (soil[0], int(soil[1]*(0.8+0.4*c.moisture)), soil[2])
-        pygame.draw.rect(self.screen, soil, r, border_radius=4)
-        if not c.crop:
-            if c.moisture > 0.7: pygame.draw.rect(self.screen, (110,160,110), r, 1, border_radius=4)
-            return
-        base = {"wheat": (205,190,100), "corn": (60,180,70), "soy": (70,160,120)}[c.crop]
-        h = c.health()
+    def rect_of(self, x, y):
+        """Screen rect of cell (x, y); a shared scratch Rect, so copy it to keep it."""
+        self._scratch_rect.topleft = (int(self._px[x]), int(self._py[y]))
+        return self._scratch_rect
+
+    def update_cells(self):
+        """Refresh the soil pixels and packed crop-tile keys from this frame's state snapshot."""
+        q = self.state_q
+        pal = self.soil_pal
+        if _cell_params is not None:
+            _cell_params(q, SOIL_G_LUT, GROWTH_LUT, HEALTH_LUT, pal, self.cell_key)
+        else:
+            self._cell_params_numpy(q)
+        np.take(pal.reshape(-1, 3), self._px_index, axis=0, out=self.soil_rgb)
+        pygame.surfarray.blit_array(self.soil_tile, self.soil_rgb)
+
+    def _cell_params_numpy(self, q):
+        pal = self.soil_pal
+        pal[:, :, 1, 1] = SOIL_G_LUT[q[Q_MOISTURE]]
+        pal[:, :, 2] = pal[:, :, 1]
+        pal[(q[Q_CROP] == 0) & (q[Q_MOISTURE] > WET_Q), 2] = WET_OUTLINE
+        xs, ys = np.nonzero(q[Q_CROP])
+        codes = q[Q_CROP, xs, ys].astype(np.int32) - 1
+        gb = GROWTH_LUT[q[Q_GROWTH, xs, ys]]
+        hb = HEALTH_LUT[q[Q_HEALTH, xs, ys]]
+        pests = q[Q_PEST, xs, ys] > MARK_Q
+        diseases = q[Q_DISEASE, xs, ys] > MARK_Q
+        self.cell_key.fill(-1)
+        self.cell_key[xs, ys] = (((codes*(GROWTH_BUCKETS+1) + gb)*(HEALTH_BUCKETS+1) + hb)*2 + pests)*2 + diseases
+
+    def crop_tile(self, key):
+        """Colorkeyed tile for one packed planted-cell key (see update_cells); drawn once, then cached."""
+        tile = self.tile_cache.get(key)
+        if tile is not None: return tile
+        rest, disease = divmod(key, 2); rest, pest = divmod(rest, 2)
+        rest, hb = divmod(rest, HEALTH_BUCKETS+1); code, gb = divmod(rest, GROWTH_BUCKETS+1)
+        growth, h = gb/GROWTH_BUCKETS, hb/HEALTH_BUCKETS
+        base = CROP_RGB[code]
         plant = (int(base[0]*(0.5+0.5*h)), int(base[1]*(0.6+0.5*h)), int(base[2]*(0.5+0.6*h)))
-        cx, cy = r.center; stem_h = int(r.h * (0.2 + 0.7*c.growth))
-        pygame.draw.line(self.screen, (50,120,50), (cx, r.bottom-3), (cx, r.bottom-3-stem_h), 3)
-        leaf_span = int(6 + 10*c.growth)
-        pygame.draw.line(self.screen, plant, (cx, r.bottom-8-int(0.3*stem_h)), (cx-leaf_span, r.bottom-10-int(0.5*stem_h)), 2)
-        pygame.draw.line(self.screen, plant, (cx, r.bottom-8-int(0.5*stem_h)), (cx+leaf_span, r.bottom-9-int(0.8*stem_h)), 2)
-        if c.pest > 0.2:
+        tile = pygame.Surface((CELL_SIZE+2*TILE_PAD,)*2).convert(); tile.fill(COLORKEY)
+        r = pygame.Rect(TILE_PAD, TILE_PAD, CELL_SIZE, CELL_SIZE)
+        cx = r.centerx; stem_h = int(r.h * (0.2 + 0.7*growth))
+        pygame.draw.line(tile, (50,120,50), (cx, r.bottom-3), (cx, r.bottom-3-stem_h), 3)
+        leaf_span = int(6 + 10*growth)
+        pygame.draw.line(tile, plant, (cx, r.bottom-8-int(0.3*stem_h)), (cx-leaf_span, r.bottom-10-int(0.5*stem_h)), 2)
+        pygame.draw.line(tile, plant, (cx, r.bottom-8-int(0.5*stem_h)), (cx+leaf_span, r.bottom-9-int(0.8*stem_h)), 2)
+        if pest:
             for i in range(2):
                 px = r.x + 4 + int((r.w-8)*(i*0.3 + 0.2))
                 py = r.y + r.h - 5 - int(stem_h*0.5) + i*3
-                gfxdraw.filled_circle(self.screen, px, py, 2, (190,40,40))
-        if c.disease > 0.2:
-            pygame.draw.circle(self.screen, (120,70,150), (r.x+int(0.3*r.w), r.y+int(0.6*r.h)), 3, 0)
+                gfxdraw.filled_circle(tile, px, py, 2, (190,40,40))
+        if disease:
+            pygame.draw.circle(tile, (120,70,150), (r.x+int(0.3*r.w), r.y+int(0.6*r.h)), 3, 0)
+        tile.set_colorkey(COLORKEY)
+        self.tile_cache[key] = tile
+        return tile
+
+    def _blit_tiles(self, xs, ys):
+        """Crop tiles of planted cells (xs, ys) onto the grid composite, in the given order."""
+        tile, gx, gy = self.crop_tile, self.grid_origin[0] + TILE_PAD, self.grid_origin[1] + TILE_PAD
+        dest = zip((self._px[xs] - gx).tolist(), (self._py[ys] - gy).tolist())
+        blit_many(self._grid_surface, [(tile(k), d) for k, d in zip(self.cell_key[xs, ys].tolist(), dest)])
+
+    def draw_grid(self):
+        """Bring the grid composite (background, soil, crop tiles) up to date and blit it.
+
+        Only cells whose soil colour or tile key changed since the last frame are redrawn,
+        each clipped to its padded tile rect together with the neighbouring tiles that overhang
+        into it; the whole composite is rebuilt on the first frame or when most cells changed.
+        """
+        g = self._grid_surface
+        if self._prev_soil is None:
+            changed = None
+        else:
+            changed = (self.soil_pal != self._prev_soil).any(axis=(2, 3)) | (self.cell_key != self._prev_key)
+        if changed is None or changed.sum() > FULL_REDRAW_FRACTION*changed.size:
+            g.blit(self._grid_bg, (0, 0)); g.blit(self.soil_tile, (0, 0))
+            self._blit_tiles(*np.nonzero(self.cell_key >= 0))
+            changed = None
+        else:
+            side, (gx, gy) = CELL_SIZE + 2*TILE_PAD, self.grid_origin
+            for x, y in zip(*np.nonzero(changed)):
+                r = pygame.Rect(int(self._px[x]) - gx - TILE_PAD, int(self._py[y]) - gy - TILE_PAD, side, side)
+                g.set_clip(r)
+                g.blit(self._grid_bg, r, r); g.blit(self.soil_tile, r, r)
+                x0, y0 = max(0, x-1), max(0, y-1)
+                xs, ys = np.nonzero(self.cell_key[x0:x+2, y0:y+2] >= 0)
+                self._blit_tiles(xs + x0, ys + y0)
+            g.set_clip(None)
+        self.screen.blit(g, self.grid_origin)
+        self._prev_soil = self.soil_pal.copy(); self._prev_key = self.cell_key.copy()
+        self._grid_changed = changed
+
+    def agent_sprite(self, i, ring):
+        """Body + battery ring for agent colour (i%2) and ring offset, drawn once then cached."""
+        key = (i % 2, ring)
+        sprite = self._agent_sprites.get(key)
+        if sprite is None:
+            c = AGENT_SPRITE_R
+            sprite = pygame.Surface((2*c+1, 2*c+1), pygame.SRCALPHA).convert_alpha()
+            gfxdraw.filled_circle(sprite, c, c, 7, (40,100,230) if i%2==0 else (230,120,40))
+            pygame.draw.circle(sprite, (20,20,20), (c, c), 7+ring, 1)
+            self._agent_sprites[key] = sprite
+        return sprite
 
     def draw_agents(self):
+        c = AGENT_SPRITE_R
         for i, a in enumerate(self.sim.agents):
-            r = self.rects[a.x][a.y]; cx, cy = r.center; radius = 7
-            col = (40,100,230) if i%2==0 else (230,120,40)
-            gfxdraw.filled_circle(self.screen, cx, cy, radius, col)
-            pygame.draw.circle(self.screen, (20,20,20), (cx, cy), radius+max(1, int(4*a.battery)), 1)
-            self.screen.blit(self.font_xs.render(str(i), True, (255,255,255)), (cx-4, cy-7))
+            cx, cy = self.rect_of(a.x, a.y).center
+            self.screen.blit(self.agent_sprite(i, max(1, int(4*a.battery))), (cx-c, cy-c))
+            self.screen.blit(render_text(self.font_xs, str(i), (255,255,255)), (cx-4, cy-7))
 
     def draw_weather_overlay(self):
         if self.sim.weather.rain > 0:
-            surf = pygame.Surface((self.grid_w, self.grid_h), pygame.SRCALPHA)
-            surf.fill(self.COL_RAIN); self.screen.blit(surf, self.grid_origin)
+            self.screen.blit(self.rain_overlay, self.grid_origin)
 
-    def _draw_legend(self, rect: pygame.Rect):
+    def _draw_legend(self, surface, rect: pygame.Rect):
         # Legend box
-        pygame.draw.rect(self.screen, (246,249,253), rect, border_radius=8)
-        pygame.draw.rect(self.screen, self.COL_FRAME, rect, 1, border_radius=8)
+        pygame.draw.rect(surface, (246,249,253), rect, border_radius=8)
+        pygame.draw.rect(surface, self.COL_FRAME, rect, 1, border_radius=8)
         x = rect.x + 10; y = rect.y + 8
-        self.screen.blit(self.font_sm.render("Legend", True, (33,66,120)), (x, y))
+        surface.blit(render_text(self.font_sm, "Legend", (33,66,120)), (x, y))
         y += 22
         # pest
-        gfxdraw.filled_circle(self.screen, x+8, y+6, 4, (190,40,40))
-        self.screen.blit(self.font_xs.render("Pest hotspot", True, self.COL_TEXT), (x+20, y))
+        gfxdraw.filled_circle(surface, x+8, y+6, 4, (190,40,40))
+        surface.blit(render_text(self.font_xs, "Pest hotspot", self.COL_TEXT), (x+20, y))
         y += 18
-        pygame.draw.circle(self.screen, (120,70,150), (x+8, y+6), 4, 0)
-        self.screen.blit(self.font_xs.render("Disease patch", True, self.COL_TEXT), (x+20, y))
+        pygame.draw.circle(surface, (120,70,150), (x+8, y+6), 4, 0)
+        surface.blit(render_text(self.font_xs, "Disease patch", self.COL_TEXT), (x+20, y))
         y += 18
-        pygame.draw.circle(self.screen, (20,20,20), (x+8, y+6), 8, 1)
-        self.screen.blit(self.font_xs.render("Robot (battery ring)", True, self.COL_TEXT), (x+20, y))
+        pygame.draw.circle(surface, (20,20,20), (x+8, y+6), 8, 1)
+        surface.blit(render_text(self.font_xs, "Robot (battery ring)", self.COL_TEXT), (x+20, y))
+
+    def _render_hud_surface(self):
+        """HUD background, legend and controls header, in HUD-local coordinates."""
+        hud = self.hud_rect_cache; ox, oy = hud.topleft
+        surf = pygame.Surface(hud.size, pygame.SRCALPHA).convert_alpha()
+        pygame.draw.rect(surf, (245,248,252), surf.get_rect(), border_radius=10)
+        pygame.draw.rect(surf, self.COL_FRAME, surf.get_rect(), 1, border_radius=10)
+        self._draw_legend(surf, self.legend_rect_cache.move(-ox, -oy))
+        controls = self.controls_rect_cache
+        header_y = controls.y - 22
+        surf.blit(render_text(self.font_xs, "Weather Controls", (70,90,110)),
+                  (controls.x - ox, max(hud.y+6, header_y) - oy))
+        return surf
 
     def _draw_hud(self):
         """Draw unified HUD box at bottom-left (legend + buttons)."""
@@ -271,45 +504,41 @@ class FarmViz:
         hud = self.hud_rect_cache
         if not (legend and controls and hud): return
 
-        # HUD background
-        pygame.draw.rect(self.screen, (245,248,252), hud, border_radius=10)
-        pygame.draw.rect(self.screen, self.COL_FRAME, hud, 1, border_radius=10)
-
-        # Legend
-        self._draw_legend(legend)
-
-        # Buttons (with tiny section header)
-        header_y = controls.y - 22
-        self.screen.blit(self.font_xs.render("Weather Controls", True, (70,90,110)),
-                         (controls.x, max(hud.y+6, header_y)))
+        if self._hud_surface is None: self._hud_surface = self._render_hud_surface()
+        self.screen.blit(self._hud_surface, hud.topleft)
         for btn in self.buttons:
             btn.draw(self.screen, self.font_sm)
 
     def _section_title(self, text, y):
-        self.screen.blit(self.font_md.render(text, True, (33,66,120)), (self.w-PANEL_W+16, y))
+        self.screen.blit(render_text(self.font_md, text, (33,66,120)), (self.w-PANEL_W+16, y))
         pygame.draw.line(self.screen, self.COL_FRAME, (self.w-PANEL_W+14, y+22), (self.w-18, y+22), 1)
         return y + 30
 
     def _kv(self, k, v, x, y):
-        self.screen.blit(self.font_sm.render(str(k)+":", True, self.COL_TEXT), (self.w-PANEL_W+x, y))
-        self.screen.blit(self.font_sm.render(str(v), True, self.COL_TEXT), (self.w-PANEL_W+170, y))
+        self.screen.blit(render_text(self.font_sm, str(k)+":", self.COL_TEXT), (self.w-PANEL_W+x, y))
+        self.screen.blit(render_text(self.font_sm, str(v), self.COL_TEXT), (self.w-PANEL_W+170, y))
 
     def _wrap(self, text, width, font):
-        words, lines, cur = text.split(), [], ""
-        for w in words:
-            if font.size(cur + (" " if cur else "") + w)[0] <= width:
-                cur = (cur + " " + w) if cur else w
-            else:
-                lines.append(cur); cur = w
-        if cur: lines.append(cur)
-        return lines
+        return wrap_lines(text, width, font)
+
+    def _render_advisories(self, size):
+        """Advisory box with the visible wrapped lines at the current scroll, in box-local coordinates."""
+        surf = pygame.Surface(size, pygame.SRCALPHA).convert_alpha(); box = surf.get_rect()
+        pygame.draw.rect(surf, (246,249,253), box, border_radius=8)
+        pygame.draw.rect(surf, self.COL_FRAME, box, 1, border_radius=8)
+        inner_y = 10 + self.advisory_scroll
+        for line in self._adv_lines:
+            if 0 <= inner_y <= box.bottom-14:
+                surf.blit(render_text(self.font_sm, line, (40,80,120)), (10, inner_y))
+            inner_y += self.advisory_line_h
+        return surf
 
     def panel(self, llm_summary: list):
         panel = pygame.Rect(self.w-PANEL_W, 0, PANEL_W, self.h)
         pygame.draw.rect(self.screen, self.COL_PANEL, panel)
         pygame.draw.line(self.screen, self.COL_FRAME, (self.w-PANEL_W,0), (self.w-PANEL_W,self.h), 2)
 
-        title = self.font_lg.render("Farm Dashboard", True, self.COL_TEXT)
+        title = render_text(self.font_lg, "Farm Dashboard", self.COL_TEXT)
         self.screen.blit(title, (self.w-PANEL_W+16, 12))
 
         # Weather readouts
@@ -326,7 +555,7 @@ class FarmViz:
         self._kv("FPS (visual)", f"{self.current_fps}", 16, y); y+=12
         self._kv("Paused", "Yes" if self.paused else "No", 16, y); y+=12
         hint = "Hotkeys: R Rainy, S Sunny, W Wind, D Drought | Space Pause, N Step | +/- Move | [/] FPS | P PNG | O JSON"
-        self.screen.blit(self.font_xs.render(hint, True, (70,90,110)), (self.w-PANEL_W+16, y+6))
+        self.screen.blit(render_text(self.font_xs, hint, (70,90,110)), (self.w-PANEL_W+16, y+6))
         y += 28
 
         # Metrics
@@ -340,31 +569,32 @@ class FarmViz:
         # Advisories (scrollable)
         y = self._section_title("Advisories", y+6)
         clip = pygame.Rect(self.w-PANEL_W+14, y, PANEL_W-28, 210)
-        pygame.draw.rect(self.screen, (246,249,253), clip, border_radius=8)
-        pygame.draw.rect(self.screen, self.COL_FRAME, clip, 1, border_radius=8)
-        inner_x, inner_y = clip.x+10, clip.y+10 + self.advisory_scroll
-        lines = []
-        for s in llm_summary:
-            lines.extend(self._wrap(s, clip.w-20, self.font_sm)); lines.append("")
-        for line in lines:
-            if clip.top <= inner_y <= clip.bottom-14:
-                self.screen.blit(self.font_sm.render(line, True, (40,80,120)), (inner_x, inner_y))
-            inner_y += self.advisory_line_h
+        if llm_summary is not self._adv_lines_src:
+            lines = []
+            for s in llm_summary:
+                lines.extend(self._wrap(s, clip.w-20, self.font_sm)); lines.append("")
+            self._adv_lines_src, self._adv_lines = llm_summary, lines
+            self._scroll_dirty = True
+        if self._scroll_dirty:
+            self._adv_surface = self._render_advisories(clip.size)
+            self._scroll_dirty = False
+        self.screen.blit(self._adv_surface, clip.topleft)
 
         # Agents
         y = self._section_title("Agents", clip.bottom + 14)
         for i, a in enumerate(self.sim.agents[:6]):
             line = f"#{i} ({a.x},{a.y})  {a.last_action:>12}  r:{a.reward:.2f}  bat:{a.battery:.2f}"
-            self.screen.blit(self.font_xs.render(line, True, self.COL_TEXT), (self.w-PANEL_W+16, y)); y += 18
+            self.screen.blit(render_text(self.font_xs, line, self.COL_TEXT), (self.w-PANEL_W+16, y)); y += 18
 
     def render(self, llm_summary: list):
         self.screen.fill(self.COL_BG)
         pygame.draw.rect(self.screen, (220,228,238), (*self.grid_origin, self.grid_w, self.grid_h), 2, border_radius=10)
 
         # Grid
-        for x in range(self.sim.w):
-            for y in range(self.sim.h):
-                self.draw_cell(x, y)
+        if self._grid_bg is None: self._grid_bg = self.screen.subsurface(self._grid_rect).copy()
+        self.state_q = self.sim.quantized(self.state_q)
+        self.update_cells()
+        self.draw_grid()
         self.draw_agents()
         self.draw_weather_overlay()
 
@@ -374,14 +604,43 @@ class FarmViz:
         # Right panel
         self.panel(llm_summary)
 
-        pygame.display.flip()
-        self.clock.tick(self.current_fps)
+        dirty = self._dirty_rects()
+        if dirty is None or sum(r.w*r.h for r in dirty) > 0.5*self.w*self.h:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+
+    def _dirty_rects(self):
+        """Screen rects that may differ from the last presented frame, or None if the whole
+        grid changed (first frame, window exposed, rain toggled, HUD moved)."""
+        pad = 2*TILE_PAD
+        agents = [self.rect_of(a.x, a.y).inflate(pad, pad) for a in self.sim.agents]
+        toggles = self._cond_bits
+        rain = self.sim.weather.rain > 0
+        whole = (self._grid_changed is None or self.exposed or rain != self._prev_rain
+                 or self.hud_rect_cache != self._prev_hud)
+        self.exposed = False
+        if not whole:
+            xs, ys = np.nonzero(self._grid_changed)
+            side = CELL_SIZE + pad
+            dirty = [pygame.Rect(x, y, side, side) for x, y in zip((self._px[xs] - TILE_PAD).tolist(), (self._py[ys] - TILE_PAD).tolist())]
+            dirty += self._prev_agents + agents
+            if toggles != self._prev_toggles and self.hud_rect_cache: dirty.append(self.hud_rect_cache)
+            dirty.append(self.panel_rect)
+
+        self._prev_agents, self._prev_toggles = agents, toggles
+        self._prev_rain, self._prev_hud = rain, self.hud_rect_cache
+        return None if whole else dirty
 
     def dynamic_summary(self, base_summary: List[str]) -> List[str]:
+        key = self._adv_key
+        if key and key[0] is base_summary and key[1] == self._cond_bits:
+            return self._adv_val
         msgs = list(base_summary); msgs.extend(self._active_condition_messages())
         seen, out = set(), []
         for m in msgs:
             if m not in seen: out.append(m); seen.add(m)
+        self._adv_key, self._adv_val = (base_summary, self._cond_bits), out
         return out
 
 def simulate_and_render(sim: FarmSimulator, agents, base_llm_summary):
@@ -390,23 +649,26 @@ def simulate_and_render(sim: FarmSimulator, agents, base_llm_summary):
     while running:
         # Update HUD layout first so event hitboxes are correct
         viz.position_hud()
+        steps = 0    # N presses while paused
+        events = pygame.event.get(INPUT_EVENTS)
 
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT: running = False
+            elif event.type in REPAINT_EVENTS: viz.exposed = True
             elif event.type == pygame.MOUSEWHEEL:
-                viz.advisory_scroll += event.y * 12
-                viz.advisory_scroll = max(-600, min(0, viz.advisory_scroll))
+                scroll = max(-600, min(0, viz.advisory_scroll + event.y * 12))
+                if scroll != viz.advisory_scroll:
+                    viz.advisory_scroll = scroll; viz._scroll_dirty = True
             elif event.type == pygame.KEYDOWN:
                 k = event.key
                 # Weather hotkeys
-                if k == pygame.K_r: viz._toggle_condition("rainy", not viz.conditions["rainy"])
-                elif k == pygame.K_s: viz._toggle_condition("sunny", not viz.conditions["sunny"])
-                elif k == pygame.K_w: viz._toggle_condition("wind_storm", not viz.conditions["wind_storm"])
-                elif k == pygame.K_d: viz._toggle_condition("drought", not viz.conditions["drought"])
+                if k == pygame.K_r: viz._toggle_condition("rainy", not viz._cond_bits & RAINY)
+                elif k == pygame.K_s: viz._toggle_condition("sunny", not viz._cond_bits & SUNNY)
+                elif k == pygame.K_w: viz._toggle_condition("wind_storm", not viz._cond_bits & WIND_STORM)
+                elif k == pygame.K_d: viz._toggle_condition("drought", not viz._cond_bits & DROUGHT)
                 # Pause/Step
                 elif k == pygame.K_SPACE: viz.paused = not viz.paused
-                elif k == pygame.K_n and viz.paused:
-                    viz._apply_weather_overrides(); sim.step()
+                elif k == pygame.K_n and viz.paused: steps += 1
                 # Move speed (+ slower, - faster)
                 elif k in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
                     viz.move_every = min(60, viz.move_every + 1)
@@ -420,8 +682,7 @@ def simulate_and_render(sim: FarmSimulator, agents, base_llm_summary):
                 # Screenshot & Snapshot
                 elif k == pygame.K_p:
                     fname = f"screenshot_{int(time.time())}.png"
-                    pygame.image.save(viz.screen, fname)
-                    print(f"Saved screenshot: {fname}")
+                    viz.io_executor.submit(save_screenshot, viz.screen.copy(), fname)
                 elif k == pygame.K_o:
                     snap = {
                         "ticks": sim.ticks,
@@ -434,33 +695,36 @@ def simulate_and_render(sim: FarmSimulator, agents, base_llm_summary):
                         "llm_shaping": dict(sim.llm_shaping),
                     }
                     fname = f"snapshot_{int(time.time())}.json"
-                    with open(fname, "w") as f: json.dump(snap, f, indent=2)
-                    print(f"Saved snapshot: {fname}")
+                    viz.io_executor.submit(dump_snapshot, snap, fname)
 
             # Button clicks (legend-adjacent)
             for b in viz.buttons: b.handle(event)
 
+        # Input → conditions → sim → render all land in this frame, so a toggle or step
+        # key takes effect on the frame it was pressed
         if viz.paused:
-            summary = viz.dynamic_summary(base_llm_summary)
-            viz.render(summary)
+            for _ in range(steps):
+                viz._apply_weather_overrides(); sim.step()
+            if events:
+                summary = viz.dynamic_summary(base_llm_summary)
+                viz.render(summary)
+            # Nothing changes without input: sleep on the queue instead of redrawing at FPS
+            ev = pygame.event.wait(50)
+            if ev.type != pygame.NOEVENT: pygame.event.post(ev)
             continue
 
-        # Apply condition effects each frame
-        viz._apply_weather_overrides()
+        # Apply condition effects when they could have changed
+        if viz.overrides_stale(): viz._apply_weather_overrides()
 
         # Agent loop (throttled by viz.move_every)
         if sim.ticks % viz.move_every == 0:
-            for i, agent in enumerate(agents):
-                action, (dx, dy) = agent.act(sim)
-                move_agent(sim, i, dx, dy)
-                sim.apply_action(i, action)
-                a = sim.agents[i]
-                if (a.x, a.y) in BASE_LOCATIONS and action == "idle":
-                    a.battery = min(MAX_BATTERY, a.battery + BATTERY_RECHARGE_PER_TICK)
+            sim.step_agents(agents)
 
         # Environment step & render
         sim.step()
         summary = viz.dynamic_summary(base_llm_summary)
         viz.render(summary)
+        viz.clock.tick(viz.current_fps)
 
+    viz.io_executor.shutdown(wait=True)
     pygame.quit()
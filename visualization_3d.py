@@ -7,7 +7,6 @@
 # - All features from 2D version preserved
 
 import pygame
-import random
 import json
 import time
 import math
@@ -15,43 +14,269 @@ import numpy as np
 from pygame.locals import *
 from OpenGL.GL import *
 from OpenGL.GLU import *
+from OpenGL.arrays import vbo
 from typing import List
 from config import *
-from simulator import FarmSimulator
-from rl_swarm import move_agent
+from simulator import FarmSimulator, CROP_TYPES, Q_CROP, Q_MOISTURE, Q_GROWTH, Q_HEALTH, Q_PEST, Q_DISEASE, Q_MAX
+from camera3d import Camera3D
+from text_cache import render_text
 
 # --- Defaults ---
 MOVE_EVERY_N_TICKS_DEFAULT = 8
+RENDER_FPS_CAP = FPS          # frame cap when vsync is unavailable; the sim rate is current_fps
+MAX_CATCHUP_TICKS = 8         # most sim ticks run in one frame after a stall
 
-class Camera3D:
-    def __init__(self):
-        self.distance = 60.0
-        self.angle_h = 45.0  # horizontal angle
-        self.angle_v = 30.0  # vertical angle
-        self.target = [0, 0, 0]
-        self.mouse_sensitivity = 0.3
-        self.zoom_speed = 2.0
-        
-    def apply(self):
-        glLoadIdentity()
-        # Calculate camera position
-        rad_h = math.radians(self.angle_h)
-        rad_v = math.radians(self.angle_v)
-        
-        x = self.distance * math.cos(rad_v) * math.cos(rad_h)
-        y = self.distance * math.sin(rad_v)
-        z = self.distance * math.cos(rad_v) * math.sin(rad_h)
-        
-        gluLookAt(x, y, z, 
-                  self.target[0], self.target[1], self.target[2],
-                  0, 1, 0)
-    
-    def rotate(self, dx, dy):
-        self.angle_h += dx * self.mouse_sensitivity
-        self.angle_v = max(-89, min(89, self.angle_v + dy * self.mouse_sensitivity))
-    
-    def zoom(self, delta):
-        self.distance = max(20, min(150, self.distance - delta * self.zoom_speed))
+# ---------------- Cell meshes (built once, GL_TRIANGLES) ----------------
+# Unit cube quads as (corners, normal); each quad is split into two triangles
+CUBE_FACES = [
+    ([(-.5,-.5, .5), ( .5,-.5, .5), ( .5, .5, .5), (-.5, .5, .5)], (0, 0, 1)),
+    ([(-.5,-.5,-.5), (-.5, .5,-.5), ( .5, .5,-.5), ( .5,-.5,-.5)], (0, 0,-1)),
+    ([(-.5, .5,-.5), (-.5, .5, .5), ( .5, .5, .5), ( .5, .5,-.5)], (0, 1, 0)),
+    ([(-.5,-.5,-.5), ( .5,-.5,-.5), ( .5,-.5, .5), (-.5,-.5, .5)], (0,-1, 0)),
+    ([( .5,-.5,-.5), ( .5, .5,-.5), ( .5, .5, .5), ( .5,-.5, .5)], (1, 0, 0)),
+    ([(-.5,-.5,-.5), (-.5,-.5, .5), (-.5, .5, .5), (-.5, .5,-.5)], (-1,0, 0)),
+]
+
+def cube_mesh():
+    """(36, 3) positions and (36, 3) normals of the unit cube."""
+    pos = np.array([c[i] for c, _ in CUBE_FACES for i in (0, 1, 2, 0, 2, 3)], dtype=np.float32)
+    nrm = np.repeat(np.array([n for _, n in CUBE_FACES], dtype=np.float32), 6, axis=0)
+    return pos, nrm
+
+def icosphere():
+    """(60, 3) unit icosahedron triangle vertices; on a unit sphere they double as normals."""
+    t = (1 + 5 ** 0.5) / 2
+    v = np.array([(-1, t, 0), (1, t, 0), (-1, -t, 0), (1, -t, 0), (0, -1, t), (0, 1, t),
+                  (0, -1, -t), (0, 1, -t), (t, 0, -1), (t, 0, 1), (-t, 0, -1), (-t, 0, 1)], dtype=np.float32)
+    v /= np.linalg.norm(v, axis=1, keepdims=True)
+    faces = [(0, 11, 5), (0, 5, 1), (0, 1, 7), (0, 7, 10), (0, 10, 11), (1, 5, 9), (5, 11, 4),
+             (11, 10, 2), (10, 7, 6), (7, 1, 8), (3, 9, 4), (3, 4, 2), (3, 2, 6), (3, 6, 8),
+             (3, 8, 9), (4, 9, 5), (2, 4, 11), (6, 2, 10), (8, 6, 7), (9, 8, 1)]
+    return v[np.array(faces).ravel()]
+
+def stem_mesh(base=0.05, top=0.03, slices=8):
+    """Open tapered cylinder along +Y as (xz offsets, t in {0,1}, radial normals); y = t * height."""
+    a = np.arange(slices + 1) * (2 * math.pi / slices)
+    ang = a[np.array([(i, i + 1, i + 1, i, i + 1, i) for i in range(slices)]).ravel()]
+    t = np.tile(np.array([0, 0, 1, 0, 1, 1], dtype=np.float32), slices)
+    r = base + (top - base) * t
+    xz = np.stack([np.cos(ang) * r, np.zeros_like(r), np.sin(ang) * r], axis=1).astype(np.float32)
+    nrm = np.stack([np.cos(ang), np.zeros_like(ang), np.sin(ang)], axis=1).astype(np.float32)
+    return xz, t, nrm
+
+def torus_mesh(inner, outer, sides, rings):
+    """Quad-strip positions and normals, `rings` strips of 2*(sides+1) vertices each, in the
+    xy plane; the ring/side trig is evaluated once as two small tables."""
+    s = (np.arange(rings)[:, None] + np.arange(2)) % rings + 0.5          # (rings, 2)
+    t = np.arange(sides + 1) % sides                                     # (sides+1,)
+    cos1, sin1 = np.cos(s * 2 * math.pi / rings), np.sin(s * 2 * math.pi / rings)
+    cos2, sin2 = np.cos(t * 2 * math.pi / sides), np.sin(t * 2 * math.pi / sides)
+    # (rings, sides+1, 2): strip vertex order alternates the two ring angles per side
+    c1, s1 = cos1[:, None, :], sin1[:, None, :]
+    c2, s2 = cos2[None, :, None], sin2[None, :, None]
+    r = outer + inner * c2
+    pos = np.stack(np.broadcast_arrays(r * c1, r * s1, inner * s2), axis=-1)
+    nrm = np.stack(np.broadcast_arrays(c2 * c1, c2 * s1, s2), axis=-1)
+    return pos.reshape(-1, 3).astype(np.float32), nrm.reshape(-1, 3).astype(np.float32)
+
+CELL_PITCH = 2.0               # world units between cell centers
+SOIL_SIZE = (1.8, 0.1, 1.8)    # soil block extents, top face at y=0
+SOIL_RGB = np.array([0.47, 0.33, 0.24], dtype=np.float32)
+STEM_RGB = (0.2, 0.47, 0.2)
+PEST_RGB = (0.75, 0.16, 0.16)
+DISEASE_RGB = (0.47, 0.27, 0.59)
+CROP_RGB = np.array([{"wheat": (0.80, 0.75, 0.39), "corn": (0.24, 0.71, 0.27),
+                      "soy": (0.27, 0.63, 0.47)}.get(c, (0.31, 0.69, 0.31)) for c in CROP_TYPES], dtype=np.float32)
+LEAF_PALETTE = np.vstack([np.zeros(3, np.float32), CROP_RGB])  # indexed by crop id (0 = no crop)
+LEAF_N = 3
+MARK_THRESHOLD = 0.2           # pest/disease level that shows an indicator sphere
+
+_CUBE_POS, _CUBE_NRM = cube_mesh()
+_ICO = icosphere()
+_STEM_XZ, _STEM_T, _STEM_NRM = stem_mesh()
+_LEAF_COS = np.cos(np.arange(LEAF_N) * (2 * math.pi / LEAF_N)).astype(np.float32)
+_LEAF_SIN = np.sin(np.arange(LEAF_N) * (2 * math.pi / LEAF_N)).astype(np.float32)
+_LEAF_Y = (0.5 + 0.15 * np.arange(LEAF_N)).astype(np.float32)  # leaf height as a fraction of the stem
+
+# Per-cell vertex ranges inside the batch: soil | stem | leaves | pest | disease
+SOIL_V = len(_CUBE_POS)
+STEM_V = len(_STEM_XZ)
+SPHERE_V = len(_ICO)
+_STEM0 = SOIL_V
+_LEAF0 = _STEM0 + STEM_V
+_PEST0 = _LEAF0 + LEAF_N * SPHERE_V
+_DIS0 = _PEST0 + SPHERE_V
+VERTS_PER_CELL = _DIS0 + SPHERE_V
+MAX_UPLOAD_RUNS = 32           # more changed runs than this: upload one covering span
+RAIN_DROPS = 100
+CULL_CENTER_Y = 1.5            # bounding sphere of a cell's soil + crop for frustum tests
+CULL_RADIUS = 2.5
+LOD_FAR = 150.0                # cells farther than this from the eye draw only their soil block
+                               # (leaves are ~2 px there at 1280x800, 45° fov)
+
+CONTROL_HINTS = [
+    "Camera: Drag mouse to rotate | Scroll to zoom",
+    "Hotkeys: R Rainy | S Sunny | W Wind | D Drought",
+    "Space Pause | N Step | +/- Speed | P Screenshot"
+]
+PANEL_SECTIONS = ("Weather", "Control", "Metrics", "Agents")
+
+# Condition -> weather/shaping modifier tables, rows in CONDITION_KEYS order
+CONDITION_KEYS = ("rainy", "sunny", "wind_storm", "drought")
+SHAPING_KEYS = ("irrigate_multiplier", "monitor_multiplier", "fungicide_multiplier")
+INF = np.inf
+CONDITION_WEATHER_LO = np.array([  # (temp, humidity, rain) lower bounds
+    (20.0, 0.78, 1.0), (31.0, -INF, 0.0), (-INF, -INF, -INF), (33.0, -INF, 0.0)])
+CONDITION_WEATHER_HI = np.array([  # (temp, humidity, rain) upper bounds
+    (32.0, INF, 1.0), (INF, 0.5, 0.0), (INF, INF, INF), (INF, 0.35, 0.0)])
+CONDITION_WIND = np.array([0.3, 0.0, 1.0, 0.0])  # wind re-rolled uniformly in [-span, span]
+CONDITION_SHAPING = np.array([(0.75, 1.05, 1.05), (1.10, 1.0, 1.0), (1.0, 1.15, 1.0), (1.30, 1.0, 1.0)])
+PANEL_KEYS = ("Day", "Temp (°C)", "Humidity", "Rain", "Move every", "Sim rate", "Paused",
+              "Yield (Σ)", "Sustainability", "Water Used", "Chemicals")
+
+class CellBatch:
+    """Soil block, stem, leaves and pest/disease markers of every cell in one interleaved VBO
+    drawn with a single glDrawArrays. Cells whose quantized state changed since the last
+    update are rebuilt with NumPy broadcasts and only their vertex ranges are re-uploaded.
+
+    Cell state is read from `soa`, a (6, w, h) float32 copy of the simulator fields in
+    quantized() row order (Q_CROP holds the crop id, 0 = none), refreshed once per sim tick.
+
+    Hidden parts (no crop, marker below threshold) are collapsed to a point so every cell
+    keeps a fixed vertex range.
+    """
+    STRIDE = 10 * 4  # xyz, normal, rgba (float32)
+
+    def __init__(self, sim: FarmSimulator):
+        self.sim = sim
+        n = sim.w * sim.h
+        gx, gy = np.divmod(np.arange(n), sim.h)  # cell index x*h + y, like sim arrays .ravel()
+        # world x / z of each grid column / row (grid size is fixed)
+        self.cell_wx = ((np.arange(sim.w) - sim.w / 2) * CELL_PITCH).astype(np.float32)
+        self.cell_wz = ((np.arange(sim.h) - sim.h / 2) * CELL_PITCH).astype(np.float32)
+        self.origin = np.stack([self.cell_wx[gx], np.zeros(n, np.float32), self.cell_wz[gy]], axis=1)
+        self.centers_h = np.stack([self.cell_wx[gx], np.full(n, CULL_CENTER_Y, np.float32), self.cell_wz[gy],
+                                   np.ones(n, np.float32)], axis=1)  # homogeneous cull centers
+
+        tmpl = np.zeros((VERTS_PER_CELL, 10), dtype=np.float32)
+        tmpl[:, 9] = 1.0
+        tmpl[:SOIL_V, 0:3] = _CUBE_POS * SOIL_SIZE - (0, SOIL_SIZE[1] / 2, 0)
+        tmpl[:SOIL_V, 3:6] = _CUBE_NRM
+        tmpl[_STEM0:_LEAF0, 3:6] = _STEM_NRM
+        tmpl[_STEM0:_LEAF0, 6:9] = STEM_RGB
+        tmpl[_LEAF0:, 3:6] = np.tile(_ICO, (LEAF_N + 2, 1))
+        tmpl[_PEST0:_DIS0, 6:9] = PEST_RGB
+        tmpl[_DIS0:, 6:9] = DISEASE_RGB
+        self.template = tmpl
+
+        self.data = np.empty((n, VERTS_PER_CELL, 10), dtype=np.float32)
+        self.soa = np.empty((6, sim.w, sim.h), dtype=np.float32)
+        self.state_q = np.empty((6, sim.w, sim.h), dtype=np.uint8)
+        self._soa_tick = None
+        self._sync_soa()
+        self.prev_q = self.state_q.copy()
+        self._fill(np.arange(n))
+        self.vbo = vbo.VBO(self.data, usage=GL_DYNAMIC_DRAW)
+        self.count = n * VERTS_PER_CELL
+
+    def _sync_soa(self):
+        """Snapshot the simulator into `soa` and `state_q`; False if the tick hasn't advanced."""
+        sim = self.sim
+        if sim.ticks == self._soa_tick: return False
+        self._soa_tick = sim.ticks
+        soa = self.soa
+        np.add(sim.crop, 1, out=soa[Q_CROP], casting="unsafe")
+        for row, field in ((Q_MOISTURE, sim.moisture), (Q_GROWTH, sim.growth), (Q_HEALTH, sim.health()),
+                           (Q_PEST, sim.pest), (Q_DISEASE, sim.disease)):
+            soa[row] = field
+        self.state_q[Q_CROP] = soa[Q_CROP]
+        np.rint(soa[Q_MOISTURE:] * Q_MAX, out=self.state_q[Q_MOISTURE:], casting="unsafe")
+        return True
+
+    def _fill(self, idx):
+        """Rebuild the vertices of cells `idx` (flat x*h + y indices) in self.data."""
+        xs, ys = np.divmod(idx, self.sim.h)
+        cell = self.soa[:, xs, ys]  # (6, k), one gather for all fields
+        moist, growth, health = cell[Q_MOISTURE], cell[Q_GROWTH], cell[Q_HEALTH]
+        pest, disease = cell[Q_PEST], cell[Q_DISEASE]
+        crop_id = cell[Q_CROP].astype(np.intp)
+        has = (crop_id > 0).astype(np.float32)
+
+        out = np.empty((len(idx), VERTS_PER_CELL, 10), dtype=np.float32)
+        out[:] = self.template
+        pos, rgb = out[:, :, 0:3], out[:, :, 6:9]
+
+        rgb[:, :SOIL_V] = ((0.8 + 0.4 * moist)[:, None] * SOIL_RGB)[:, None, :]
+
+        stem_h = 0.5 + 2.5 * growth
+        pos[:, _STEM0:_LEAF0] = _STEM_XZ
+        pos[:, _STEM0:_LEAF0, 1] = _STEM_T * stem_h[:, None]
+
+        # leaves: LEAF_N spheres around the stem, spread and size grow with growth
+        offset = 0.15 + 0.2 * growth
+        centers = np.empty((len(idx), LEAF_N, 3), dtype=np.float32)
+        centers[:, :, 0] = _LEAF_COS * offset[:, None]
+        centers[:, :, 1] = stem_h[:, None] * _LEAF_Y
+        centers[:, :, 2] = _LEAF_SIN * offset[:, None]
+        radius = 0.15 + 0.15 * growth
+        pos[:, _LEAF0:_PEST0] = (centers[:, :, None, :] + radius[:, None, None, None] * _ICO).reshape(len(idx), -1, 3)
+        leaf_rgb = LEAF_PALETTE[crop_id] * (0.6 + 0.4 * health)[:, None]
+        rgb[:, _LEAF0:_PEST0] = leaf_rgb[:, None, :]
+
+        for start, level, r, dx, fy in ((_PEST0, pest, 0.08, 0.2, 0.7), (_DIS0, disease, 0.1, -0.2, 0.6)):
+            seg = pos[:, start:start + SPHERE_V]
+            seg[:] = _ICO * (r * (level > MARK_THRESHOLD))[:, None, None]
+            seg[:, :, 0] += dx
+            seg[:, :, 1] += (stem_h * fy)[:, None]
+
+        pos[:, _STEM0:] *= has[:, None, None]  # no crop: collapse stem/leaves/markers to the origin
+        pos += self.origin[idx][:, None, :]
+        self.data[idx] = out
+
+    def update(self):
+        """Rebuild and re-upload only the cells whose quantized state changed."""
+        if not self._sync_soa(): return  # paused / no sim step since last frame
+        q = self.state_q
+        idx = np.flatnonzero((q != self.prev_q).any(axis=0))
+        if len(idx) == 0: return
+        self.prev_q[...] = q
+        self._fill(idx)
+        runs = np.split(idx, np.flatnonzero(np.diff(idx) != 1) + 1)
+        if len(runs) > MAX_UPLOAD_RUNS:
+            runs = [idx[[0, -1]]]
+        for r in runs:
+            lo, hi = int(r[0]), int(r[-1]) + 1
+            self.vbo[lo:hi] = self.data[lo:hi]  # glBufferSubData of this range on next bind
+
+    def visible_ranges(self, planes, eye):
+        """(first, count) vertex ranges of cells inside the frustum `planes` (6, 4); cells beyond
+        LOD_FAR from `eye` get only their soil block (the first SOIL_V vertices of the cell)."""
+        idx = np.flatnonzero((self.centers_h @ planes.T >= -CULL_RADIUS).all(axis=1))
+        near = ((self.origin[idx] - eye) ** 2).sum(axis=1) < LOD_FAR ** 2
+        first = (idx * VERTS_PER_CELL).astype(np.int32)
+        count = np.where(near, VERTS_PER_CELL, SOIL_V).astype(np.int32)
+        return first, count
+
+    def draw(self, camera=None):
+        """Draw every cell, or with `camera` only the visible ones at their LOD."""
+        if camera is not None:
+            first, count = self.visible_ranges(camera.planes, camera.eye)
+            if len(first) == 0: return
+        self.vbo.bind()
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, self.STRIDE, self.vbo)
+        glNormalPointer(GL_FLOAT, self.STRIDE, self.vbo + 12)
+        glColorPointer(4, GL_FLOAT, self.STRIDE, self.vbo + 24)
+        if camera is None:
+            glDrawArrays(GL_TRIANGLES, 0, self.count)
+        else:
+            glMultiDrawArrays(GL_TRIANGLES, first, count, len(first))
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        self.vbo.unbind()
 
 class ToggleButton:
     def __init__(self, rect, label, get_state, set_state):
@@ -67,7 +292,7 @@ class ToggleButton:
         fg = (22, 60, 30) if active else (35, 45, 58)
         pygame.draw.rect(surface, bg, self.rect, border_radius=10)
         pygame.draw.rect(surface, border, self.rect, 1, border_radius=10)
-        text = font.render(self.label + ("  ●" if active else "  ○"), True, fg)
+        text = render_text(font, self.label + ("  ●" if active else "  ○"), fg)
         surface.blit(text, (self.rect.x + (self.rect.w - text.get_width()) // 2,
                             self.rect.y + (self.rect.h - text.get_height()) // 2))
     
@@ -84,11 +309,21 @@ class FarmViz3D:
         self.h = WINDOW_H
         
         # Create OpenGL window
+        pygame.display.gl_set_attribute(pygame.GL_SWAP_CONTROL, 1)  # vsync
         self.screen = pygame.display.set_mode((self.w, self.h), DOUBLEBUF | OPENGL)
         pygame.display.set_caption("Autonomous Agricultural Swarm - 3D View")
         
         # Setup OpenGL
         self.setup_opengl()
+        self._display_lists = {}  # (shape, *params) -> list id, see _call_list
+        self._compiling = False
+        self._quadric = gluNewQuadric()  # shared by every GLU sphere/cylinder
+        self.cells = CellBatch(sim)
+        self._rng = np.random.default_rng()  # the one generator for per-frame draws (rain, wind)
+        self.rain_data = np.zeros((RAIN_DROPS, 2, 3), dtype=np.float32)  # (top, bottom) xyz per streak
+        self._rain_lo = np.array([-sim.w, 5, -sim.h], dtype=np.float32)  # streak top x, y, z ranges
+        self._rain_hi = np.array([sim.w, 15, sim.h], dtype=np.float32)
+        self.rain_vbo = vbo.VBO(self.rain_data, usage=GL_STREAM_DRAW)
         
         # Camera
         self.camera = Camera3D()
@@ -103,6 +338,7 @@ class FarmViz3D:
         
         # Create 2D overlay surface for UI
         self.overlay = pygame.Surface((self.w, self.h), pygame.SRCALPHA)
+        self._init_overlay_texture()
         
         # Colors
         self.COL_BG = (238, 243, 248)
@@ -110,6 +346,17 @@ class FarmViz3D:
         self.COL_TEXT = (30, 40, 52)
         self.COL_FRAME = (210, 218, 230)
         
+        # Text that never changes, rendered once
+        self._cached_text_surf = {t: self.font_xs.render(t, True, (70, 90, 110)) for t in CONTROL_HINTS}
+        self._cached_text_surf["Farm Dashboard"] = self.font_lg.render("Farm Dashboard", True, self.COL_TEXT)
+        for t in PANEL_SECTIONS:
+            self._cached_text_surf[t] = self.font_md.render(t, True, (33, 66, 120))
+        for k in PANEL_KEYS:
+            self._cached_text_surf[k + ":"] = self.font_sm.render(k + ":", True, self.COL_TEXT)
+        self._blit_list = []  # (surface, pos) pairs for the side panel, flushed with one blits()
+        self._title_rules = []  # y of each section title's underline
+        self._overlay_sig = None
+        
         # Weather conditions
         self.conditions = {"rainy": False, "sunny": False, "wind_storm": False, "drought": False}
         
@@ -128,6 +375,9 @@ class FarmViz3D:
         
         # Reward shaping
         self.base_shaping = dict(self.sim.llm_shaping)
+        self.base_shaping_vec = np.array([self.base_shaping[k] for k in SHAPING_KEYS])
+        self._shaping_dirty = True  # conditions changed since the last _apply_weather_overrides
+        self._applied_day = None
         
         self.clock = pygame.time.Clock()
     
@@ -137,6 +387,9 @@ class FarmViz3D:
         glEnable(GL_LIGHT0)
         glEnable(GL_COLOR_MATERIAL)
         glColorMaterial(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE)
+        # One lit color per face. All normals are unit length and no lit geometry is drawn
+        # under glScalef, so GL_NORMALIZE stays off
+        glShadeModel(GL_FLAT)
         
         glEnable(GL_BLEND)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
@@ -180,40 +433,45 @@ class FarmViz3D:
     
     def _toggle_condition(self, key, val):
         self.conditions[key] = val
+        self._shaping_dirty = True
         if key == "rainy" and val:
             self.conditions["sunny"] = False
         if key == "sunny" and val:
             self.conditions["rainy"] = False
     
+    def overrides_stale(self):
+        """Conditions need re-applying: a toggle flipped, the sim rolled a new day's weather,
+        or it is an agent tick (wind jitter refresh)."""
+        return self._shaping_dirty or self.sim.day != self._applied_day or self.sim.ticks % self.move_every == 0
+    
+    def tick(self, agents):
+        """One simulation tick: conditions (when stale), the batched agent step on move ticks,
+        then the environment."""
+        if self.overrides_stale():
+            self._apply_weather_overrides()
+        if self.sim.ticks % self.move_every == 0:
+            self.sim.step_agents(agents)
+        self.sim.step()
+    
     def _apply_weather_overrides(self):
+        self._shaping_dirty = False; self._applied_day = self.sim.day
         w = self.sim.weather
-        c = self.conditions
+        active = np.fromiter((self.conditions[k] for k in CONDITION_KEYS), dtype=bool, count=len(CONDITION_KEYS))
+        
+        # Weather: clamp (temp, humidity, rain) by each active condition in turn (order matters
+        # when bounds conflict, e.g. rainy caps temp at 32 but drought lifts it to 33)
+        ws = np.array([w.temp, w.humidity, w.rain])
+        for lo, hi in zip(CONDITION_WEATHER_LO[active], CONDITION_WEATHER_HI[active]):
+            np.clip(ws, lo, hi, out=ws)
+        w.temp, w.humidity, w.rain = ws.tolist()
+        span = CONDITION_WIND[active].max(initial=0.0)  # wind storm's range wins over rain's
+        if span > 0:
+            w.wind_dx, w.wind_dy = self._rng.uniform(-span, span, 2).tolist()
+        
+        # Reward shaping: base multipliers scaled by every active condition's row
+        mults = self.base_shaping_vec * CONDITION_SHAPING[active].prod(axis=0)
         shaping = dict(self.base_shaping)
-        
-        if c["rainy"]:
-            w.rain = 1.0
-            w.humidity = max(w.humidity, 0.78)
-            w.temp = min(max(w.temp, 20.0), 32.0)
-            w.wind_dx = random.uniform(-0.3, 0.3)
-            w.wind_dy = random.uniform(-0.3, 0.3)
-            shaping["irrigate_multiplier"] *= 0.75
-            shaping["monitor_multiplier"] *= 1.05
-            shaping["fungicide_multiplier"] *= 1.05
-        if c["sunny"]:
-            w.rain = 0.0
-            w.humidity = min(w.humidity, 0.5)
-            w.temp = max(w.temp, 31.0)
-            shaping["irrigate_multiplier"] *= 1.10
-        if c["wind_storm"]:
-            w.wind_dx = random.uniform(-1.0, 1.0)
-            w.wind_dy = random.uniform(-1.0, 1.0)
-            shaping["monitor_multiplier"] *= 1.15
-        if c["drought"]:
-            w.rain = 0.0
-            w.humidity = min(w.humidity, 0.35)
-            w.temp = max(w.temp, 33.0)
-            shaping["irrigate_multiplier"] *= 1.30
-        
+        shaping.update(zip(SHAPING_KEYS, mults.tolist()))
         self.sim.llm_shaping.update(shaping)
     
     def _active_condition_messages(self):
@@ -228,82 +486,84 @@ class FarmViz3D:
             msgs.append("Drought — irrigate more; schedule water smartly.")
         return msgs
     
+    def __del__(self):
+        if getattr(self, "_quadric", None) is not None:
+            gluDeleteQuadric(self._quadric)
+            self._quadric = None
+    
+    def _call_list(self, key, build, *args):
+        """Replay the display list for `key`, compiling build(*args) into it on first use."""
+        dl = self._display_lists.get(key)
+        if dl is None:
+            if self._compiling:  # lists can't nest glNewList: inline into the one being built
+                build(*args)
+                return
+            dl = glGenLists(1)
+            self._compiling = True
+            glNewList(dl, GL_COMPILE)
+            try:
+                build(*args)
+            finally:
+                glEndList()
+                self._compiling = False
+            self._display_lists[key] = dl
+        glCallList(dl)
+    
     def draw_cube(self, size=1.0):
-        """Draw a simple cube"""
-        s = size / 2
-        glBegin(GL_QUADS)
-        # Front
-        glNormal3f(0, 0, 1)
-        glVertex3f(-s, -s, s)
-        glVertex3f(s, -s, s)
-        glVertex3f(s, s, s)
-        glVertex3f(-s, s, s)
-        # Back
-        glNormal3f(0, 0, -1)
-        glVertex3f(-s, -s, -s)
-        glVertex3f(-s, s, -s)
-        glVertex3f(s, s, -s)
-        glVertex3f(s, -s, -s)
-        # Top
-        glNormal3f(0, 1, 0)
-        glVertex3f(-s, s, -s)
-        glVertex3f(-s, s, s)
-        glVertex3f(s, s, s)
-        glVertex3f(s, s, -s)
-        # Bottom
-        glNormal3f(0, -1, 0)
-        glVertex3f(-s, -s, -s)
-        glVertex3f(s, -s, -s)
-        glVertex3f(s, -s, s)
-        glVertex3f(-s, -s, s)
-        # Right
-        glNormal3f(1, 0, 0)
-        glVertex3f(s, -s, -s)
-        glVertex3f(s, s, -s)
-        glVertex3f(s, s, s)
-        glVertex3f(s, -s, s)
-        # Left
-        glNormal3f(-1, 0, 0)
-        glVertex3f(-s, -s, -s)
-        glVertex3f(-s, -s, s)
-        glVertex3f(-s, s, s)
-        glVertex3f(-s, s, -s)
-        glEnd()
+        """Draw a simple cube (cached display list)"""
+        self._call_list(("cube", size), self._cube_geometry, size)
     
     def draw_sphere(self, radius=0.5, slices=12, stacks=12):
-        """Draw a sphere using GLU"""
-        quad = gluNewQuadric()
-        gluSphere(quad, radius, slices, stacks)
-        gluDeleteQuadric(quad)
+        """Draw a sphere (cached display list)"""
+        self._call_list(("sphere", radius, slices, stacks), self._sphere_geometry, radius, slices, stacks)
     
     def draw_cylinder(self, base=0.1, top=0.1, height=1.0, slices=12):
-        """Draw a cylinder"""
-        quad = gluNewQuadric()
-        gluCylinder(quad, base, top, height, slices, 4)
-        gluDeleteQuadric(quad)
+        """Draw a cylinder (cached display list)"""
+        self._call_list(("cylinder", base, top, height, slices), self._cylinder_geometry, base, top, height, slices)
     
     def draw_torus(self, inner_radius, outer_radius, sides=16, rings=16):
-        """Draw a torus (donut shape) without GLUT"""
+        """Draw a torus (cached display list)"""
+        self._call_list(("torus", inner_radius, outer_radius, sides, rings), self._torus_geometry,
+                        inner_radius, outer_radius, sides, rings)
+    
+    def _cube_geometry(self, size=1.0):
+        """Emit a simple cube from the precomputed unit-cube arrays"""
+        verts = _CUBE_POS * size  # kept referenced until glDrawArrays has read it
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, verts)
+        glNormalPointer(GL_FLOAT, 0, _CUBE_NRM)
+        glDrawArrays(GL_TRIANGLES, 0, len(verts))
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+    
+    def _sphere_geometry(self, radius=0.5, slices=12, stacks=12):
+        """Emit a sphere using GLU"""
+        gluSphere(self._quadric, radius, slices, stacks)
+    
+    def _cylinder_geometry(self, base=0.1, top=0.1, height=1.0, slices=12):
+        """Emit a cylinder"""
+        gluCylinder(self._quadric, base, top, height, slices, 4)
+    
+    def _torus_geometry(self, inner_radius, outer_radius, sides=16, rings=16):
+        """Emit a torus (donut shape) without GLUT, one quad strip per ring"""
+        pos, nrm = torus_mesh(inner_radius, outer_radius, sides, rings)
+        strip = 2 * (sides + 1)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, pos)
+        glNormalPointer(GL_FLOAT, 0, nrm)
         for i in range(rings):
-            glBegin(GL_QUAD_STRIP)
-            for j in range(sides + 1):
-                for k in range(2):
-                    s = (i + k) % rings + 0.5
-                    t = j % sides
-                    angle1 = s * 2.0 * math.pi / rings
-                    angle2 = t * 2.0 * math.pi / sides
-                    x = (outer_radius + inner_radius * math.cos(angle2)) * math.cos(angle1)
-                    y = (outer_radius + inner_radius * math.cos(angle2)) * math.sin(angle1)
-                    z = inner_radius * math.sin(angle2)
-                    nx = math.cos(angle2) * math.cos(angle1)
-                    ny = math.cos(angle2) * math.sin(angle1)
-                    nz = math.sin(angle2)
-                    glNormal3f(nx, ny, nz)
-                    glVertex3f(x, y, z)
-            glEnd()
+            glDrawArrays(GL_QUAD_STRIP, i * strip, strip)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
     
     def draw_ground(self):
-        """Draw ground plane"""
+        """Draw ground plane (cached display list)"""
+        self._call_list(("ground",), self._ground_geometry)
+    
+    def _ground_geometry(self):
+        """Emit ground plane"""
         size = self.sim.w * 1.5
         glColor3f(0.42, 0.35, 0.28)
         glBegin(GL_QUADS)
@@ -314,108 +574,33 @@ class FarmViz3D:
         glVertex3f(-size, -0.1, size)
         glEnd()
     
-    def draw_cell_3d(self, x, y):
-        """Draw a single farm cell in 3D"""
-        c = self.sim.grid[x][y]
-        
-        # Convert grid coords to world coords
-        wx = (x - self.sim.w / 2) * 2.0
-        wz = (y - self.sim.h / 2) * 2.0
-        
+    def draw_agent_3d(self, index, wx, wz, battery):
+        """Draw an agent (robot) in 3D at world position (wx, wz)"""
         glPushMatrix()
-        glTranslatef(wx, 0, wz)
-        
-        # Soil block
-        soil_brightness = 0.8 + 0.4 * c.moisture
-        glColor3f(0.47 * soil_brightness, 0.33 * soil_brightness, 0.24 * soil_brightness)
-        glPushMatrix()
-        glTranslatef(0, -0.05, 0)
-        glScalef(1.8, 0.1, 1.8)
-        self.draw_cube()
-        glPopMatrix()
-        
-        # Draw crop if exists
-        if c.crop:
-            h = c.health()
-            growth = c.growth
-            
-            # Stem
-            glColor3f(0.2, 0.47, 0.2)
-            glPushMatrix()
-            stem_height = 0.5 + growth * 2.5
-            glRotatef(-90, 1, 0, 0)
-            self.draw_cylinder(0.05, 0.03, stem_height, 8)
-            glPopMatrix()
-            
-            # Crop head/leaves
-            crop_colors = {
-                "wheat": (0.80, 0.75, 0.39),
-                "corn": (0.24, 0.71, 0.27),
-                "soy": (0.27, 0.63, 0.47)
-            }
-            base_color = crop_colors.get(c.crop, (0.31, 0.69, 0.31))
-            glColor3f(base_color[0] * (0.6 + 0.4 * h),
-                     base_color[1] * (0.6 + 0.4 * h),
-                     base_color[2] * (0.6 + 0.4 * h))
-            
-            # Draw leaves as spheres
-            for i in range(3):
-                angle = (i / 3) * 2 * math.pi
-                offset = 0.15 + growth * 0.2
-                glPushMatrix()
-                glTranslatef(math.cos(angle) * offset, 
-                           stem_height * (0.5 + i * 0.15),
-                           math.sin(angle) * offset)
-                self.draw_sphere(0.15 + growth * 0.15, 10, 10)
-                glPopMatrix()
-            
-            # Pest indicator
-            if c.pest > 0.2:
-                glColor3f(0.75, 0.16, 0.16)
-                glPushMatrix()
-                glTranslatef(0.2, stem_height * 0.7, 0)
-                self.draw_sphere(0.08, 8, 8)
-                glPopMatrix()
-            
-            # Disease indicator
-            if c.disease > 0.2:
-                glColor3f(0.47, 0.27, 0.59)
-                glPushMatrix()
-                glTranslatef(-0.2, stem_height * 0.6, 0)
-                self.draw_sphere(0.1, 8, 8)
-                glPopMatrix()
-        
+        glTranslatef(wx, 0.8, wz)
+        # Body and ID marker never change per agent kind; only the battery ring color does
+        self._call_list(("agent", index % 2), self._agent_geometry, index % 2)
+        glColor3f(0, battery, 0)
+        self._call_list(("agent_ring",), self._agent_ring_geometry)
         glPopMatrix()
     
-    def draw_agent_3d(self, agent, index):
-        """Draw an agent (robot) in 3D"""
-        wx = (agent.x - self.sim.w / 2) * 2.0
-        wz = (agent.y - self.sim.h / 2) * 2.0
-        
-        glPushMatrix()
-        glTranslatef(wx, 0.8, wz)
-        
-        # Robot body
-        col = (0.16, 0.39, 0.90) if index % 2 == 0 else (0.90, 0.47, 0.16)
+    def _agent_geometry(self, parity):
+        """Emit a robot body (colored by index parity) with its ID marker (small cube on top)"""
+        col = (0.16, 0.39, 0.90) if parity == 0 else (0.90, 0.47, 0.16)
         glColor3f(*col)
         self.draw_sphere(0.4, 16, 16)
         
-        # Battery ring using custom torus
-        battery_color = (0, agent.battery, 0)
-        glColor3f(*battery_color)
-        glPushMatrix()
-        glRotatef(90, 1, 0, 0)
-        self.draw_torus(0.08, 0.5, sides=16, rings=16)
-        glPopMatrix()
-        
-        # ID marker (small cube on top)
         glColor3f(1, 1, 1)
         glPushMatrix()
         glTranslatef(0, 0.6, 0)
-        glScalef(0.2, 0.2, 0.2)
-        self.draw_cube()
+        self.draw_cube(0.2)  # sized in the vertices: no glScalef on lit geometry
         glPopMatrix()
-        
+    
+    def _agent_ring_geometry(self):
+        """Emit the battery ring (custom torus) around a robot; color is set by the caller"""
+        glPushMatrix()
+        glRotatef(90, 1, 0, 0)
+        self.draw_torus(0.08, 0.5, sides=16, rings=16)
         glPopMatrix()
     
     def draw_rain_effect(self):
@@ -423,14 +608,17 @@ class FarmViz3D:
         if self.sim.weather.rain > 0:
             glDisable(GL_LIGHTING)
             glColor4f(0.47, 0.63, 1.0, 0.3)
-            glBegin(GL_LINES)
-            for _ in range(100):
-                x = random.uniform(-self.sim.w, self.sim.w)
-                z = random.uniform(-self.sim.h, self.sim.h)
-                y_top = random.uniform(5, 15)
-                glVertex3f(x, y_top, z)
-                glVertex3f(x, y_top - 2, z)
-            glEnd()
+            d = self.rain_data
+            d[:, 0] = self._rng.uniform(self._rain_lo, self._rain_hi, (RAIN_DROPS, 3))  # one batched draw
+            d[:, 1] = d[:, 0]
+            d[:, 1, 1] -= 2
+            self.rain_vbo.set_array(d)  # re-specified whole on bind (stream buffer)
+            self.rain_vbo.bind()
+            glEnableClientState(GL_VERTEX_ARRAY)
+            glVertexPointer(3, GL_FLOAT, 12, self.rain_vbo)
+            glDrawArrays(GL_LINES, 0, 2 * RAIN_DROPS)
+            glDisableClientState(GL_VERTEX_ARRAY)
+            self.rain_vbo.unbind()
             glEnable(GL_LIGHTING)
     
     def render_3d_scene(self):
@@ -444,43 +632,43 @@ class FarmViz3D:
         # Draw ground
         self.draw_ground()
         
-        # Draw grid cells
-        for x in range(self.sim.w):
-            for y in range(self.sim.h):
-                self.draw_cell_3d(x, y)
+        # Draw grid cells (one batched draw; only changed cells re-uploaded)
+        self.cells.update()
+        self.cells.draw(self.camera)
         
-        # Draw agents
-        for i, agent in enumerate(self.sim.agents):
-            self.draw_agent_3d(agent, i)
+        # Draw agents (world positions looked up for the whole pool at once)
+        pool = self.sim.agents
+        self.agent_world = np.stack([self.cells.cell_wx[pool.x], self.cells.cell_wz[pool.y]], axis=1)
+        for i, ((wx, wz), battery) in enumerate(zip(self.agent_world.tolist(), pool.battery.tolist())):
+            self.draw_agent_3d(i, wx, wz, battery)
         
         # Draw weather effects
         self.draw_rain_effect()
     
     def render_2d_overlay(self, llm_summary: list):
         """Render 2D UI overlay"""
-        self.overlay.fill((0, 0, 0, 0))
-        
-        # Draw weather control buttons
-        for btn in self.buttons:
-            btn.draw(self.overlay, self.font_sm)
-        
-        # Draw control hints
-        hint_y = self.h - 200
-        hints = [
-            "Camera: Drag mouse to rotate | Scroll to zoom",
-            "Hotkeys: R Rainy | S Sunny | W Wind | D Drought",
-            "Space Pause | N Step | +/- Speed | P Screenshot"
-        ]
-        for i, hint in enumerate(hints):
-            text = self.font_xs.render(hint, True, (70, 90, 110))
-            self.overlay.blit(text, (20, hint_y + i * 16))
-        
-        # Draw side panel
-        self.draw_side_panel(llm_summary)
-        
-        # Convert overlay to OpenGL texture and draw
-        texture_data = pygame.image.tostring(self.overlay, "RGBA", True)
+        # Re-rasterize and re-upload only when something shown on it changed;
+        # otherwise the texture from the last change is drawn again
+        sig = self._overlay_signature()
+        if sig != self._overlay_sig:
+            self._overlay_sig = sig
+            self.overlay.fill((0, 0, 0, 0))
+            
+            # Draw weather control buttons
+            for btn in self.buttons:
+                btn.draw(self.overlay, self.font_sm)
+            
+            # Draw control hints
+            hint_y = self.h - 200
+            for i, hint in enumerate(CONTROL_HINTS):
+                self.overlay.blit(self._cached_text_surf[hint], (20, hint_y + i * 16))
+            
+            # Draw side panel
+            self.draw_side_panel(llm_summary)
+            
+            self._upload_overlay()
         
+        # Draw the overlay texture as one screen-sized quad
         glMatrixMode(GL_PROJECTION)
         glPushMatrix()
         glLoadIdentity()
@@ -492,10 +680,19 @@ class FarmViz3D:
         glDisable(GL_DEPTH_TEST)
         glDisable(GL_LIGHTING)
         glEnable(GL_BLEND)
+        glEnable(GL_TEXTURE_2D)
+        glColor4f(1, 1, 1, 1)  # GL_MODULATE: don't tint the overlay with the last scene color
+        
+        glBindTexture(GL_TEXTURE_2D, self.overlay_tex)
+        glBegin(GL_QUADS)  # texture row 0 is the surface's top row
+        glTexCoord2f(0, 0); glVertex2f(0, self.h)
+        glTexCoord2f(1, 0); glVertex2f(self.w, self.h)
+        glTexCoord2f(1, 1); glVertex2f(self.w, 0)
+        glTexCoord2f(0, 1); glVertex2f(0, 0)
+        glEnd()
+        glBindTexture(GL_TEXTURE_2D, 0)
         
-        glRasterPos2i(0, 0)
-        glDrawPixels(self.w, self.h, GL_RGBA, GL_UNSIGNED_BYTE, texture_data)
-        
+        glDisable(GL_TEXTURE_2D)
         glEnable(GL_DEPTH_TEST)
         glEnable(GL_LIGHTING)
         
@@ -504,6 +701,36 @@ class FarmViz3D:
         glPopMatrix()
         glMatrixMode(GL_MODELVIEW)
     
+    def _overlay_signature(self):
+        """Everything the overlay shows changes only with these (agents and weather move on sim ticks)."""
+        return (self.sim.ticks, tuple(self.conditions.values()), self.paused, self.move_every, self.current_fps)
+    
+    def _init_overlay_texture(self):
+        """Screen-sized RGBA texture the overlay surface is streamed into each frame."""
+        self.overlay_tex = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.overlay_tex)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)  # drawn 1:1
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, self.w, self.h, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        # surface byte order -> GL format, so the pixel buffer can be uploaded as-is
+        masks = self.overlay.get_masks()[:3]
+        self._overlay_fmt = {(0xff, 0xff00, 0xff0000): GL_RGBA,
+                             (0xff0000, 0xff00, 0xff): GL_BGRA}.get(masks)
+    
+    def _upload_overlay(self):
+        glBindTexture(GL_TEXTURE_2D, self.overlay_tex)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        if self._overlay_fmt is None:  # unusual layout: let pygame convert
+            glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, self.w, self.h, GL_RGBA, GL_UNSIGNED_BYTE,
+                            pygame.image.tostring(self.overlay, "RGBA", False))
+        else:
+            glPixelStorei(GL_UNPACK_ROW_LENGTH, self.overlay.get_pitch() // 4)
+            glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, self.w, self.h, self._overlay_fmt, GL_UNSIGNED_BYTE,
+                            self.overlay.get_buffer().raw)
+            glPixelStorei(GL_UNPACK_ROW_LENGTH, 0)
+        glBindTexture(GL_TEXTURE_2D, 0)
+    
     def draw_side_panel(self, llm_summary: list):
         """Draw the side information panel"""
         panel = pygame.Rect(self.w - PANEL_W, 0, PANEL_W, self.h)
@@ -511,8 +738,8 @@ class FarmViz3D:
         pygame.draw.line(self.overlay, self.COL_FRAME, 
                         (self.w - PANEL_W, 0), (self.w - PANEL_W, self.h), 2)
         
-        title = self.font_lg.render("Farm Dashboard", True, self.COL_TEXT)
-        self.overlay.blit(title, (self.w - PANEL_W + 16, 12))
+        self._blit_list.clear()
+        self._blit_list.append((self._cached_text_surf["Farm Dashboard"], (self.w - PANEL_W + 16, 12)))
         
         y = 50
         
@@ -526,7 +753,7 @@ class FarmViz3D:
         # Control
         y = self._section_title("Control", y)
         self._kv("Move every", f"{self.move_every} tick(s)", 16, y); y += 20
-        self._kv("FPS", f"{self.current_fps}", 16, y); y += 20
+        self._kv("Sim rate", f"{self.current_fps} ticks/s", 16, y); y += 20
         self._kv("Paused", "Yes" if self.paused else "No", 16, y); y += 20
         
         # Metrics
@@ -541,30 +768,31 @@ class FarmViz3D:
         y = self._section_title("Agents", y)
         for i, a in enumerate(self.sim.agents[:6]):
             line = f"#{i} ({a.x},{a.y}) {a.last_action[:8]} b:{a.battery:.2f}"
-            text = self.font_xs.render(line, True, self.COL_TEXT)
-            self.overlay.blit(text, (self.w - PANEL_W + 16, y))
+            text = render_text(self.font_xs, line, self.COL_TEXT)
+            self._blit_list.append((text, (self.w - PANEL_W + 16, y)))
             y += 18
+        
+        self.overlay.blits(self._blit_list, doreturn=False)
+        for y in self._title_rules:
+            pygame.draw.line(self.overlay, self.COL_FRAME,
+                            (self.w - PANEL_W + 14, y), (self.w - 18, y), 1)
+        self._title_rules.clear()
     
     def _section_title(self, text, y):
-        title = self.font_md.render(text, True, (33, 66, 120))
-        self.overlay.blit(title, (self.w - PANEL_W + 16, y))
-        pygame.draw.line(self.overlay, self.COL_FRAME,
-                        (self.w - PANEL_W + 14, y + 22),
-                        (self.w - 18, y + 22), 1)
+        self._blit_list.append((self._cached_text_surf[text], (self.w - PANEL_W + 16, y)))
+        self._title_rules.append(y + 22)  # drawn after the text, as before
         return y + 30
     
     def _kv(self, k, v, x, y):
-        key_text = self.font_sm.render(str(k) + ":", True, self.COL_TEXT)
-        val_text = self.font_sm.render(str(v), True, self.COL_TEXT)
-        self.overlay.blit(key_text, (self.w - PANEL_W + x, y))
-        self.overlay.blit(val_text, (self.w - PANEL_W + 170, y))
+        val_text = render_text(self.font_sm, str(v), self.COL_TEXT)
+        self._blit_list.append((self._cached_text_surf[str(k) + ":"], (self.w - PANEL_W + x, y)))
+        self._blit_list.append((val_text, (self.w - PANEL_W + 170, y)))
     
     def render(self, llm_summary: list):
         """Main render function"""
         self.render_3d_scene()
         self.render_2d_overlay(llm_summary)
         pygame.display.flip()
-        self.clock.tick(self.current_fps)
     
     def dynamic_summary(self, base_summary: List[str]) -> List[str]:
         msgs = list(base_summary)
@@ -580,8 +808,10 @@ def simulate_and_render_3d(sim: FarmSimulator, agents, base_llm_summary):
     """Main simulation loop with 3D rendering"""
     viz = FarmViz3D(sim)
     running = True
+    sim_owed = 0.0  # ms of simulation time not yet stepped
     
     while running:
+        dt = viz.clock.tick(RENDER_FPS_CAP)  # vsync paces the flip; this caps it without vsync
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
@@ -665,25 +895,22 @@ def simulate_and_render_3d(sim: FarmSimulator, agents, base_llm_summary):
                     print(f"Saved snapshot: {fname}")
         
         if viz.paused:
+            sim_owed = 0.0
             summary = viz.dynamic_summary(base_llm_summary)
             viz.render(summary)
             continue
         
-        # Apply weather effects
-        viz._apply_weather_overrides()
-        
-        # Agent loop (throttled by move_every)
-        if sim.ticks % viz.move_every == 0:
-            for i, agent in enumerate(agents):
-                action, (dx, dy) = agent.act(sim)
-                move_agent(sim, i, dx, dy)
-                sim.apply_action(i, action)
-                a = sim.agents[i]
-                if (a.x, a.y) in BASE_LOCATIONS and action == "idle":
-                    a.battery = min(MAX_BATTERY, a.battery + BATTERY_RECHARGE_PER_TICK)
-        
-        # Environment step & render
-        sim.step()
+        # Fixed-rate sim (current_fps ticks/s) independent of the render rate: run the ticks
+        # owed since the last frame (weather, agents throttled by move_every, environment)
+        sim_owed += dt
+        period = 1000.0 / viz.current_fps
+        steps = 0
+        while sim_owed >= period and steps < MAX_CATCHUP_TICKS:
+            viz.tick(agents)
+            sim_owed -= period
+            steps += 1
+        if steps == MAX_CATCHUP_TICKS:
+            sim_owed = 0.0  # can't keep up: drop the backlog rather than spiral
         summary = viz.dynamic_summary(base_llm_summary)
         viz.render(summary)
     
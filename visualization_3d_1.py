@@ -9,60 +9,361 @@
 # - Improved camera positioning
 
 import pygame
-import random
+import functools
 import json
 import time
 import math
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+try:  # optional: fused per-cell colour/height pass
+    from numba import njit, prange
+except ImportError:
+    njit, prange = None, range
+try:  # optional: C JSON encoder for snapshots
+    import orjson
+except ImportError:
+    orjson = None
 from pygame.locals import *
 from OpenGL.GL import *
 from OpenGL.GLU import *
+from OpenGL.GL import shaders
+from OpenGL.arrays import vbo
 from typing import List, Tuple
-from collections import deque
 from config import *
-from simulator import FarmSimulator
-from rl_swarm import move_agent
+from simulator import FarmSimulator, CROP_TYPES, ACTION_INDEX, compute_health
+from camera3d import Camera3D
+from text_cache import render_text, wrap_lines
 
 MOVE_EVERY_N_TICKS_DEFAULT = 8
 
-class Camera3D:
+# Window events after which the last presented frame may be gone (covered, hidden, minimized)
+REPAINT_EVENTS = [pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWSHOWN, pygame.WINDOWRESTORED]
+# The only event types the loop handles; everything else is blocked at the SDL queue
+INPUT_EVENTS = [pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP,
+                pygame.MOUSEMOTION, pygame.MOUSEWHEEL] + REPAINT_EVENTS
+
+# ---------------- Instanced meshes ----------------
+def unit_cube():
+    """24 vertices (4 per face, own normals) and 36 indices of the unit cube."""
+    pos, nrm = [], []
+    for axis in range(3):
+        for sign in (1.0, -1.0):
+            n = np.zeros(3); n[axis] = sign
+            u, v = np.roll(np.eye(3), 1, axis=0)[axis], np.roll(np.eye(3), 2, axis=0)[axis]
+            for du, dv in ((-1, -1), (1, -1), (1, 1), (-1, 1)):
+                pos.append(0.5 * (n + du * u + dv * v * sign))
+                nrm.append(n)
+    quads = np.arange(24).reshape(6, 4)
+    idx = quads[:, [0, 1, 2, 0, 2, 3]].ravel()
+    return np.array(pos, np.float32), np.array(nrm, np.float32), idx
+
+def uv_sphere(slices=12, stacks=12):
+    """Unit sphere as a (slices+1) x (stacks+1) vertex grid; positions double as normals."""
+    th = np.linspace(0, np.pi, stacks + 1)[:, None]
+    ph = np.linspace(0, 2 * np.pi, slices + 1)[None, :]
+    pos = np.stack([np.sin(th) * np.cos(ph), np.cos(th) + 0 * ph, np.sin(th) * np.sin(ph)], axis=-1)
+    pos = pos.reshape(-1, 3).astype(np.float32)
+    i = (np.arange(stacks)[:, None] * (slices + 1) + np.arange(slices)[None, :]).ravel()
+    idx = np.stack([i, i + slices + 1, i + 1, i + 1, i + slices + 1, i + slices + 2], axis=1).ravel()
+    return pos, pos.copy(), idx
+
+def icosphere(subdivisions=1):
+    """Unit icosahedron with each face split in four `subdivisions` times; positions double as normals."""
+    t = (1 + 5 ** 0.5) / 2
+    pos = [(-1, t, 0), (1, t, 0), (-1, -t, 0), (1, -t, 0), (0, -1, t), (0, 1, t),
+           (0, -1, -t), (0, 1, -t), (t, 0, -1), (t, 0, 1), (-t, 0, -1), (-t, 0, 1)]
+    faces = [(0, 11, 5), (0, 5, 1), (0, 1, 7), (0, 7, 10), (0, 10, 11), (1, 5, 9), (5, 11, 4),
+             (11, 10, 2), (10, 7, 6), (7, 1, 8), (3, 9, 4), (3, 4, 2), (3, 2, 6), (3, 6, 8),
+             (3, 8, 9), (4, 9, 5), (2, 4, 11), (6, 2, 10), (8, 6, 7), (9, 8, 1)]
+    for _ in range(subdivisions):
+        mid = {}  # edge (low, high) -> index of its midpoint vertex
+        def midpoint(a, b):
+            key = (min(a, b), max(a, b))
+            if key not in mid:
+                mid[key] = len(pos)
+                pos.append(tuple(np.add(pos[a], pos[b]) / 2))
+            return mid[key]
+        split = []
+        for a, b, c in faces:
+            ab, bc, ca = midpoint(a, b), midpoint(b, c), midpoint(c, a)
+            split += [(a, ab, ca), (b, bc, ab), (c, ca, bc), (ab, bc, ca)]
+        faces = split
+    pos = np.array(pos, np.float64)
+    pos = (pos / np.linalg.norm(pos, axis=1, keepdims=True)).astype(np.float32)
+    return pos, pos.copy(), np.array(faces).ravel()
+
+def tapered_cylinder(base, top, slices=12):
+    """Open cylinder from y=0 (radius `base`) to y=1 (radius `top`), like gluCylinder."""
+    a = np.linspace(0, 2 * np.pi, slices + 1)
+    r = np.array([base, top])[:, None]
+    pos = np.stack([r * np.cos(a), np.array([0.0, 1.0])[:, None] + 0 * a, r * np.sin(a)], axis=-1).reshape(-1, 3)
+    nrm = np.stack([np.cos(a), np.full_like(a, base - top), np.sin(a)], axis=-1)
+    nrm = np.tile(nrm / np.linalg.norm(nrm, axis=1, keepdims=True), (2, 1))
+    i = np.arange(slices)
+    idx = np.stack([i, i + slices + 1, i + 1, i + 1, i + slices + 1, i + slices + 2], axis=1).ravel()
+    return pos.astype(np.float32), nrm.astype(np.float32), idx
+
+def rotation(axis, degrees):
+    """3x3 rotation matrix about `axis`, same convention as glRotatef."""
+    x, y, z = np.asarray(axis, np.float64) / np.linalg.norm(axis)
+    c, s = math.cos(math.radians(degrees)), math.sin(math.radians(degrees))
+    return np.array([[c + x*x*(1-c), x*y*(1-c) - z*s, x*z*(1-c) + y*s],
+                     [y*x*(1-c) + z*s, c + y*y*(1-c), y*z*(1-c) - x*s],
+                     [z*x*(1-c) - y*s, z*y*(1-c) + x*s, c + z*z*(1-c)]], dtype=np.float32)
+
+# Per-instance row: offset xyz | scale xyz | rotation columns (3x3) | base rgb | shade
+INSTANCE_FLOATS = 19
+IDENTITY = np.eye(3, dtype=np.float32)
+
+def instances(offset, scale, rgb, rot=IDENTITY, shade=1.0):
+    """Pack (n, 3) offsets/scales/base colours, one or (n, 3, 3) rotations and (n,) shade
+    inputs (moisture or health; the shader scales rgb by 0.5 + 0.5 * shade) into instance rows."""
+    out = np.empty((len(offset), INSTANCE_FLOATS), dtype=np.float32)
+    out[:, 0:3] = offset
+    out[:, 3:6] = scale
+    out[:, 6:15] = np.swapaxes(np.broadcast_to(rot, (len(offset), 3, 3)), -1, -2).reshape(-1, 9)
+    out[:, 15:18] = rgb
+    out[:, 18] = shade
+    return out
+
+# Vertex lighting matching the fixed-function setup (GL_LIGHT0/1 from glLightfv, colour material)
+INSTANCE_VS = """
+#version 120
+attribute vec3 aPos;
+attribute vec3 aNormal;
+attribute vec3 iOffset;
+attribute vec3 iScale;
+attribute mat3 iRot;
+attribute vec3 iColor;
+attribute float iShade;
+uniform bool uLit;
+uniform bool uHealthRamp;  // colour from iShade as health: red -> yellow -> green, iColor ignored
+varying vec3 vColor;
+void main() {
+    vec4 eye = gl_ModelViewMatrix * vec4(iOffset + iRot * (aPos * iScale), 1.0);
+    gl_Position = gl_ProjectionMatrix * eye;
+    vec3 c;
+    if (uHealthRamp)
+        c = iShade < 0.5 ? vec3(1.0, 2.0 * iShade, 0.0) : vec3(2.0 * (1.0 - iShade), 1.0, 0.0);
+    else
+        c = iColor * (0.5 + 0.5 * iShade);
+    if (uLit) {
+        vec3 n = normalize(gl_NormalMatrix * (iRot * (aNormal / iScale)));
+        vec3 light = gl_LightModel.ambient.rgb;
+        for (int i = 0; i < 2; i++) {
+            vec3 l = normalize(gl_LightSource[i].position.xyz - eye.xyz);
+            light += gl_LightSource[i].ambient.rgb + gl_LightSource[i].diffuse.rgb * max(dot(n, l), 0.0);
+        }
+        c = min(c * light, 1.0);
+    }
+    vColor = c;
+}
+"""
+INSTANCE_FS = """
+#version 120
+varying vec3 vColor;
+void main() { gl_FragColor = vec4(vColor, 1.0); }
+"""
+
+class InstanceShader:
     def __init__(self):
-        self.distance = 45.0  # Closer view
-        self.angle_h = 45.0
-        self.angle_v = 35.0  # Better angle
-        self.target = [0, 0, 0]
-        self.mouse_sensitivity = 0.3
-        self.zoom_speed = 2.0
-        
-    def apply(self):
-        glLoadIdentity()
-        rad_h = math.radians(self.angle_h)
-        rad_v = math.radians(self.angle_v)
-        
-        x = self.distance * math.cos(rad_v) * math.cos(rad_h)
-        y = self.distance * math.sin(rad_v)
-        z = self.distance * math.cos(rad_v) * math.sin(rad_h)
-        
-        gluLookAt(x, y, z, 
-                  self.target[0], self.target[1], self.target[2],
-                  0, 1, 0)
+        self.program = shaders.compileProgram(shaders.compileShader(INSTANCE_VS, GL_VERTEX_SHADER),
+                                              shaders.compileShader(INSTANCE_FS, GL_FRAGMENT_SHADER))
+        self.loc = {name: glGetAttribLocation(self.program, name)
+                    for name in ("aPos", "aNormal", "iOffset", "iScale", "iRot", "iColor", "iShade")}
+        self.u_lit = glGetUniformLocation(self.program, "uLit")
+        self.u_health_ramp = glGetUniformLocation(self.program, "uHealthRamp")
+
+class InstancedMesh:
+    """Static mesh (interleaved position/normal VBO + index buffer) in a VAO, drawn once per
+    instance row with glDrawElementsInstanced. Instance rows are streamed each draw."""
+    STRIDE = 6 * 4
+
+    def __init__(self, shader: InstanceShader, pos, nrm, idx):
+        loc = shader.loc
+        self.count = len(idx)
+        self.vao = glGenVertexArrays(1)
+        glBindVertexArray(self.vao)
+        self.vbo = vbo.VBO(np.hstack([pos, nrm]).astype(np.float32))
+        self.vbo.bind()
+        for name, off in (("aPos", 0), ("aNormal", 12)):
+            glEnableVertexAttribArray(loc[name])
+            glVertexAttribPointer(loc[name], 3, GL_FLOAT, GL_FALSE, self.STRIDE, self.vbo + off)
+        self.ibo = vbo.VBO(np.asarray(idx, np.uint16), target=GL_ELEMENT_ARRAY_BUFFER)
+        self.ibo.bind()
+        self.inst = vbo.VBO(np.zeros((1, INSTANCE_FLOATS), np.float32), usage=GL_STREAM_DRAW)
+        self.inst.bind()
+        attrs = [(loc["iOffset"], 0), (loc["iScale"], 3)]
+        attrs += [(loc["iRot"] + col, 6 + 3 * col) for col in range(3)] + [(loc["iColor"], 15)]
+        attrs = [(l, 3, off) for l, off in attrs] + [(loc["iShade"], 1, 18)]
+        for l, size, off in attrs:
+            glEnableVertexAttribArray(l)
+            glVertexAttribPointer(l, size, GL_FLOAT, GL_FALSE, INSTANCE_FLOATS * 4, self.inst + off * 4)
+            glVertexAttribDivisor(l, 1)
+        glBindVertexArray(0)
+        self.vbo.unbind()
+        self.inst.unbind()
+
+    def draw(self, rows):
+        if len(rows) == 0: return
+        glBindVertexArray(self.vao)
+        self.inst.set_array(np.ascontiguousarray(rows, dtype=np.float32))
+        self.inst.bind()  # orphans and refills the instance buffer
+        glDrawElementsInstanced(GL_TRIANGLES, self.count, GL_UNSIGNED_SHORT, None, len(rows))
+        self.inst.unbind()
+        glBindVertexArray(0)
+
+# Crop part layout (offsets relative to the cell centre, stem height sh)
+SOIL_RGB = np.array([0.52, 0.40, 0.28], dtype=np.float32)
+STEM_RGB = (0.15, 0.55, 0.15)
+WHEAT_RGB = np.array([0.88, 0.82, 0.42], dtype=np.float32)
+CORN_RGB = np.array([0.3, 0.75, 0.3], dtype=np.float32)
+CORN_EAR_RGB = (0.9, 0.85, 0.3)
+SOY_RGB = np.array([0.3, 0.68, 0.52], dtype=np.float32)
+PEST_RGB = (0.9, 0.2, 0.2)
+DISEASE_RGB = (0.6, 0.2, 0.8)
+BAR_BG_RGB = (0.3, 0.3, 0.3)
+MARK_THRESHOLD = 0.2
+# Cell bounding sphere for frustum culling: soil block up to a full-grown crop and its health bar
+CULL_CENTER_Y = 2.4
+CULL_RADIUS = 3.0
+
+# Per-cell draw parameters (FarmViz3D._cell_params columns); colours are derived in the shader
+CP_HEALTH, CP_STEM_H = 0, 1
+CELL_PARAMS = 2
+
+def _cell_kernel_py(moisture, nutrient, growth, pest, disease, out):
+    """One pass over the (w, h) cell fields writing row x*h + y of out; same result as
+    FarmViz3D._cell_params_numpy."""
+    w, h = moisture.shape
+    for x in prange(w):
+        for y in range(h):
+            i = x*h + y
+            out[i, CP_HEALTH] = min(1.0, max(0.0, 0.5*(moisture[x, y] + nutrient[x, y]) - 0.6*pest[x, y] - 0.6*disease[x, y]))
+            out[i, CP_STEM_H] = 1.0 + 3.0*growth[x, y]
+
+_cell_kernel = njit(parallel=True, fastmath=True, cache=True)(_cell_kernel_py) if njit else None
+
+AGENT_RGB = np.array([(0.2, 0.5, 1.0), (1.0, 0.6, 0.2), (0.3, 0.9, 0.4)], dtype=np.float32)  # by index % 3
+BATTERY_RGB = np.array([(0.9, 0.2, 0.2), (0.9, 0.9, 0.2), (0.2, 0.9, 0.2)], dtype=np.float32)  # <=0.3, <=0.6, above
+AGENT_Y = 1.2
+AGENT_CULL_RADIUS = 1.2  # agent bounding sphere about (x, AGENT_Y, z): body, ID marker, ring and beams
+TRAIL_Y = 0.8
+
+def unit_circle(n, radius=1.0, y=0.0):
+    """(n, 3) float32 points of a horizontal circle, starting at +x."""
+    a = np.arange(n) * (2 * math.pi / n)
+    return np.stack([np.cos(a) * radius, np.full(n, y), np.sin(a) * radius], axis=1).astype(np.float32)
+
+# Agent-local line geometry (origin = agent body centre)
+IRRIGATE_BEAM = np.array([(0, 0, 0), (0, -1.0, 0)], dtype=np.float32)   # GL_LINES
+SPRAY_LINES = np.zeros((16, 3), dtype=np.float32)                       # GL_LINES, 8 spokes
+SPRAY_LINES[1::2] = unit_circle(8, 0.5, -0.8)
+MONITOR_LOOP = unit_circle(16, 0.6, -0.5)                                # GL_LINE_LOOP
+BATTERY_RING = unit_circle(32, 0.6)                                      # GL_LINE_LOOP, first k points
+
+# Action indicator (GL mode, agent-local lines, rgba) and side panel icon, indexed by action id
+ACTION_INDICATORS = [None] * len(ACTIONS)
+ACTION_INDICATORS[ACTION_INDEX["irrigate"]] = (GL_LINES, IRRIGATE_BEAM, (0.2, 0.5, 1.0, 0.7))        # blue beam downward
+ACTION_INDICATORS[ACTION_INDEX["fertilize"]] = (GL_LINES, SPRAY_LINES, (0.3, 0.9, 0.3, 0.6))         # green spray
+ACTION_INDICATORS[ACTION_INDEX["apply_pesticide"]] = (GL_LINES, SPRAY_LINES, (1.0, 0.3, 0.3, 0.6))   # red spray
+ACTION_INDICATORS[ACTION_INDEX["apply_fungicide"]] = (GL_LINES, SPRAY_LINES, (0.8, 0.3, 0.8, 0.6))   # purple spray
+ACTION_INDICATORS[ACTION_INDEX["monitor"]] = (GL_LINE_LOOP, MONITOR_LOOP, (1.0, 1.0, 0.3, 0.7))      # yellow scan beam
+ACTION_ICONS = ["⚡"] * len(ACTIONS)
+for _action, _icon in (("irrigate", "💧"), ("fertilize", "🌱"), ("apply_pesticide", "🔴"),
+                       ("apply_fungicide", "🟣"), ("monitor", "👁️"), ("idle", "⏸️")):
+    ACTION_ICONS[ACTION_INDEX[_action]] = _icon
+RAIN_DROPS = 150
+RAIN_STREAK = np.array([-0.2, -2.5, -0.2], dtype=np.float32)  # streak bottom relative to its top
+
+# Weather toggles: shaping multipliers and wind jitter amplitude per condition (later entries win for wind)
+WEATHER_MULTIPLIERS = {
+    "rainy": {"irrigate_multiplier": 0.75, "monitor_multiplier": 1.05, "fungicide_multiplier": 1.05},
+    "sunny": {"irrigate_multiplier": 1.10},
+    "wind_storm": {"monitor_multiplier": 1.15},
+    "drought": {"irrigate_multiplier": 1.30},
+}
+WIND_JITTER = {"rainy": 0.3, "wind_storm": 1.0}
+WIND_BATCH = 256  # wind draws sampled per RNG call
+_CORN_A = np.arange(4) * (2 * math.pi / 4)
+_CORN_ROT = np.stack([rotation((math.cos(a), 0, math.sin(a)), 45) for a in _CORN_A])
+_CORN_EAR_ROT = rotation((0, 0, 1), 45)
+_SOY_A = np.arange(5) * (2 * math.pi / 5)
+
+# Constant HUD strings, rasterized once per FarmViz3D into its _labels table
+PANEL_SECTIONS = ("🌤️ Weather", "⚙️ Control", "📊 Metrics", "🤖 Agents", "⚠️ Active Conditions")
+PANEL_KEYS = ("Day", "Temp (°C)", "Humidity", "Rain", "Move every", "FPS", "Status",
+              "Yield (Σ)", "Sustainability", "Water Used", "Chemicals")
+CONTROL_HINTS = ("🖱️  Drag to rotate | Scroll to zoom",
+                 "⌨️  R/S/W/D Weather | Space Pause | +/- Speed")
+LEGEND_ITEMS = (  # robots get a drawn dot in place of the "● " prefix
+    ("● Blue Robot", (51, 128, 255)),
+    ("● Orange Robot", (255, 153, 51)),
+    ("● Green Robot", (77, 230, 102)),
+    ("🌾 Wheat (Golden)", (204, 191, 100)),
+    ("🌽 Corn (Green)", (61, 181, 69)),
+    ("🫘 Soy (Teal)", (69, 173, 133)),
+    ("🔴 Pest", (230, 51, 51)),
+    ("🟣 Disease", (153, 69, 204)),
+)
+
+# Side panel bar colours by level band: low, mid, high
+BAND_RGB = ((244, 67, 54), (255, 193, 7), (76, 175, 80))
+
+@functools.lru_cache(maxsize=None)
+def battery_bar(fill_w, level):
+    """80x6 agent battery bar: grey track with a `fill_w` px fill in BAND_RGB[level]; at most 81 x 3 sprites."""
+    surf = pygame.Surface((80, 6), pygame.SRCALPHA, 32).convert_alpha()
+    pygame.draw.rect(surf, (200, 200, 200), (0, 0, 80, 6), border_radius=3)
+    pygame.draw.rect(surf, BAND_RGB[level], (0, 0, fill_w, 6), border_radius=3)
+    return surf
+
+@functools.lru_cache(maxsize=64)
+def wrap_render(font, msg, width, color):
+    """Word-wrapped `msg` (wrap_lines) as one cached text surface per line."""
+    return tuple(render_text(font, line, color) for line in wrap_lines(msg, width, font))
+
+class AgentTrails:
+    """Movement trails of all agents: the last max_length grid positions of each in one ring
+    buffer, appended for every agent at once on each move tick"""
+    def __init__(self, n, max_length=15):
+        self.pos = np.zeros((max_length, n, 2), dtype=np.int32)
+        self.actions = np.zeros((max_length, n), dtype=np.uint8)  # index into ACTIONS
+        self.head = 0   # slot the next add() writes
+        self.count = 0
     
-    def rotate(self, dx, dy):
-        self.angle_h += dx * self.mouse_sensitivity
-        self.angle_v = max(-89, min(89, self.angle_v + dy * self.mouse_sensitivity))
+    def __len__(self):
+        return self.count
     
-    def zoom(self, delta):
-        self.distance = max(20, min(150, self.distance - delta * self.zoom_speed))
-
-class AgentTrail:
-    """Track agent movement trail"""
-    def __init__(self, max_length=15):
-        self.positions = deque(maxlen=max_length)
-        self.actions = deque(maxlen=max_length)
+    def add(self, x, y, action_ids):
+        """Append every agent's position (x, y arrays) and action id."""
+        self.pos[self.head, :, 0] = x
+        self.pos[self.head, :, 1] = y
+        self.actions[self.head] = action_ids
+        self.head = (self.head + 1) % len(self.pos)
+        self.count = min(self.count + 1, len(self.pos))
     
-    def add(self, x, y, action):
-        self.positions.append((x, y))
-        self.actions.append(action)
+    def ordered(self):
+        """(count, n, 2) positions, oldest first; a view until the buffer has wrapped."""
+        if self.count < len(self.pos):
+            return self.pos[:self.count]
+        return np.concatenate([self.pos[self.head:], self.pos[:self.head]])
+
+# File output runs on FarmViz3D's I/O worker so saves don't stall the frame
+def save_screenshot(pixels, size, fname):
+    """Write bottom-up RGB bytes from glReadPixels as an image file."""
+    pygame.image.save(pygame.image.fromstring(pixels, size, "RGB", True), fname)
+    print(f"✅ Saved screenshot: {fname}")
+
+def dump_snapshot(snap, fname):
+    """Serialize `snap` to indented JSON in memory, then write it with a single call."""
+    if orjson is not None:
+        data = orjson.dumps(snap, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        data = json.dumps(snap, indent=2).encode()
+    with open(fname, "wb") as f:
+        f.write(data)
+    print(f"✅ Saved snapshot: {fname}")
 
 class ToggleButton:
     def __init__(self, rect, label, get_state, set_state):
@@ -78,7 +379,7 @@ class ToggleButton:
         fg = (22, 60, 30) if active else (35, 45, 58)
         pygame.draw.rect(surface, bg, self.rect, border_radius=10)
         pygame.draw.rect(surface, border, self.rect, 1, border_radius=10)
-        text = font.render(self.label + ("  ●" if active else "  ○"), True, fg)
+        text = render_text(font, self.label + ("  ●" if active else "  ○"), fg)
         surface.blit(text, (self.rect.x + (self.rect.w - text.get_width()) // 2,
                             self.rect.y + (self.rect.h - text.get_height()) // 2))
     
@@ -96,15 +397,83 @@ class FarmViz3D:
         
         self.screen = pygame.display.set_mode((self.w, self.h), DOUBLEBUF | OPENGL)
         pygame.display.set_caption("Autonomous Agricultural Swarm - 3D View")
+        pygame.event.set_blocked(None); pygame.event.set_allowed(INPUT_EVENTS)
         
         self.setup_opengl()
+        self.shader = InstanceShader()
+        self.cube_mesh = InstancedMesh(self.shader, *unit_cube())
+        self.sphere_mesh = InstancedMesh(self.shader, *uv_sphere(12, 12))
+        self.marker_mesh = InstancedMesh(self.shader, *icosphere(1))  # 80 triangles, for small pest/disease markers
+        self.stem_mesh = InstancedMesh(self.shader, *tapered_cylinder(0.08, 0.04, 12))
         
-        self.camera = Camera3D()
+        self.camera = Camera3D(distance=45.0, angle_v=35.0)  # closer view, better angle
         self.mouse_dragging = False
         self.last_mouse_pos = (0, 0)
+        self.running = True
+        self.event_handlers = {  # one per INPUT_EVENTS type
+            pygame.QUIT: self._on_quit,
+            pygame.MOUSEBUTTONDOWN: self._on_mouse_down,
+            pygame.MOUSEBUTTONUP: self._on_mouse_up,
+            pygame.MOUSEMOTION: self._on_mouse_motion,
+            pygame.MOUSEWHEEL: self._on_mouse_wheel,
+            pygame.KEYDOWN: self._on_key,
+            **dict.fromkeys(REPAINT_EVENTS, self._on_expose),
+        }
+        P = functools.partial
+        self.key_handlers = {
+            # Weather hotkeys
+            pygame.K_r: P(self._flip_condition, "rainy"),
+            pygame.K_s: P(self._flip_condition, "sunny"),
+            pygame.K_w: P(self._flip_condition, "wind_storm"),
+            pygame.K_d: P(self._flip_condition, "drought"),
+            # Pause/Step
+            pygame.K_SPACE: self._toggle_pause,
+            pygame.K_n: self._step_paused,
+            # Speed controls
+            pygame.K_PLUS: P(self._change_move_every, 1),
+            pygame.K_EQUALS: P(self._change_move_every, 1),
+            pygame.K_KP_PLUS: P(self._change_move_every, 1),
+            pygame.K_MINUS: P(self._change_move_every, -1),
+            pygame.K_KP_MINUS: P(self._change_move_every, -1),
+            pygame.K_LEFTBRACKET: P(self._change_fps, -5),
+            pygame.K_RIGHTBRACKET: P(self._change_fps, 5),
+            # Toggle features
+            pygame.K_g: self._toggle_grid,
+            pygame.K_t: self._toggle_trails,
+            # Screenshot / snapshot
+            pygame.K_p: self._queue_screenshot,
+            pygame.K_o: self._save_snapshot,
+        }
+        
+        # World-space cell centres: cell (x, y) sits at (_wx[x], 0, _wz[y])
+        self._wx = ((np.arange(sim.w) - sim.w / 2) * 2.0).astype(np.float32)
+        self._wz = ((np.arange(sim.h) - sim.h / 2) * 2.0).astype(np.float32)
+        self._cell_centre = np.zeros((sim.w, sim.h, 3), dtype=np.float32)
+        self._cell_centre[:, :, 0] = self._wx[:, None]
+        self._cell_centre[:, :, 2] = self._wz[None, :]
+        self._cell_centre = self._cell_centre.reshape(-1, 3)
+        self._cull_centre = np.hstack([self._cell_centre, np.ones((sim.w * sim.h, 1), np.float32)])
+        self._cull_centre[:, 1] = CULL_CENTER_Y  # homogeneous bounding-sphere centres
+        self._grid_lines = self._build_grid_lines()
+        # Per-tick SoA mirror of the drawn cell fields, see refresh_cell_arrays
+        self._cell_crop = np.zeros((sim.w, sim.h), dtype=np.int8)  # 0 none, else CROP_TYPES code + 1
+        self._cell_moisture = np.zeros((sim.w, sim.h), dtype=np.float32)
+        self._cell_growth = np.zeros((sim.w, sim.h), dtype=np.float32)
+        self._cell_pest = np.zeros((sim.w, sim.h), dtype=np.float32)
+        self._cell_disease = np.zeros((sim.w, sim.h), dtype=np.float32)
+        self._cell_params = np.empty((sim.w * sim.h, CELL_PARAMS), dtype=np.float32)
+        self._cell_health = self._cell_params[:, CP_HEALTH].reshape(sim.w, sim.h)  # view
+        self._cells_tick = None
+        self._cell_rows = None  # per-tick instance rows, see _build_cell_instances
+        self._bars_angle = None
+        self._display_lists = {}  # (name, grid w, grid h) -> list id, see _call_list
+        self._rng = np.random.default_rng()
+        self.rain_data = np.zeros((RAIN_DROPS, 2, 3), dtype=np.float32)  # (top, bottom) xyz per streak
+        self._rain_lo = np.array([-sim.w * 1.5, 8, -sim.h * 1.5], dtype=np.float32)  # streak top ranges
+        self._rain_hi = np.array([sim.w * 1.5, 20, sim.h * 1.5], dtype=np.float32)
         
         # Agent trails
-        self.agent_trails = [AgentTrail() for _ in sim.agents]
+        self.agent_trails = AgentTrails(len(sim.agents))
         
         # Visual options
         self.show_grid = True
@@ -116,8 +485,27 @@ class FarmViz3D:
         self.font_sm = pygame.font.Font(FONT_NAME, 13)
         self.font_md = pygame.font.Font(FONT_NAME, 16)
         self.font_lg = pygame.font.Font(FONT_NAME, 20)
-        
-        self.overlay = pygame.Surface((self.w, self.h), pygame.SRCALPHA)
+        # text -> surface for every constant HUD string; a rebuild only blits these
+        self._labels = {
+            "Farm Dashboard": render_text(self.font_lg, "Farm Dashboard", (30, 50, 80)),
+            "Controls": render_text(self.font_sm, "Controls", (40, 60, 80)),
+            "Legend": render_text(self.font_md, "Legend", (40, 60, 80)),
+        }
+        self._labels.update((t, render_text(self.font_md, t, (33, 66, 120))) for t in PANEL_SECTIONS)
+        self._labels.update((k, render_text(self.font_sm, k + ":", (60, 60, 60))) for k in PANEL_KEYS)
+        self._labels.update((h, render_text(self.font_xs, h, (60, 80, 100))) for h in CONTROL_HINTS)
+        self._labels.update((label, render_text(self.font_xs, label[2:] if "Robot" in label else label, (50, 50, 50)))
+                            for label, _ in LEGEND_ITEMS)
+        # Section underline: the 2px rule from panel x+14 to w-18 inclusive, blitted instead of drawn
+        self._section_divider = pygame.Surface((PANEL_W - 31, 2), pygame.SRCALPHA, 32).convert_alpha()
+        self._section_divider.fill((180, 190, 200))
+        
+        self.overlay = pygame.Surface((self.w, self.h), pygame.SRCALPHA, 32).convert_alpha()  # 8-bit RGBA, display order
+        self._init_overlay_texture()
+        self._overlay_dirty = True     # panel inputs changed outside a sim tick (toggles, pause, speed)
+        self._last_overlay_tick = -1   # sim tick the overlay texture was last rasterized for
+        self._panel_shown = None       # _panel_state() the overlay texture was last rasterized with
+        self._blit_list = []           # (surface, pos) text pairs of one rebuild, flushed with one blits()
         
         self.COL_BG = (238, 243, 248)
         self.COL_PANEL = (252, 253, 255)
@@ -129,13 +517,36 @@ class FarmViz3D:
         self.buttons: List[ToggleButton] = []
         self._init_weather_toggles()
         
+        # Overlay regions that can hold pixels: only these are uploaded and composited
+        self._hint_rect = pygame.Rect(15, self.h - 235, 500, 75)
+        self._legend_rect = pygame.Rect(15, 45, 180, 200)
+        self._panel_rect = pygame.Rect(self.w - PANEL_W, 0, PANEL_W, self.h)
+        buttons = self.buttons[0].rect.unionall([b.rect for b in self.buttons[1:]])
+        screen = pygame.Rect(0, 0, self.w, self.h)
+        self._hud_rects = [r.inflate(4, 4).clip(screen)  # margin for borders drawn on the edge
+                           for r in (buttons, self._hint_rect, self._legend_rect, self._panel_rect)]
+        # (surface, pos) pairs of every constant label, laid out once; each rebuild's blit list starts from these
+        hint_y = self.h - 225
+        self._static_blits = [(self._labels["Controls"], (25, hint_y))]
+        self._static_blits += [(self._labels[hint], (25, hint_y + 22 + i * 16)) for i, hint in enumerate(CONTROL_HINTS)]
+        self._static_blits.append((self._labels["Legend"], (25, 50)))
+        self._static_blits += [(self._labels[label], (42 if "Robot" in label else 25, 82 + i * 20))
+                               for i, (label, _) in enumerate(LEGEND_ITEMS)]
+        self._static_blits.append((self._labels["Farm Dashboard"], (self.w - PANEL_W + 16, 12)))
+        
         self.paused = False
         self.move_every = MOVE_EVERY_N_TICKS_DEFAULT
         self.current_fps = FPS
         
         self.base_shaping = dict(self.sim.llm_shaping)
+        self._weather_dirty = True  # conditions changed since the shaping was last written
+        self.wind_every = 1  # ticks between wind re-rolls while rainy / wind storm
+        self._wind = np.empty((0, 2))
+        self._wind_i = 0
         
         self.clock = pygame.time.Clock()
+        self.io_executor = ThreadPoolExecutor(max_workers=1)  # screenshot / snapshot writes
+        self._screenshot_name = None  # set by the P key, captured by the next render()
     
     def setup_opengl(self):
         glEnable(GL_DEPTH_TEST)
@@ -166,6 +577,9 @@ class FarmViz3D:
         
         # Sky blue background
         glClearColor(0.68, 0.85, 0.95, 1)
+        
+        self._quad = gluNewQuadric()  # shared by every GLU sphere
+        gluQuadricNormals(self._quad, GLU_SMOOTH)
     
     def _init_weather_toggles(self):
         x_start = 20
@@ -191,6 +605,8 @@ class FarmViz3D:
             ))
     
     def _toggle_condition(self, key, val):
+        self._overlay_dirty = True
+        self._weather_dirty = True
         self.conditions[key] = val
         if key == "rainy" and val:
             self.conditions["sunny"] = False
@@ -198,35 +614,44 @@ class FarmViz3D:
             self.conditions["rainy"] = False
     
     def _apply_weather_overrides(self):
-        w = self.sim.weather
         c = self.conditions
-        shaping = dict(self.base_shaping)
+        dirty, self._weather_dirty = self._weather_dirty, False
+        if dirty:
+            shaping = dict(self.base_shaping)
+            for key, mults in WEATHER_MULTIPLIERS.items():
+                if c[key]:
+                    for name, f in mults.items():
+                        shaping[name] *= f
+            self.sim.llm_shaping.update(shaping)
         
+        w = self.sim.weather
         if c["rainy"]:
             w.rain = 1.0
             w.humidity = max(w.humidity, 0.78)
             w.temp = min(max(w.temp, 20.0), 32.0)
-            w.wind_dx = random.uniform(-0.3, 0.3)
-            w.wind_dy = random.uniform(-0.3, 0.3)
-            shaping["irrigate_multiplier"] *= 0.75
-            shaping["monitor_multiplier"] *= 1.05
-            shaping["fungicide_multiplier"] *= 1.05
         if c["sunny"]:
             w.rain = 0.0
             w.humidity = min(w.humidity, 0.5)
             w.temp = max(w.temp, 31.0)
-            shaping["irrigate_multiplier"] *= 1.10
-        if c["wind_storm"]:
-            w.wind_dx = random.uniform(-1.0, 1.0)
-            w.wind_dy = random.uniform(-1.0, 1.0)
-            shaping["monitor_multiplier"] *= 1.15
         if c["drought"]:
             w.rain = 0.0
             w.humidity = min(w.humidity, 0.35)
             w.temp = max(w.temp, 33.0)
-            shaping["irrigate_multiplier"] *= 1.30
         
-        self.sim.llm_shaping.update(shaping)
+        amp = 0.0
+        for key, a in WIND_JITTER.items():
+            if c[key]:
+                amp = a
+        if amp and (dirty or self.sim.ticks % self.wind_every == 0):
+            w.wind_dx, w.wind_dy = amp * self._next_wind()
+    
+    def _next_wind(self):
+        """Next (dx, dy) pair in [-1, 1) from a batch refilled every WIND_BATCH draws."""
+        if self._wind_i == len(self._wind):
+            self._wind = self._rng.uniform(-1.0, 1.0, (WIND_BATCH, 2))
+            self._wind_i = 0
+        self._wind_i += 1
+        return self._wind[self._wind_i - 1]
     
     def _active_condition_messages(self):
         msgs = []
@@ -281,18 +706,37 @@ class FarmViz3D:
         glVertex3f(-s, s, -s)
         glEnd()
     
+    def __del__(self):
+        if getattr(self, "_quad", None) is not None:
+            gluDeleteQuadric(self._quad)
+            self._quad = None
+    
     def draw_sphere(self, radius=0.5, slices=16, stacks=16):
-        quad = gluNewQuadric()
-        gluSphere(quad, radius, slices, stacks)
-        gluDeleteQuadric(quad)
+        """GLU sphere, tessellated once into a display list per (radius, slices, stacks)"""
+        self._call_list(("sphere", radius, slices, stacks),
+                        lambda: gluSphere(self._quad, radius, slices, stacks))
     
-    def draw_cylinder(self, base=0.1, top=0.1, height=1.0, slices=16):
-        quad = gluNewQuadric()
-        gluCylinder(quad, base, top, height, slices, 4)
-        gluDeleteQuadric(quad)
+    def _call_list(self, name, build):
+        """Replay the display list for `name` at the current grid size, compiling build() on first use.
+        A list compiled for another grid size under the same name is deleted."""
+        key = (name, self.sim.w, self.sim.h)
+        dl = self._display_lists.get(key)
+        if dl is None:
+            stale = [k for k in self._display_lists if k[0] == name]
+            for k in stale:
+                glDeleteLists(self._display_lists.pop(k), 1)
+            dl = glGenLists(1)
+            glNewList(dl, GL_COMPILE)
+            build()
+            glEndList()
+            self._display_lists[key] = dl
+        glCallList(dl)
     
     def draw_ground(self):
-        """Enhanced ground with grid pattern"""
+        """Enhanced ground with grid pattern (cached display list)"""
+        self._call_list("ground", self._ground_geometry)
+    
+    def _ground_geometry(self):
         size = self.sim.w * 1.2
         
         # Base ground
@@ -305,192 +749,172 @@ class FarmViz3D:
         glVertex3f(-size, -0.15, size)
         glEnd()
     
+    def _build_grid_lines(self):
+        """(w+1 + h+1, 2, 3) float32 endpoints of the cell border lines, vertical lines first."""
+        w, h = self.sim.w, self.sim.h
+        vx = (np.arange(w + 1) - w / 2) * 2.0 - 0.9
+        hz = (np.arange(h + 1) - h / 2) * 2.0 - 0.9
+        lines = np.full((w + 1 + h + 1, 2, 3), 0.01, dtype=np.float32)
+        lines[:w + 1, :, 0] = vx[:, None]
+        lines[:w + 1, :, 2] = (-h - 0.9, h + 0.9)
+        lines[w + 1:, :, 0] = (-w - 0.9, w + 0.9)
+        lines[w + 1:, :, 2] = hz[:, None]
+        return lines
+    
     def draw_grid_lines(self):
         """Draw clear grid lines to separate cells"""
         if not self.show_grid:
             return
-            
+        self._call_list("grid", self._grid_geometry)
+    
+    def _grid_geometry(self):
+        self._grid_lines = self._build_grid_lines()  # only compiled when the grid size changes
         glDisable(GL_LIGHTING)
         glLineWidth(1.5)
         glColor4f(0.25, 0.20, 0.16, 0.6)
         
-        # Vertical lines
-        for x in range(self.sim.w + 1):
-            wx = (x - self.sim.w / 2) * 2.0 - 0.9
-            glBegin(GL_LINES)
-            glVertex3f(wx, 0.01, -(self.sim.h / 2) * 2.0 - 0.9)
-            glVertex3f(wx, 0.01, (self.sim.h / 2) * 2.0 + 0.9)
-            glEnd()
-        
-        # Horizontal lines
-        for y in range(self.sim.h + 1):
-            wz = (y - self.sim.h / 2) * 2.0 - 0.9
-            glBegin(GL_LINES)
-            glVertex3f(-(self.sim.w / 2) * 2.0 - 0.9, 0.01, wz)
-            glVertex3f((self.sim.w / 2) * 2.0 + 0.9, 0.01, wz)
-            glEnd()
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, self._grid_lines)
+        glDrawArrays(GL_LINES, 0, self._grid_lines.shape[0] * 2)
+        glDisableClientState(GL_VERTEX_ARRAY)
         
         glLineWidth(1.0)
         glEnable(GL_LIGHTING)
     
-    def draw_cell_3d(self, x, y):
-        """Enhanced cell visualization"""
-        c = self.sim.grid[x][y]
-        
-        wx = (x - self.sim.w / 2) * 2.0
-        wz = (y - self.sim.h / 2) * 2.0
-        
-        glPushMatrix()
-        glTranslatef(wx, 0, wz)
-        
-        # Soil with moisture indication
-        moisture_factor = 0.5 + 0.5 * c.moisture
-        soil_r = 0.52 * moisture_factor
-        soil_g = 0.40 * moisture_factor
-        soil_b = 0.28 * moisture_factor
-        glColor3f(soil_r, soil_g, soil_b)
-        
-        glPushMatrix()
-        glTranslatef(0, -0.05, 0)
-        glScalef(1.85, 0.12, 1.85)
-        self.draw_cube()
-        glPopMatrix()
-        
-        # Draw crop
-        if c.crop:
-            h = c.health()
-            growth = c.growth
-            
-            # Stem - thicker and more visible
-            glColor3f(0.15, 0.55, 0.15)
-            glPushMatrix()
-            stem_height = 1.0 + growth * 3.0
-            glRotatef(-90, 1, 0, 0)
-            self.draw_cylinder(0.08, 0.04, stem_height, 12)
-            glPopMatrix()
-            
-            # Crop type specific appearance
-            if c.crop == "wheat":
-                self._draw_wheat(stem_height, h, growth)
-            elif c.crop == "corn":
-                self._draw_corn(stem_height, h, growth)
-            elif c.crop == "soy":
-                self._draw_soy(stem_height, h, growth)
-            
-            # Health indicator bar
-            self._draw_health_bar(wx, wz, stem_height + 0.8, h)
-            
-            # Pest/disease indicators (larger and clearer)
-            if c.pest > 0.2:
-                glColor3f(0.9, 0.2, 0.2)
-                glPushMatrix()
-                glTranslatef(0.3, stem_height * 0.7, 0)
-                self.draw_sphere(0.12, 12, 12)
-                glPopMatrix()
-            
-            if c.disease > 0.2:
-                glColor3f(0.6, 0.2, 0.8)
-                glPushMatrix()
-                glTranslatef(-0.3, stem_height * 0.6, 0)
-                self.draw_sphere(0.12, 12, 12)
-                glPopMatrix()
-        
-        glPopMatrix()
+    def refresh_cell_arrays(self):
+        """Mirror the simulator's cell fields and derived draw parameters; once per sim tick."""
+        sim = self.sim
+        if sim.ticks == self._cells_tick: return False
+        self._cells_tick = sim.ticks
+        np.add(sim.crop, 1, out=self._cell_crop)
+        np.copyto(self._cell_moisture, sim.moisture)
+        np.copyto(self._cell_growth, sim.growth)
+        np.copyto(self._cell_pest, sim.pest)
+        np.copyto(self._cell_disease, sim.disease)
+        if _cell_kernel is not None:
+            _cell_kernel(self._cell_moisture, sim.nutrient, self._cell_growth, self._cell_pest,
+                         self._cell_disease, self._cell_params)
+        else:
+            self._cell_params_numpy(self._cell_params)
+        return True
     
-    def _draw_wheat(self, stem_height, health, growth):
-        """Draw wheat-specific appearance"""
-        glColor3f(0.88 * (0.5 + 0.5 * health), 
-                 0.82 * (0.5 + 0.5 * health), 
-                 0.42 * (0.5 + 0.5 * health))
-        
-        # Wheat head
-        glPushMatrix()
-        glTranslatef(0, stem_height, 0)
-        glScalef(0.15, 0.4 + growth * 0.3, 0.15)
-        self.draw_cube()
-        glPopMatrix()
+    def visible_agents(self):
+        """(n_agents,) mask of agents whose bounding sphere intersects the view frustum."""
+        pool = self.sim.agents
+        n = len(pool)
+        centre = np.stack([self._wx[pool.x], np.full(n, AGENT_Y), self._wz[pool.y], np.ones(n)], axis=1)
+        return (centre @ self.camera.planes.T >= -AGENT_CULL_RADIUS).all(axis=1)
     
-    def _draw_corn(self, stem_height, health, growth):
-        """Draw corn-specific appearance"""
-        base_col = (0.3, 0.75, 0.3)
-        glColor3f(base_col[0] * (0.5 + 0.5 * health),
-                 base_col[1] * (0.5 + 0.5 * health),
-                 base_col[2] * (0.5 + 0.5 * health))
-        
-        # Corn leaves
-        for i in range(4):
-            angle = (i / 4) * 2 * math.pi
-            glPushMatrix()
-            glTranslatef(math.cos(angle) * 0.25, 
-                        stem_height * (0.4 + i * 0.15),
-                        math.sin(angle) * 0.25)
-            glRotatef(45, math.cos(angle), 0, math.sin(angle))
-            glScalef(0.4, 0.15, 0.1)
-            self.draw_cube()
-            glPopMatrix()
-        
-        # Corn ear
-        glColor3f(0.9, 0.85, 0.3)
-        glPushMatrix()
-        glTranslatef(0.2, stem_height * 0.7, 0)
-        glRotatef(45, 0, 0, 1)
-        glScalef(0.15, 0.35, 0.15)
-        self.draw_cube()
-        glPopMatrix()
+    def visible_cells(self):
+        """(w*h,) mask of cells whose bounding sphere intersects the view frustum of the last camera.apply()."""
+        return (self._cull_centre @ self.camera.planes.T >= -CULL_RADIUS).all(axis=1)
     
-    def _draw_soy(self, stem_height, health, growth):
-        """Draw soy-specific appearance"""
-        base_col = (0.3, 0.68, 0.52)
-        glColor3f(base_col[0] * (0.5 + 0.5 * health),
-                 base_col[1] * (0.5 + 0.5 * health),
-                 base_col[2] * (0.5 + 0.5 * health))
-        
-        # Soy leaves clusters
-        for i in range(5):
-            angle = (i / 5) * 2 * math.pi
-            offset = 0.18 + growth * 0.15
-            glPushMatrix()
-            glTranslatef(math.cos(angle) * offset, 
-                        stem_height * (0.3 + i * 0.12),
-                        math.sin(angle) * offset)
-            self.draw_sphere(0.18, 12, 12)
-            glPopMatrix()
+    def _build_cell_instances(self):
+        """Instance rows for every cell part of the whole grid, rebuilt once per sim tick:
+        [(rows, cell index)] for lit cubes, lit spheres, pest/disease markers, stems, health
+        bar backgrounds and health bar fills. Cells without a crop contribute only their soil block."""
+        centre = self._cell_centre
+        ncells = len(centre)
+
+        # Soil with moisture indication
+        soil = instances(centre + (0, -0.05, 0), (1.85, 0.12, 1.85), SOIL_RGB,
+                         shade=self._cell_moisture.ravel())
+
+        crop = self._cell_crop.ravel()
+        idx = np.flatnonzero(crop > 0)
+        c = centre[idx]
+        p = self._cell_params[idx]
+        growth = self._cell_growth.ravel()[idx]
+        pest, disease = self._cell_pest.ravel()[idx], self._cell_disease.ravel()[idx]
+        crop = crop[idx] - 1
+        health, sh = p[:, CP_HEALTH], p[:, CP_STEM_H]
+        n = len(c)
+
+        # Stems, thicker and more visible
+        stems = instances(c, np.stack([np.ones(n), sh, np.ones(n)], axis=1), STEM_RGB)
+
+        cubes, spheres = [(soil, np.arange(ncells))], []
+        # Wheat head
+        m = crop == CROP_TYPES.index("wheat")
+        g = growth[m]
+        cubes.append((instances(c[m] + np.stack([0 * g, sh[m], 0 * g], axis=1),
+                                np.stack([0.15 + 0 * g, 0.4 + g * 0.3, 0.15 + 0 * g], axis=1),
+                                WHEAT_RGB, shade=health[m]), idx[m]))
+        # Corn leaves and ear
+        m = crop == CROP_TYPES.index("corn")
+        for i, a in enumerate(_CORN_A):
+            off = np.stack([np.full(m.sum(), math.cos(a) * 0.25), sh[m] * (0.4 + i * 0.15),
+                            np.full(m.sum(), math.sin(a) * 0.25)], axis=1)
+            cubes.append((instances(c[m] + off, (0.4, 0.15, 0.1), CORN_RGB, _CORN_ROT[i], health[m]), idx[m]))
+        off = np.stack([np.full(m.sum(), 0.2), sh[m] * 0.7, np.zeros(m.sum())], axis=1)
+        cubes.append((instances(c[m] + off, (0.15, 0.35, 0.15), CORN_EAR_RGB, _CORN_EAR_ROT), idx[m]))
+        # Soy leaf clusters
+        m = crop == CROP_TYPES.index("soy")
+        spread = 0.18 + growth[m] * 0.15
+        for i, a in enumerate(_SOY_A):
+            off = np.stack([math.cos(a) * spread, sh[m] * (0.3 + i * 0.12), math.sin(a) * spread], axis=1)
+            spheres.append((instances(c[m] + off, (0.18, 0.18, 0.18), SOY_RGB, shade=health[m]), idx[m]))
+
+        # Pest/disease indicators
+        markers = []
+        for level, dx, fy, rgb in ((pest, 0.3, 0.7, PEST_RGB), (disease, -0.3, 0.6, DISEASE_RGB)):
+            m = level > MARK_THRESHOLD
+            off = np.stack([np.full(m.sum(), dx), sh[m] * fy, np.zeros(m.sum())], axis=1)
+            markers.append((instances(c[m] + off, (0.12, 0.12, 0.12), rgb), idx[m]))
+
+        # Floating health bars (background, then red-to-green fill); rotation set per frame
+        top = np.stack([np.zeros(n), sh + 0.8, np.zeros(n)], axis=1)
+        bars = instances(c + top, (0.6, 0.08, 0.02), BAR_BG_RGB)
+        fills = instances(c + top + np.stack([-0.3 * (1 - health), 0 * health, 0 * health], axis=1),
+                          np.stack([0.6 * health, np.full(n, 0.08), np.full(n, 0.03)], axis=1), 0, shade=health)
+        join = lambda parts: (np.concatenate([r for r, _ in parts]), np.concatenate([i for _, i in parts]))
+        return [join(cubes), join(spheres), join(markers), (stems, idx), (bars, idx), (fills, idx)]
+
+    def _cell_instances(self):
+        """Instance rows for every visible cell part: (lit cubes, lit spheres, markers, stems,
+        health bar backgrounds, health bar fills). Off-screen cells are culled from the per-tick rows."""
+        if self.refresh_cell_arrays():
+            self._cell_rows = self._build_cell_instances()
+            self._bars_angle = None
+        parts = self._cell_rows
+        # Health bars turn with the camera
+        if self.camera.angle_h != self._bars_angle:
+            self._bars_angle = self.camera.angle_h
+            rot = rotation((0, 1, 0), self._bars_angle).T.ravel()  # column-major, as in instances()
+            for rows, _ in parts[4:]:
+                rows[:, 6:15] = rot
+        vis = self.visible_cells()
+        return tuple(rows[vis[cell]] for rows, cell in parts)
+
+    def _cell_params_numpy(self, out):
+        """NumPy fallback for _cell_kernel."""
+        out[:, CP_HEALTH] = compute_health(self._cell_moisture, self.sim.nutrient,
+                                           self._cell_pest, self._cell_disease).ravel()
+        out[:, CP_STEM_H] = 1.0 + 3.0 * self._cell_growth.ravel()
     
-    def _draw_health_bar(self, wx, wz, height, health):
-        """Draw floating health bar above crop"""
-        glDisable(GL_LIGHTING)
-        
-        # Background bar
-        glColor3f(0.3, 0.3, 0.3)
-        glPushMatrix()
-        glTranslatef(0, height, 0)
-        glRotatef(self.camera.angle_h, 0, 1, 0)
-        glScalef(0.6, 0.08, 0.02)
-        self.draw_cube()
-        glPopMatrix()
-        
-        # Health bar (red to green)
-        if health < 0.5:
-            glColor3f(1.0, health * 2, 0)
-        else:
-            glColor3f(2.0 * (1.0 - health), 1.0, 0)
-        
-        glPushMatrix()
-        glTranslatef(-0.3 * (1 - health), height, 0)
-        glRotatef(self.camera.angle_h, 0, 1, 0)
-        glScalef(0.6 * health, 0.08, 0.03)
-        self.draw_cube()
-        glPopMatrix()
-        
-        glEnable(GL_LIGHTING)
+    def draw_cells(self):
+        """All soil blocks, crops, markers and health bars in six instanced draws."""
+        cubes, spheres, markers, stems, bars, fills = self._cell_instances()
+        glUseProgram(self.shader.program)
+        glUniform1i(self.shader.u_lit, 1)
+        self.cube_mesh.draw(cubes)
+        self.sphere_mesh.draw(spheres)
+        self.marker_mesh.draw(markers)
+        self.stem_mesh.draw(stems)
+        glUniform1i(self.shader.u_lit, 0)
+        self.cube_mesh.draw(bars)
+        glUniform1i(self.shader.u_health_ramp, 1)
+        self.cube_mesh.draw(fills)
+        glUniform1i(self.shader.u_health_ramp, 0)
+        glUseProgram(0)
     
     def draw_agent_3d(self, agent, index):
         """Enhanced agent visualization"""
-        wx = (agent.x - self.sim.w / 2) * 2.0
-        wz = (agent.y - self.sim.h / 2) * 2.0
+        wx = self._wx[agent.x]
+        wz = self._wz[agent.y]
         
         glPushMatrix()
-        glTranslatef(wx, 1.2, wz)
+        glTranslatef(wx, AGENT_Y, wz)
         
         # Robot body - larger and clearer
         if index % 3 == 0:
@@ -503,29 +927,6 @@ class FarmViz3D:
         glColor3f(*col)
         self.draw_sphere(0.5, 20, 20)
         
-        # Battery indicator ring
-        battery_pct = agent.battery
-        if battery_pct > 0.6:
-            batt_col = (0.2, 0.9, 0.2)
-        elif battery_pct > 0.3:
-            batt_col = (0.9, 0.9, 0.2)
-        else:
-            batt_col = (0.9, 0.2, 0.2)
-        
-        glDisable(GL_LIGHTING)
-        glColor3f(*batt_col)
-        glLineWidth(4)
-        glBegin(GL_LINE_LOOP)
-        for i in range(32):
-            if i / 32.0 <= battery_pct:
-                angle = i * 2 * math.pi / 32
-                x = 0.6 * math.cos(angle)
-                z = 0.6 * math.sin(angle)
-                glVertex3f(x, 0, z)
-        glEnd()
-        glLineWidth(1)
-        glEnable(GL_LIGHTING)
-        
         # Agent ID marker
         glColor3f(1, 1, 1)
         glPushMatrix()
@@ -535,60 +936,56 @@ class FarmViz3D:
         glPopMatrix()
         
         # Action indicator - beam showing current action
-        self._draw_action_indicator(agent, wx, wz)
+        self._draw_action_indicator(self.sim.agents.last_action[index])
         
         glPopMatrix()
     
-    def _draw_action_indicator(self, agent, wx, wz):
+    def draw_battery_rings(self, visible):
+        """Battery indicator rings of the `visible` agents, one partial loop each, in one glMultiDrawArrays."""
+        pool = self.sim.agents
+        n = len(BATTERY_RING)  # ring points i with i / n <= battery
+        counts = np.clip(np.floor(pool.battery * n).astype(np.int32) + 1, 0, n)
+        counts[~visible] = 0
+        firsts = np.zeros_like(counts)
+        np.cumsum(counts[:-1], out=firsts[1:])
+        owner = np.repeat(np.arange(len(counts)), counts)
+        centre = np.stack([self._wx[pool.x], np.full(len(counts), AGENT_Y), self._wz[pool.y]], axis=1)
+        verts = (BATTERY_RING[np.arange(len(owner)) - firsts[owner]] + centre[owner]).astype(np.float32)
+        level = (pool.battery > 0.3).astype(np.intp) + (pool.battery > 0.6)
+        colors = BATTERY_RGB[level][owner]
+        
+        glDisable(GL_LIGHTING)
+        glLineWidth(4)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, verts)
+        glColorPointer(3, GL_FLOAT, 0, colors)
+        glMultiDrawArrays(GL_LINE_LOOP, firsts, counts, len(counts))
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glLineWidth(1)
+        glEnable(GL_LIGHTING)
+    
+    @staticmethod
+    def _draw_lines(mode, verts):
+        """Draw a (n, 3) float32 vertex table with one glDrawArrays."""
+        if len(verts) == 0: return
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, verts)
+        glDrawArrays(mode, 0, len(verts))
+        glDisableClientState(GL_VERTEX_ARRAY)
+    
+    def _draw_action_indicator(self, action_id):
         """Draw visual indicator of agent's current action"""
-        action = agent.last_action
+        indicator = ACTION_INDICATORS[action_id]
+        if indicator is None:
+            return
+        mode, verts, rgba = indicator
         
         glDisable(GL_LIGHTING)
         glLineWidth(3)
-        
-        if action == "irrigate":
-            # Blue beam downward
-            glColor4f(0.2, 0.5, 1.0, 0.7)
-            glBegin(GL_LINES)
-            glVertex3f(0, 0, 0)
-            glVertex3f(0, -1.0, 0)
-            glEnd()
-        elif action == "fertilize":
-            # Green spray
-            glColor4f(0.3, 0.9, 0.3, 0.6)
-            for i in range(8):
-                angle = i * 2 * math.pi / 8
-                glBegin(GL_LINES)
-                glVertex3f(0, 0, 0)
-                glVertex3f(math.cos(angle) * 0.5, -0.8, math.sin(angle) * 0.5)
-                glEnd()
-        elif action == "pesticide":
-            # Red spray
-            glColor4f(1.0, 0.3, 0.3, 0.6)
-            for i in range(8):
-                angle = i * 2 * math.pi / 8
-                glBegin(GL_LINES)
-                glVertex3f(0, 0, 0)
-                glVertex3f(math.cos(angle) * 0.5, -0.8, math.sin(angle) * 0.5)
-                glEnd()
-        elif action == "fungicide":
-            # Purple spray
-            glColor4f(0.8, 0.3, 0.8, 0.6)
-            for i in range(8):
-                angle = i * 2 * math.pi / 8
-                glBegin(GL_LINES)
-                glVertex3f(0, 0, 0)
-                glVertex3f(math.cos(angle) * 0.5, -0.8, math.sin(angle) * 0.5)
-                glEnd()
-        elif action == "monitor":
-            # Yellow scan beam
-            glColor4f(1.0, 1.0, 0.3, 0.7)
-            glBegin(GL_LINE_LOOP)
-            for i in range(16):
-                angle = i * 2 * math.pi / 16
-                glVertex3f(math.cos(angle) * 0.6, -0.5, math.sin(angle) * 0.6)
-            glEnd()
-        
+        glColor4f(*rgba)
+        self._draw_lines(mode, verts)
         glLineWidth(1)
         glEnable(GL_LIGHTING)
     
@@ -597,30 +994,31 @@ class FarmViz3D:
         if not self.show_trails:
             return
         
+        # All trails as one vertex and one color array, one line strip per agent
+        n = len(self.agent_trails)
+        if n < 2:
+            return
+        pos = self.agent_trails.ordered().transpose(1, 0, 2)  # (agents, n, 2), agent-major
+        m = len(pos)
+        counts = np.full(m, n, dtype=np.int32)
+        firsts = np.arange(m, dtype=np.int32) * n
+        verts = np.empty((m, n, 3), dtype=np.float32)
+        verts[..., 0] = self._wx[pos[..., 0]]
+        verts[..., 1] = TRAIL_Y
+        verts[..., 2] = self._wz[pos[..., 1]]
+        colors = np.empty((m, n, 4), dtype=np.float32)
+        colors[..., 0:3] = AGENT_RGB[np.arange(m) % 3][:, None]  # trail color matches agent, fading towards the tail
+        colors[..., 3] = np.arange(1, n + 1) * (0.5 / n)
+        
         glDisable(GL_LIGHTING)
         glLineWidth(2)
-        
-        for i, trail in enumerate(self.agent_trails):
-            if len(trail.positions) < 2:
-                continue
-            
-            # Trail color matches agent
-            if i % 3 == 0:
-                col = (0.2, 0.5, 1.0)
-            elif i % 3 == 1:
-                col = (1.0, 0.6, 0.2)
-            else:
-                col = (0.3, 0.9, 0.4)
-            
-            glBegin(GL_LINE_STRIP)
-            for j, (x, y) in enumerate(trail.positions):
-                alpha = (j + 1) / len(trail.positions)
-                glColor4f(col[0], col[1], col[2], alpha * 0.5)
-                wx = (x - self.sim.w / 2) * 2.0
-                wz = (y - self.sim.h / 2) * 2.0
-                glVertex3f(wx, 0.8, wz)
-            glEnd()
-        
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, verts)
+        glColorPointer(4, GL_FLOAT, 0, colors)
+        glMultiDrawArrays(GL_LINE_STRIP, firsts, counts, len(counts))
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
         glLineWidth(1)
         glEnable(GL_LIGHTING)
     
@@ -630,76 +1028,79 @@ class FarmViz3D:
             glDisable(GL_LIGHTING)
             glColor4f(0.5, 0.7, 1.0, 0.4)
             glLineWidth(2)
-            glBegin(GL_LINES)
-            for _ in range(150):
-                x = random.uniform(-self.sim.w * 1.5, self.sim.w * 1.5)
-                z = random.uniform(-self.sim.h * 1.5, self.sim.h * 1.5)
-                y_top = random.uniform(8, 20)
-                glVertex3f(x, y_top, z)
-                glVertex3f(x - 0.2, y_top - 2.5, z - 0.2)
-            glEnd()
+            d = self.rain_data
+            d[:, 0] = self._rng.uniform(self._rain_lo, self._rain_hi, (RAIN_DROPS, 3))
+            d[:, 1] = d[:, 0] + RAIN_STREAK
+            glEnableClientState(GL_VERTEX_ARRAY)
+            glVertexPointer(3, GL_FLOAT, 0, d)
+            glDrawArrays(GL_LINES, 0, 2 * RAIN_DROPS)
+            glDisableClientState(GL_VERTEX_ARRAY)
             glLineWidth(1)
             glEnable(GL_LIGHTING)
     
     def render_3d_scene(self):
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        glLoadIdentity()
         
-        self.camera.apply()
+        self.camera.apply()  # loads the whole modelview
         
         self.draw_ground()
         self.draw_grid_lines()
         
-        # Draw cells
-        for x in range(self.sim.w):
-            for y in range(self.sim.h):
-                self.draw_cell_3d(x, y)
+        # Draw cells (instanced, a handful of draw calls)
+        self.draw_cells()
         
         # Draw agent trails
         self.draw_agent_trails()
         
-        # Draw agents
+        # Draw agents, skipping those outside the view frustum
+        visible = self.visible_agents()
         for i, agent in enumerate(self.sim.agents):
-            self.draw_agent_3d(agent, i)
+            if visible[i]:
+                self.draw_agent_3d(agent, i)
+        self.draw_battery_rings(visible)
         
         # Draw weather effects
         self.draw_rain_effect()
     
     def render_2d_overlay(self, llm_summary: list):
         """Render 2D UI overlay"""
-        self.overlay.fill((0, 0, 0, 0))
-        
-        # Draw weather control buttons
-        for btn in self.buttons:
-            btn.draw(self.overlay, self.font_sm)
-        
-        # Enhanced control hints with background
-        hint_bg = pygame.Rect(15, self.h - 235, 500, 75)
-        pygame.draw.rect(self.overlay, (255, 255, 255, 200), hint_bg, border_radius=8)
-        pygame.draw.rect(self.overlay, (100, 120, 140), hint_bg, 2, border_radius=8)
-        
-        hint_y = self.h - 225
-        title = self.font_sm.render("Controls", True, (40, 60, 80))
-        self.overlay.blit(title, (25, hint_y))
-        hint_y += 22
-        
-        hints = [
-            "🖱️  Drag to rotate | Scroll to zoom",
-            "⌨️  R/S/W/D Weather | Space Pause | +/- Speed"
-        ]
-        for i, hint in enumerate(hints):
-            text = self.font_xs.render(hint, True, (60, 80, 100))
-            self.overlay.blit(text, (25, hint_y + i * 16))
-        
-        # Draw legend in bottom left
-        self._draw_legend()
-        
-        # Draw side panel
-        self.draw_side_panel(llm_summary)
-        
-        # Convert overlay to OpenGL texture and draw
-        texture_data = pygame.image.tostring(self.overlay, "RGBA", True)
+        # Re-rasterize and re-upload only after a panel input change, or a sim tick that changed
+        # what the side panel shows; otherwise the texture from last time is drawn again
+        state = None
+        if self.sim.ticks != self._last_overlay_tick:
+            self._last_overlay_tick = self.sim.ticks
+            state = self._panel_state()
+            self._overlay_dirty |= state != self._panel_shown
+        if self._overlay_dirty:
+            self._overlay_dirty = False
+            self._panel_shown = state or self._panel_state()
+            self.overlay.fill((0, 0, 0, 0))
+            self._blit_list.clear()
+            self._blit_list.extend(self._static_blits)  # control hints, legend and panel titles
+            
+            # Draw weather control buttons
+            for btn in self.buttons:
+                btn.draw(self.overlay, self.font_sm)
+            
+            # Enhanced control hints with background
+            hint_bg = self._hint_rect
+            pygame.draw.rect(self.overlay, (255, 255, 255, 200), hint_bg, border_radius=8)
+            pygame.draw.rect(self.overlay, (100, 120, 140), hint_bg, 2, border_radius=8)
+            
+            # Draw legend in bottom left
+            self._draw_legend()
+            
+            # Draw side panel
+            self.draw_side_panel(llm_summary, self._panel_shown)
+            
+            self.overlay.blits(self._blit_list, doreturn=False)
+            self._upload_overlay()
         
+        # Composite the overlay texture: state, projection and quads replayed from one display list
+        self._call_list("overlay", self._overlay_geometry)
+    
+    def _overlay_geometry(self):
+        """Overlay texture over its HUD regions only, one quad each, in screen-space projection."""
         glMatrixMode(GL_PROJECTION)
         glPushMatrix()
         glLoadIdentity()
@@ -711,9 +1112,20 @@ class FarmViz3D:
         glDisable(GL_DEPTH_TEST)
         glDisable(GL_LIGHTING)
         glEnable(GL_BLEND)
-        
-        glRasterPos2i(0, 0)
-        glDrawPixels(self.w, self.h, GL_RGBA, GL_UNSIGNED_BYTE, texture_data)
+        glEnable(GL_TEXTURE_2D)
+        glColor4f(1, 1, 1, 1)  # GL_MODULATE: don't tint the overlay with the last scene color
+        
+        glBindTexture(GL_TEXTURE_2D, self._overlay_tex)
+        glBegin(GL_QUADS)  # texture row 0 is the surface's top row
+        for r in self._hud_rects:
+            u0, v0, u1, v1 = r.left / self.w, r.top / self.h, r.right / self.w, r.bottom / self.h
+            glTexCoord2f(u0, v0); glVertex2f(r.left, self.h - r.top)
+            glTexCoord2f(u1, v0); glVertex2f(r.right, self.h - r.top)
+            glTexCoord2f(u1, v1); glVertex2f(r.right, self.h - r.bottom)
+            glTexCoord2f(u0, v1); glVertex2f(r.left, self.h - r.bottom)
+        glEnd()
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glDisable(GL_TEXTURE_2D)
         
         glEnable(GL_DEPTH_TEST)
         glEnable(GL_LIGHTING)
@@ -723,95 +1135,119 @@ class FarmViz3D:
         glPopMatrix()
         glMatrixMode(GL_MODELVIEW)
     
+    def _init_overlay_texture(self):
+        """Screen-sized RGBA texture the overlay surface is streamed into each frame."""
+        self._overlay_tex = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self._overlay_tex)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)  # drawn 1:1
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, self.w, self.h, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        # surface byte order -> GL format, so the pixel buffer can be uploaded as-is
+        masks = self.overlay.get_masks()[:3]
+        self._overlay_fmt = {(0xff, 0xff00, 0xff0000): GL_RGBA,
+                             (0xff0000, 0xff00, 0xff): GL_BGRA}.get(masks)
+    
+    def _upload_overlay(self):
+        glBindTexture(GL_TEXTURE_2D, self._overlay_tex)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        if self._overlay_fmt is None:  # unusual layout: let pygame convert
+            glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, self.w, self.h, GL_RGBA, GL_UNSIGNED_BYTE,
+                            pygame.image.tostring(self.overlay, "RGBA", False))
+        else:  # HUD regions straight from the surface's pixel buffer, no intermediate string
+            pixels = np.frombuffer(self.overlay.get_view("1"), np.uint8)
+            pitch = self.overlay.get_pitch()
+            glPixelStorei(GL_UNPACK_ROW_LENGTH, pitch // 4)
+            for r in self._hud_rects:
+                glTexSubImage2D(GL_TEXTURE_2D, 0, r.x, r.y, r.w, r.h, self._overlay_fmt, GL_UNSIGNED_BYTE,
+                                pixels[r.y * pitch + r.x * 4:])
+            glPixelStorei(GL_UNPACK_ROW_LENGTH, 0)
+        glBindTexture(GL_TEXTURE_2D, 0)
+    
     def _draw_legend(self):
         """Draw legend explaining visual elements"""
         legend_x = 20
         legend_y = 50
         
-        legend_bg = pygame.Rect(legend_x - 5, legend_y - 5, 180, 200)
+        legend_bg = self._legend_rect
         pygame.draw.rect(self.overlay, (255, 255, 255, 220), legend_bg, border_radius=8)
         pygame.draw.rect(self.overlay, (100, 120, 140), legend_bg, 2, border_radius=8)
         
-        title = self.font_md.render("Legend", True, (40, 60, 80))
-        self.overlay.blit(title, (legend_x + 5, legend_y))
-        
-        items = [
-            ("● Blue Robot", (51, 128, 255)),
-            ("● Orange Robot", (255, 153, 51)),
-            ("● Green Robot", (77, 230, 102)),
-            ("🌾 Wheat (Golden)", (204, 191, 100)),
-            ("🌽 Corn (Green)", (61, 181, 69)),
-            ("🫘 Soy (Teal)", (69, 173, 133)),
-            ("🔴 Pest", (230, 51, 51)),
-            ("🟣 Disease", (153, 69, 204)),
-        ]
-        
+        # Labels come from _static_blits; only the robot colour dots are drawn here
         y = legend_y + 30
-        for label, color in items:
+        for label, color in LEGEND_ITEMS:
             if "Robot" in label:
                 pygame.draw.circle(self.overlay, color, (legend_x + 10, y + 7), 6)
-                text = self.font_xs.render(label[2:], True, (50, 50, 50))
-                self.overlay.blit(text, (legend_x + 22, y + 2))
-            else:
-                text = self.font_xs.render(label, True, (50, 50, 50))
-                self.overlay.blit(text, (legend_x + 5, y + 2))
             y += 20
     
-    def draw_side_panel(self, llm_summary: list):
-        """Enhanced side information panel"""
-        panel = pygame.Rect(self.w - PANEL_W, 0, PANEL_W, self.h)
+    def _panel_state(self):
+        """Everything the side panel shows that changes over a run, as drawn: (weather rows,
+        control rows, metric rows, sustainability bar, usage rows, agent rows), with bars as
+        (fill width, colour band)."""
+        sim, w = self.sim, self.sim.weather
+        sustain = sim.sustainability_index()
+        pool = sim.agents
+        level = lambda v, mid, high: (v > mid) + (v > high)  # colour band: 0 low, 1 mid, 2 high
+        agents = tuple((int(pool.x[i]), int(pool.y[i]), int(pool.last_action[i]),
+                        int(80 * pool.battery[i].item()), level(pool.battery[i].item(), 0.3, 0.6))
+                       for i in range(min(8, len(pool))))
+        return (
+            (("Day", str(sim.day)),
+             ("Temp (°C)", f"{w.temp:.1f}"),
+             ("Humidity", f"{w.humidity:.2f}"),
+             ("Rain", "Yes ☔" if w.rain > 0 else "No ☀️")),
+            (("Move every", f"{self.move_every} tick(s)"),
+             ("FPS", f"{self.current_fps}"),
+             ("Status", "⏸️ Paused" if self.paused else "▶️ Running")),
+            (("Yield (Σ)", f"{sim.total_yield:.2f}"),
+             ("Sustainability", f"{sustain:.2f}")),
+            (int(200 * sustain), level(sustain, 0.4, 0.7)),
+            (("Water Used", f"{sim.total_water_used:.0f}"),
+             ("Chemicals", f"{sim.total_chem_used:.0f}")),
+            agents,
+        )
+    
+    def draw_side_panel(self, llm_summary: list, state):
+        """Enhanced side information panel, drawn from a _panel_state() snapshot"""
+        weather_rows, control_rows, metric_rows, (sustain_w, sustain_level), usage_rows, agents = state
+        panel = self._panel_rect
         pygame.draw.rect(self.overlay, (*self.COL_PANEL, 245), panel)
         pygame.draw.line(self.overlay, self.COL_FRAME, 
                         (self.w - PANEL_W, 0), (self.w - PANEL_W, self.h), 3)
         
-        title = self.font_lg.render("Farm Dashboard", True, (30, 50, 80))
-        self.overlay.blit(title, (self.w - PANEL_W + 16, 12))
-        
         y = 50
         
         # Weather section
         y = self._section_title("🌤️ Weather", y)
-        self._kv("Day", str(self.sim.day), 16, y); y += 22
-        self._kv("Temp (°C)", f"{self.sim.weather.temp:.1f}", 16, y); y += 22
-        self._kv("Humidity", f"{self.sim.weather.humidity:.2f}", 16, y); y += 22
-        self._kv("Rain", "Yes ☔" if self.sim.weather.rain > 0 else "No ☀️", 16, y); y += 22
+        for k, v in weather_rows:
+            self._kv(k, v, 16, y); y += 22
         
         # Control section
         y = self._section_title("⚙️ Control", y)
-        self._kv("Move every", f"{self.move_every} tick(s)", 16, y); y += 22
-        self._kv("FPS", f"{self.current_fps}", 16, y); y += 22
-        self._kv("Status", "⏸️ Paused" if self.paused else "▶️ Running", 16, y); y += 22
+        for k, v in control_rows:
+            self._kv(k, v, 16, y); y += 22
         
         # Metrics section
         y = self._section_title("📊 Metrics", y)
-        sustain = self.sim.sustainability_index()
-        self._kv("Yield (Σ)", f"{self.sim.total_yield:.2f}", 16, y); y += 22
-        self._kv("Sustainability", f"{sustain:.2f}", 16, y); y += 22
+        for k, v in metric_rows:
+            self._kv(k, v, 16, y); y += 22
         
         # Sustainability indicator bar
         bar_x = self.w - PANEL_W + 16
         bar_w = 200
         pygame.draw.rect(self.overlay, (220, 220, 220), 
                         (bar_x, y, bar_w, 12), border_radius=6)
-        
-        if sustain > 0.7:
-            bar_color = (76, 175, 80)
-        elif sustain > 0.4:
-            bar_color = (255, 193, 7)
-        else:
-            bar_color = (244, 67, 54)
-        
-        pygame.draw.rect(self.overlay, bar_color, 
-                        (bar_x, y, int(bar_w * sustain), 12), border_radius=6)
+        pygame.draw.rect(self.overlay, BAND_RGB[sustain_level], 
+                        (bar_x, y, sustain_w, 12), border_radius=6)
         y += 20
         
-        self._kv("Water Used", f"{self.sim.total_water_used:.0f}", 16, y); y += 22
-        self._kv("Chemicals", f"{self.sim.total_chem_used:.0f}", 16, y); y += 22
+        for k, v in usage_rows:
+            self._kv(k, v, 16, y); y += 22
         
         # Agents section
         y = self._section_title("🤖 Agents", y)
         
-        for i, a in enumerate(self.sim.agents[:8]):
+        for i, (ax, ay, action_id, batt_w, batt_level) in enumerate(agents):
             # Agent color indicator
             if i % 3 == 0:
                 color = (51, 128, 255)
@@ -823,34 +1259,14 @@ class FarmViz3D:
             pygame.draw.circle(self.overlay, color, 
                              (self.w - PANEL_W + 20, y + 8), 5)
             
-            action_icon = {
-                "irrigate": "💧",
-                "fertilize": "🌱",
-                "pesticide": "🔴",
-                "fungicide": "🟣",
-                "monitor": "👁️",
-                "idle": "⏸️"
-            }.get(a.last_action[:8], "⚡")
-            
-            # Battery color
-            if a.battery > 0.6:
-                batt_color = (76, 175, 80)
-            elif a.battery > 0.3:
-                batt_color = (255, 193, 7)
-            else:
-                batt_color = (244, 67, 54)
+            action_icon = ACTION_ICONS[action_id]
             
-            line = f"#{i} ({a.x},{a.y}) {action_icon}"
-            text = self.font_xs.render(line, True, (50, 50, 50))
-            self.overlay.blit(text, (self.w - PANEL_W + 32, y + 2))
+            line = f"#{i} ({ax},{ay}) {action_icon}"
+            text = render_text(self.font_xs, line, (50, 50, 50))
+            self._blit_list.append((text, (self.w - PANEL_W + 32, y + 2)))
             
             # Battery bar
-            bar_x = self.w - PANEL_W + 32
-            bar_y = y + 16
-            pygame.draw.rect(self.overlay, (200, 200, 200),
-                           (bar_x, bar_y, 80, 6), border_radius=3)
-            pygame.draw.rect(self.overlay, batt_color,
-                           (bar_x, bar_y, int(80 * a.battery), 6), border_radius=3)
+            self._blit_list.append((battery_bar(batt_w, batt_level), (self.w - PANEL_W + 32, y + 16)))
             
             y += 28
         
@@ -858,182 +1274,170 @@ class FarmViz3D:
         if any(self.conditions.values()):
             y += 10
             y = self._section_title("⚠️ Active Conditions", y)
+            x = self.w - PANEL_W + 16
             for msg in self._active_condition_messages():
-                # Wrap text
-                words = msg.split()
-                line = ""
-                for word in words:
-                    test_line = line + word + " "
-                    if self.font_xs.size(test_line)[0] < PANEL_W - 32:
-                        line = test_line
-                    else:
-                        text = self.font_xs.render(line, True, (100, 60, 20))
-                        self.overlay.blit(text, (self.w - PANEL_W + 16, y))
-                        y += 16
-                        line = word + " "
-                if line:
-                    text = self.font_xs.render(line, True, (100, 60, 20))
-                    self.overlay.blit(text, (self.w - PANEL_W + 16, y))
-                    y += 18
+                if y >= self.h: break  # the rest would land below the panel
+                lines = wrap_render(self.font_xs, msg, PANEL_W - 32, (100, 60, 20))
+                if lines:
+                    self._blit_list.extend((s, (x, y + i * 16)) for i, s in enumerate(lines))
+                    y += 16 * (len(lines) - 1) + 18
     
     def _section_title(self, text, y):
-        title = self.font_md.render(text, True, (33, 66, 120))
-        self.overlay.blit(title, (self.w - PANEL_W + 16, y))
-        pygame.draw.line(self.overlay, (180, 190, 200),
-                        (self.w - PANEL_W + 14, y + 24),
-                        (self.w - 18, y + 24), 2)
+        self._blit_list.append((self._labels[text], (self.w - PANEL_W + 16, y)))
+        self._blit_list.append((self._section_divider, (self.w - PANEL_W + 14, y + 24)))
         return y + 35
     
     def _kv(self, k, v, x, y):
-        key_text = self.font_sm.render(str(k) + ":", True, (60, 60, 60))
-        val_text = self.font_sm.render(str(v), True, (30, 30, 30))
-        self.overlay.blit(key_text, (self.w - PANEL_W + x, y))
-        self.overlay.blit(val_text, (self.w - PANEL_W + 125, y))
+        val_text = render_text(self.font_sm, str(v), (30, 30, 30))
+        self._blit_list.append((self._labels[k], (self.w - PANEL_W + x, y)))
+        self._blit_list.append((val_text, (self.w - PANEL_W + 125, y)))
+    
+    def process_events(self):
+        """Drain the input queue once, dispatching each event by type; returns the event count."""
+        events = pygame.event.get(INPUT_EVENTS)
+        for event in events:
+            self.event_handlers[event.type](event)
+        return len(events)
+    
+    def _on_quit(self, event):
+        self.running = False
+    
+    def _on_mouse_down(self, event):
+        if event.button == 1:
+            handled = False
+            for btn in self.buttons:
+                btn.handle(event)
+                if btn.rect.collidepoint(event.pos):
+                    handled = True
+            if not handled:
+                self.mouse_dragging = True
+                self.last_mouse_pos = event.pos
+    
+    def _on_mouse_up(self, event):
+        if event.button == 1:
+            self.mouse_dragging = False
+    
+    def _on_mouse_motion(self, event):
+        if self.mouse_dragging:
+            dx = event.pos[0] - self.last_mouse_pos[0]
+            dy = event.pos[1] - self.last_mouse_pos[1]
+            self.camera.rotate(dx, dy)
+            self.last_mouse_pos = event.pos
+    
+    def _on_expose(self, event):
+        # Counts as input, so a paused loop redraws; rebuild the overlay along with the scene
+        self._overlay_dirty = True
+    
+    def _on_mouse_wheel(self, event):
+        self.camera.zoom(event.y)
+    
+    def _on_key(self, event):
+        handler = self.key_handlers.get(event.key)
+        if handler:
+            handler()
+    
+    def _flip_condition(self, name):
+        self._toggle_condition(name, not self.conditions[name])
+    
+    def _toggle_pause(self):
+        self.paused = not self.paused
+        self._overlay_dirty = True
+    
+    def _step_paused(self):
+        if self.paused:
+            self._apply_weather_overrides()
+            self.sim.step()
+    
+    def _change_move_every(self, delta):
+        self.move_every = max(1, min(60, self.move_every + delta))
+        self._overlay_dirty = True
+    
+    def _change_fps(self, delta):
+        self.current_fps = max(1, min(120, self.current_fps + delta))
+        self._overlay_dirty = True
+    
+    def _toggle_grid(self):
+        self.show_grid = not self.show_grid
+    
+    def _toggle_trails(self):
+        self.show_trails = not self.show_trails
+    
+    def _queue_screenshot(self):
+        """Read back on the next render(), once the frame is drawn."""
+        self._screenshot_name = f"screenshot_3d_{time.time_ns() // 10**9}.png"
+    
+    def _save_snapshot(self):
+        snap = {
+            "ticks": self.sim.ticks,
+            "day": self.sim.day,
+            "yield_sum": self.sim.total_yield,
+            "sustainability": self.sim.sustainability_index(),
+            "water_used": self.sim.total_water_used,
+            "chem_used": self.sim.total_chem_used,
+            "conditions": dict(self.conditions),
+            "camera": {
+                "distance": self.camera.distance,
+                "angle_h": self.camera.angle_h,
+                "angle_v": self.camera.angle_v
+            }
+        }
+        fname = f"snapshot_3d_{time.time_ns() // 10**9}.json"
+        self.io_executor.submit(dump_snapshot, snap, fname)
     
     def render(self, llm_summary: list):
         """Main render function"""
         self.render_3d_scene()
         self.render_2d_overlay(llm_summary)
+        if self._screenshot_name:
+            # Read back the finished frame here; encoding and writing happen on the I/O worker
+            glPixelStorei(GL_PACK_ALIGNMENT, 1)
+            pixels = glReadPixels(0, 0, self.w, self.h, GL_RGB, GL_UNSIGNED_BYTE)
+            self.io_executor.submit(save_screenshot, pixels, (self.w, self.h), self._screenshot_name)
+            self._screenshot_name = None
         pygame.display.flip()
         self.clock.tick(self.current_fps)
     
     def dynamic_summary(self, base_summary: List[str]) -> List[str]:
         msgs = list(base_summary)
         msgs.extend(self._active_condition_messages())
-        seen, out = set(), []
-        for m in msgs:
-            if m not in seen:
-                out.append(m)
-                seen.add(m)
-        return out
+        return list(dict.fromkeys(msgs))  # ordered dedup
+
+class _MonitorAgent:
+    """Fallback for non-RL agents - use simple logic"""
+    def act(self, sim):
+        return "monitor", (0, 0)
 
 def simulate_and_render_3d(sim: FarmSimulator, agents, base_llm_summary):
     """Main simulation loop with enhanced 3D rendering"""
     viz = FarmViz3D(sim)
-    running = True
+    # Resolve each agent's policy once instead of probing for it every tick
+    controllers = [a if hasattr(a, 'act') else _MonitorAgent() for a in agents]
+    pool, trails = sim.agents, viz.agent_trails
     
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:
-                    handled = False
-                    for btn in viz.buttons:
-                        btn.handle(event)
-                        if btn.rect.collidepoint(event.pos):
-                            handled = True
-                    if not handled:
-                        viz.mouse_dragging = True
-                        viz.last_mouse_pos = event.pos
-            
-            elif event.type == pygame.MOUSEBUTTONUP:
-                if event.button == 1:
-                    viz.mouse_dragging = False
-            
-            elif event.type == pygame.MOUSEMOTION:
-                if viz.mouse_dragging:
-                    dx = event.pos[0] - viz.last_mouse_pos[0]
-                    dy = event.pos[1] - viz.last_mouse_pos[1]
-                    viz.camera.rotate(dx, dy)
-                    viz.last_mouse_pos = event.pos
-            
-            elif event.type == pygame.MOUSEWHEEL:
-                viz.camera.zoom(event.y)
-            
-            elif event.type == pygame.KEYDOWN:
-                k = event.key
-                # Weather hotkeys
-                if k == pygame.K_r:
-                    viz._toggle_condition("rainy", not viz.conditions["rainy"])
-                elif k == pygame.K_s:
-                    viz._toggle_condition("sunny", not viz.conditions["sunny"])
-                elif k == pygame.K_w:
-                    viz._toggle_condition("wind_storm", not viz.conditions["wind_storm"])
-                elif k == pygame.K_d:
-                    viz._toggle_condition("drought", not viz.conditions["drought"])
-                # Pause/Step
-                elif k == pygame.K_SPACE:
-                    viz.paused = not viz.paused
-                elif k == pygame.K_n and viz.paused:
-                    viz._apply_weather_overrides()
-                    sim.step()
-                # Speed controls
-                elif k in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
-                    viz.move_every = min(60, viz.move_every + 1)
-                elif k in (pygame.K_MINUS, pygame.K_KP_MINUS):
-                    viz.move_every = max(1, viz.move_every - 1)
-                elif k == pygame.K_LEFTBRACKET:
-                    viz.current_fps = max(1, viz.current_fps - 5)
-                elif k == pygame.K_RIGHTBRACKET:
-                    viz.current_fps = min(120, viz.current_fps + 5)
-                # Toggle features
-                elif k == pygame.K_g:
-                    viz.show_grid = not viz.show_grid
-                elif k == pygame.K_t:
-                    viz.show_trails = not viz.show_trails
-                # Screenshot
-                elif k == pygame.K_p:
-                    fname = f"screenshot_3d_{int(time.time())}.png"
-                    pygame.image.save(viz.screen, fname)
-                    print(f"✅ Saved screenshot: {fname}")
-                # Snapshot
-                elif k == pygame.K_o:
-                    snap = {
-                        "ticks": sim.ticks,
-                        "day": sim.day,
-                        "yield_sum": sim.total_yield,
-                        "sustainability": sim.sustainability_index(),
-                        "water_used": sim.total_water_used,
-                        "chem_used": sim.total_chem_used,
-                        "conditions": dict(viz.conditions),
-                        "camera": {
-                            "distance": viz.camera.distance,
-                            "angle_h": viz.camera.angle_h,
-                            "angle_v": viz.camera.angle_v
-                        }
-                    }
-                    fname = f"snapshot_3d_{int(time.time())}.json"
-                    with open(fname, "w") as f:
-                        json.dump(snap, f, indent=2)
-                    print(f"✅ Saved snapshot: {fname}")
+    while viz.running:
+        handled = viz.process_events()
         
         if viz.paused:
-            summary = viz.dynamic_summary(base_llm_summary)
-            viz.render(summary)
+            if handled:
+                summary = viz.dynamic_summary(base_llm_summary)
+                viz.render(summary)
+            # Nothing changes without input: block on the queue for up to a frame instead of redrawing
+            ev = pygame.event.wait(1000 // viz.current_fps)
+            if ev.type != pygame.NOEVENT: pygame.event.post(ev)
             continue
         
         viz._apply_weather_overrides()
         
         # Agent loop with trail tracking
         if sim.ticks % viz.move_every == 0:
-            for i, agent_obj in enumerate(agents):
-                # Get action and movement from the agent object
-                if hasattr(agent_obj, 'act'):
-                    action, (dx, dy) = agent_obj.act(sim)
-                else:
-                    # Fallback for non-RL agents - use simple logic
-                    action = "monitor"
-                    dx, dy = 0, 0
-                
-                # Move agent
-                move_agent(sim, i, dx, dy)
-                
-                # Apply action
-                sim.apply_action(i, action)
-                
-                # Update trail
-                agent_state = sim.agents[i]
-                viz.agent_trails[i].add(agent_state.x, agent_state.y, action)
-                
-                # Recharge at base
-                if (agent_state.x, agent_state.y) in BASE_LOCATIONS and action == "idle":
-                    agent_state.battery = min(MAX_BATTERY, agent_state.battery + BATTERY_RECHARGE_PER_TICK)
+            # Act, move, apply and recharge each agent in turn, then append every trail at once
+            sim.step_agents(controllers)
+            trails.add(pool.x, pool.y, pool.last_action)
         
         sim.step()
         summary = viz.dynamic_summary(base_llm_summary)
         viz.render(summary)
     
+    viz.io_executor.shutdown(wait=True)
     pygame.quit()
     print("\n🎯 Simulation ended successfully!")